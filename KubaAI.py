@@ -0,0 +1,756 @@
+# Author: Matt Sanders
+# Date: 10/18/2026
+# Description: This program defines the computer player for the game 'Kuba' in KubaGame.py. There is
+#              a class that searches the moves of a game for the best one within a time limit.
+
+import copy
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from KubaCache import moves_key, position_key
+from KubaGame import TranspositionTable, turn_key
+
+WIN_SCORE = 1000000         # Score of a won position, less the number of moves it takes to get there
+RED_MARBLE_SCORE = 100      # Score of each red marble captured more than the opponent
+MARBLE_SCORE = 80           # Score of each marble the player has on the board more than the opponent
+_INFINITY = WIN_SCORE * 2
+_WIN_BOUND = WIN_SCORE - 10000   # Scores beyond this are wins or losses a number of plies away, not evaluations
+
+
+def _score_to_table(score, ply):
+    """
+    Returns a score found ply moves below the root as it is kept in the transposition table. A win or loss
+    is kept as its distance from the position itself instead of from the root, so it is right wherever the
+    position is reached again.
+    """
+
+    if score > _WIN_BOUND:
+        return score + ply
+    elif score < -_WIN_BOUND:
+        return score - ply
+
+    return score
+
+
+def _score_from_table(score, ply):
+    """
+    Returns a score from the transposition table as a score for a position ply moves below the root, the
+    reverse of _score_to_table.
+    """
+
+    if score > _WIN_BOUND:
+        return score - ply
+    elif score < -_WIN_BOUND:
+        return score + ply
+
+    return score
+
+
+class SearchTimeout(Exception):
+    """
+    Raised inside a search when its deadline has passed, so the search can unwind back to the top.
+    """
+
+
+class AlphaBetaSearch:
+    """
+    Searches a KubaGame for the best move of a player using iterative deepening alpha-beta search. Moves are made
+    and taken back on the game itself with apply_move and undo_move, captures of red marbles and pushes that knock
+    off an opponent's marble are searched first, and results are kept in a TranspositionTable keyed by
+    KubaCache.position_key, the position hash with the red marbles each player has captured, so they carry over
+    between depths and between moves. It takes the number of transposition table slots and optionally a
+    PositionCache or SharedPositionCache from KubaCache.py that keeps evaluations and legal move lists, which can be
+    shared with other searches.
+    """
+
+    def __init__(self, table_size=1 << 18, cache=None):
+        """
+        Initializes the transposition table, the cache and the statistics of the last search. Takes the number
+        of table slots as an integer and the cache or None, and returns nothing.
+        """
+
+        self._table = TranspositionTable(table_size)
+        self._cache = cache
+        self._deadline = None
+        self._nodes = 0
+        self._depth = 0
+        self._score = 0
+        self._seconds = 0.0
+        self._iterations = []               # (depth, score, move) of each depth of the last search that finished
+        self._root_key = 0                  # Turn key added to the hash of a root position with no turn set
+
+    def get_table(self):
+        """
+        Returns the transposition table used by the search. Takes no parameters.
+        """
+
+        return self._table
+
+    def get_cache(self):
+        """
+        Returns the evaluation and move list cache used by the search, or None. Takes no parameters.
+        """
+
+        return self._cache
+
+    def get_stats(self):
+        """
+        Returns a dictionary of the statistics of the last search: the depth completed, the score of the
+        best move, the nodes searched, the seconds taken and the nodes searched per second. Takes no parameters.
+        """
+
+        if self._seconds > 0:
+            nodes_per_second = self._nodes / self._seconds
+        else:
+            nodes_per_second = 0.0
+
+        return {"depth": self._depth, "score": self._score, "nodes": self._nodes, "seconds": self._seconds,
+                "nodes_per_second": nodes_per_second}
+
+    def get_iterations(self):
+        """
+        Returns a list of (depth, score, move) tuples, one for each depth of the last search that finished.
+        Takes no parameters.
+        """
+
+        return list(self._iterations)
+
+    def search(self, game, player_name, time_budget_ms=None, max_depth=64, root_moves=None):
+        """
+        Returns the best move found for the player as a tuple of the coordinates, (row, column), and the
+        direction, or None if the player has no legal move. The search goes one move deeper at a time until
+        the time budget in milliseconds runs out or max_depth is reached, and returns the best move of the
+        deepest search that finished. The game is left as it was. An optional list of root moves limits the
+        search to those moves.
+        """
+
+        start = time.perf_counter()
+        self._deadline = None if time_budget_ms is None else start + time_budget_ms / 1000
+        self._nodes = 0
+        self._depth = 0
+        self._score = 0
+        self._iterations = []
+        self._table.new_search()
+
+        opponent_name = game.update_current_turn(player_name)
+
+        # The turn is not set before the first move, so the player's turn key is added to the root hash
+        self._root_key = 0
+        if game.get_current_turn() is None:
+            self._root_key = turn_key(game.get_player_color(player_name))
+
+        if root_moves is None:
+            moves = list(self._legal_moves(game, player_name))
+        else:
+            moves = list(root_moves)
+
+        if not moves:
+            self._seconds = time.perf_counter() - start
+            return None
+
+        best_move = moves[0]
+        undo_depth = game.get_undo_depth()
+
+        try:
+            for depth in range(1, max_depth + 1):
+                moves = self._order_moves(game, moves, best_move)
+                score, move = self._search_root(game, player_name, opponent_name, moves, depth)
+                best_move, self._score, self._depth = move, score, depth
+                self._iterations.append((depth, score, move))
+
+                if abs(score) >= WIN_SCORE - depth:     # A forced win or loss has been found
+                    break
+
+        except SearchTimeout:
+            # Takes back the moves of the search that was cut off
+            while game.get_undo_depth() > undo_depth:
+                game.undo_move()
+
+        self._seconds = time.perf_counter() - start
+        return best_move
+
+    def evaluate(self, game, player_name, opponent_name):
+        """
+        Returns the score of the game for the player as an integer, from the number of red marbles each
+        player has captured and the number of marbles each has on the board. Takes the game and the names
+        of the player and their opponent.
+        """
+
+        if self._cache is not None:
+            # The cache keeps the score for white, so both players' evaluations share an entry
+            key = position_key(game)
+            score = self._cache.get_evaluation(key)
+
+            if score is None:
+                score = self._score_for_white(game, player_name, opponent_name)
+                self._cache.set_evaluation(key, score)
+
+        else:
+            score = self._score_for_white(game, player_name, opponent_name)
+
+        if game.get_player_color(player_name) == "B":
+            return -score
+
+        return score
+
+    def _score_for_white(self, game, player_name, opponent_name):
+        """
+        Returns the score of the game for the player with the white marbles as an integer.
+        """
+
+        counts = game.get_marble_count()
+        captured = game.get_captured(player_name) - game.get_captured(opponent_name)
+
+        if game.get_player_color(player_name) == "B":
+            captured = -captured
+
+        return RED_MARBLE_SCORE * captured + MARBLE_SCORE * (counts[0] - counts[1])
+
+    def _legal_moves(self, game, player_name):
+        """
+        Returns the legal moves of the player, from the cache when it has them.
+        """
+
+        if self._cache is None:
+            return game.legal_moves(player_name)
+
+        key = moves_key(game, player_name)
+        moves = self._cache.get_moves(key)
+
+        if moves is None:
+            moves = tuple(game.legal_moves(player_name))
+            self._cache.set_moves(key, moves)
+
+        return moves
+
+    def _search_root(self, game, player_name, opponent_name, moves, depth):
+        """
+        Searches each root move to the given depth and returns the best score and move as a tuple.
+        """
+
+        alpha = -_INFINITY
+        best_move = moves[0]
+
+        for move in moves:
+            game.apply_move(player_name, move[0], move[1])
+            score = -self._search(game, opponent_name, player_name, depth - 1, -_INFINITY, -alpha, 1)
+            game.undo_move()
+
+            if score > alpha:
+                alpha = score
+                best_move = move
+
+        self._table.set_entry(position_key(game) ^ self._root_key, depth, alpha, TranspositionTable.EXACT, best_move)
+        return alpha, best_move
+
+    def _search(self, game, player_name, opponent_name, depth, alpha, beta, ply):
+        """
+        Returns the score of the game for the player to move with alpha-beta search to the given depth.
+        """
+
+        self._nodes += 1
+
+        if self._deadline is not None and not self._nodes & 31 and time.perf_counter() >= self._deadline:
+            raise SearchTimeout()
+
+        if game.get_winner() is not None:
+            return ply - WIN_SCORE      # The opponent's last move won the game
+
+        if depth <= 0:
+            return self.evaluate(game, player_name, opponent_name)
+
+        key = position_key(game)
+        entry = self._table.get_entry(key)
+        table_move = None
+
+        if entry is not None:
+            entry_depth, value, flag, table_move = entry
+            value = _score_from_table(value, ply)
+
+            if entry_depth >= depth:
+                if flag == TranspositionTable.EXACT:
+                    return value
+                elif flag == TranspositionTable.LOWER and value > alpha:
+                    alpha = value
+                elif flag == TranspositionTable.UPPER and value < beta:
+                    beta = value
+
+                if alpha >= beta:
+                    return value
+
+        moves = self._order_moves(game, self._legal_moves(game, player_name), table_move)
+
+        if not moves:
+            return self.evaluate(game, player_name, opponent_name)
+
+        original_alpha = alpha
+        best_score = -_INFINITY
+        best_move = None
+
+        for move in moves:
+            game.apply_move(player_name, move[0], move[1])
+            score = -self._search(game, opponent_name, player_name, depth - 1, -beta, -alpha, ply + 1)
+            game.undo_move()
+
+            if score > best_score:
+                best_score = score
+                best_move = move
+
+                if score > alpha:
+                    alpha = score
+
+                    if alpha >= beta:
+                        break
+
+        if best_score <= original_alpha:
+            flag = TranspositionTable.UPPER
+        elif best_score >= beta:
+            flag = TranspositionTable.LOWER
+        else:
+            flag = TranspositionTable.EXACT
+
+        self._table.set_entry(key, depth, _score_to_table(best_score, ply), flag, best_move)
+        return best_score
+
+    def _order_moves(self, game, moves, first_move):
+        """
+        Returns the moves as a list with the given first move at the front, then moves that capture a red
+        marble, then moves that knock off an opponent's marble, then the rest in their original order.
+        """
+
+        first = []
+        red_captures = []
+        ejections = []
+        others = []
+
+        for move in moves:
+            if move == first_move:
+                first.append(move)
+                continue
+
+            removed_value = game.removed_by_push(move[0], move[1])
+
+            if removed_value == "R":
+                red_captures.append(move)
+            elif removed_value == "X":
+                others.append(move)
+            else:
+                ejections.append(move)
+
+        return first + red_captures + ejections + others
+
+
+class ParallelSearch:
+    """
+    Splits the root moves of a search across worker processes in a ProcessPoolExecutor. The moves are put in
+    an order set by the seed and dealt out to the workers like cards, and every worker runs its own iterative
+    deepening AlphaBetaSearch on its share. Each worker starts with the deeper entries of this search's
+    transposition table and sends its own back to be merged in afterwards. The results are combined at the
+    deepest depth every worker finished, so with a fixed depth, seed and number of workers the same move is
+    always chosen. It takes the number of worker processes as a parameter, all of the machine's cores if None.
+    """
+
+    def __init__(self, workers=None, table_size=1 << 18, shared_depth=2, cache=None):
+        """
+        Initializes the worker pool, the merged transposition table and the statistics of the last search.
+        Takes the number of workers, the number of table slots, the smallest depth of the table entries
+        that are passed between processes and optionally a cache for the workers' searches. Only a
+        SharedPositionCache is shared between the workers; any other cache is copied to each search.
+        Returns nothing.
+        """
+
+        self._cache = cache
+
+        self._workers = workers or os.cpu_count() or 1
+        self._executor = ProcessPoolExecutor(max_workers=self._workers)
+        self._table = TranspositionTable(table_size)
+        self._shared_depth = shared_depth
+        self._stats = {"depth": 0, "score": 0, "nodes": 0, "seconds": 0.0, "nodes_per_second": 0.0}
+
+    def get_workers(self):
+        """
+        Returns the number of worker processes as an integer. Takes no parameters.
+        """
+
+        return self._workers
+
+    def get_table(self):
+        """
+        Returns the transposition table that worker results are merged into. Takes no parameters.
+        """
+
+        return self._table
+
+    def get_cache(self):
+        """
+        Returns the cache given to the workers' searches, or None. Takes no parameters.
+        """
+
+        return self._cache
+
+    def get_stats(self):
+        """
+        Returns a dictionary of the depth, score, nodes, seconds and nodes per second of the last search,
+        counting the nodes of every worker. Takes no parameters.
+        """
+
+        return dict(self._stats)
+
+    def search(self, game, player_name, time_budget_ms=None, max_depth=64, seed=0):
+        """
+        Returns the best move found for the player as a tuple of the coordinates, (row, column), and the
+        direction, or None if the player has no legal move. Takes the same parameters as AlphaBetaSearch.search
+        plus the seed that orders the root moves. The game is not changed.
+        """
+
+        start = time.perf_counter()
+        moves = list(game.legal_moves(player_name))
+
+        if not moves:
+            self._stats = {"depth": 0, "score": 0, "nodes": 0, "seconds": 0.0, "nodes_per_second": 0.0}
+            return None
+
+        random.Random(seed).shuffle(moves)
+
+        deadline = None
+        if time_budget_ms is not None:
+            deadline = time.time() + time_budget_ms / 1000
+
+        # Deals the moves out to the workers so the shares are the same for the same seed
+        shares = [moves[index::self._workers] for index in range(self._workers)]
+        entries = self._table.get_entries(self._shared_depth)
+        futures = [self._executor.submit(_search_share, game, player_name, share, deadline, max_depth, entries,
+                                         self._shared_depth, self._cache) for share in shares if share]
+
+        results = [future.result() for future in futures]
+        nodes = 0
+        depth = max_depth
+
+        for iterations, share_nodes, share_entries in results:
+            nodes += share_nodes
+            self._table.merge(share_entries)
+            depth = min(depth, len(iterations))
+
+        best_move = moves[0]
+        best_score = None
+
+        if depth > 0:
+            # The best move of each share at the deepest depth they all finished, ties going to the seed order
+            for iterations, share_nodes, share_entries in results:
+                share_depth, score, move = iterations[depth - 1]
+
+                if (best_score is None or score > best_score
+                        or score == best_score and moves.index(move) < moves.index(best_move)):
+                    best_score = score
+                    best_move = move
+
+        seconds = time.perf_counter() - start
+        self._stats = {"depth": depth, "score": best_score or 0, "nodes": nodes, "seconds": seconds,
+                       "nodes_per_second": nodes / seconds if seconds > 0 else 0.0}
+        return best_move
+
+    def close(self):
+        """
+        Shuts down the worker processes. Takes no parameters and returns nothing.
+        """
+
+        self._executor.shutdown()
+
+
+def _search_share(game, player_name, moves, deadline, max_depth, entries, shared_depth, cache):
+    """
+    Runs in a worker process. Searches the player's share of the root moves with a new AlphaBetaSearch whose
+    table starts with the given entries and that uses the given cache, and returns its iterations, the nodes
+    it searched and its table entries of at least shared_depth.
+    """
+
+    search = AlphaBetaSearch(cache=cache)
+    search.get_table().merge(entries)
+
+    time_budget_ms = None
+    if deadline is not None:
+        time_budget_ms = max(0.0, (deadline - time.time()) * 1000)
+
+    search.search(game, player_name, time_budget_ms, max_depth, moves)
+    return search.get_iterations(), search.get_stats()["nodes"], search.get_table().get_entries(shared_depth)
+
+
+class MonteCarloNode:
+    """
+    One position in a MonteCarloSearch tree, reached by playing its move from its parent. It counts the
+    playouts through it and the wins in them for the player who made the move. Nodes use __slots__ and
+    their moves not yet tried are kept in a list that is dropped once it is empty, so large trees stay small.
+    """
+
+    __slots__ = ("move", "parent", "children", "untried", "visits", "wins")
+
+    def __init__(self, move, parent, untried):
+        """
+        Initializes the node's move, parent and list of moves not yet tried, with no children or playouts.
+        Returns nothing.
+        """
+
+        self.move = move
+        self.parent = parent
+        self.children = []
+        self.untried = untried
+        self.visits = 0
+        self.wins = 0.0
+
+
+class MonteCarloSearch:
+    """
+    Searches a KubaGame for the best move of a player with Monte Carlo tree search. Each playout picks moves
+    down the tree by UCT, adds one new node, plays random moves to the end of the game or the rollout limit,
+    and counts the result back up the tree. The tree is kept between searches; when the game has moved on
+    by the moves in the players' last moves, the matching subtree becomes the new root instead of starting
+    over. It takes the exploration constant, the seed for the random moves, and the most moves a rollout
+    plays before the position is scored by material.
+    """
+
+    def __init__(self, exploration=1.4, seed=0, rollout_limit=60):
+        """
+        Initializes the random generator, the empty tree and the statistics of the last search. Returns nothing.
+        """
+
+        self._exploration = exploration
+        self._random = random.Random(seed)
+        self._rollout_limit = rollout_limit
+        self._game = None                   # Private copy of the game at the root of the tree
+        self._root = None
+        self._root_player = None
+        self._nodes = 0
+        self._playouts = 0
+        self._seconds = 0.0
+        self._reused = False
+
+    def get_stats(self):
+        """
+        Returns a dictionary of the statistics of the last search: the playouts, the seconds taken, the
+        playouts per second, the nodes in the tree and whether the tree from the last search was reused.
+        Takes no parameters.
+        """
+
+        if self._seconds > 0:
+            playouts_per_second = self._playouts / self._seconds
+        else:
+            playouts_per_second = 0.0
+
+        return {"playouts": self._playouts, "seconds": self._seconds, "playouts_per_second": playouts_per_second,
+                "nodes": self._nodes, "reused": self._reused}
+
+    def search(self, game, player_name, time_budget_ms=None, playouts=1000):
+        """
+        Returns the move with the most playouts for the player as a tuple of the coordinates, (row, column),
+        and the direction, or None if the player has no legal move. It runs playouts until the time budget
+        in milliseconds runs out, or until the given number of playouts if there is no budget. The game is
+        not changed.
+        """
+
+        start = time.perf_counter()
+        deadline = None if time_budget_ms is None else start + time_budget_ms / 1000
+        self._reused = self._reuse_tree(game, player_name)
+
+        if not self._reused:
+            self._game = copy.deepcopy(game)
+            self._root = MonteCarloNode(None, None, self._shuffled_moves(player_name))
+            self._root_player = player_name
+            self._nodes = 1
+
+        self._playouts = 0
+
+        while self._root.children or self._root.untried:
+            if deadline is not None:
+                if time.perf_counter() >= deadline:
+                    break
+            elif self._playouts >= playouts:
+                break
+
+            self._playout()
+            self._playouts += 1
+
+        self._seconds = time.perf_counter() - start
+
+        if not self._root.children:
+            return None
+
+        return max(self._root.children, key=lambda child: child.visits).move
+
+    def advance(self, move):
+        """
+        Moves the root of the tree down to the child for the given move, keeping its subtree, after that
+        move has been made in the real game. Returns True if the child was in the tree, otherwise the tree is
+        dropped and the next search starts over. Takes the move as a tuple of the coordinates and direction.
+        """
+
+        if self._root is None:
+            return False
+
+        for child in self._root.children:
+            if child.move == move:
+                self._game.apply_move(self._root_player, move[0], move[1])
+                self._root_player = self._game.update_current_turn(self._root_player)
+                self._set_root(child)
+                return True
+
+        self._root = None
+        return False
+
+    def _set_root(self, node):
+        """
+        Makes the node the root of the tree and forgets the moves taken back to reach it.
+        """
+
+        node.parent = None
+        node.move = None
+        self._root = node
+        self._game.clear_undo()
+        self._nodes = self._count_nodes(node)
+
+    def _count_nodes(self, node):
+        """
+        Returns the number of nodes in the subtree of the node.
+        """
+
+        count = 0
+        stack = [node]
+
+        while stack:
+            node = stack.pop()
+            count += 1
+            stack.extend(node.children)
+
+        return count
+
+    def _reuse_tree(self, game, player_name):
+        """
+        Moves the root down the tree along the players' last moves to the game's current position. Returns
+        True if the position was found in the tree, or False if the tree has to be built again.
+        """
+
+        if self._root is None:
+            return False
+
+        if self._game.get_hash() == game.get_hash() and self._root_player == player_name:
+            return True
+
+        opponent_name = game.update_current_turn(self._root_player)
+
+        # The root player's move, then the opponent's reply if it is the root player's turn again
+        if player_name == opponent_name:
+            path = [game.get_last_move(self._root_player)]
+        else:
+            path = [game.get_last_move(self._root_player), game.get_last_move(opponent_name)]
+
+        for move in path:
+            if move is None or not self.advance(move):
+                self._root = None
+                return False
+
+        if self._game.get_hash() != game.get_hash() or self._root_player != player_name:
+            self._root = None
+            return False
+
+        return True
+
+    def _shuffled_moves(self, player_name):
+        """
+        Returns the legal moves of the player in the private game as a list in random order, or None if
+        there are none.
+        """
+
+        moves = list(self._game.legal_moves(player_name))
+        self._random.shuffle(moves)
+        return moves or None
+
+    def _playout(self):
+        """
+        Runs one playout from the root: selection, expansion, a random rollout and backing up the result.
+        """
+
+        game = self._game
+        exploration = self._exploration
+        node = self._root
+        player_name = self._root_player
+        path = [(node, None)]            # Each node and the player who made the move into it
+
+        # Goes down the tree by UCT while every move of the node has been tried
+        while node.untried is None and node.children and game.get_winner() is None:
+            log_visits = math.log(node.visits)
+            node = max(node.children, key=lambda child: child.wins / child.visits
+                       + exploration * math.sqrt(log_visits / child.visits))
+            game.apply_move(player_name, node.move[0], node.move[1])
+            path.append((node, player_name))
+            player_name = game.update_current_turn(player_name)
+
+        # Adds a child for one untried move
+        if node.untried and game.get_winner() is None:
+            move = node.untried.pop()
+            if not node.untried:
+                node.untried = None
+
+            game.apply_move(player_name, move[0], move[1])
+            child = MonteCarloNode(move, node, None)
+            child.untried = self._shuffled_moves(game.update_current_turn(player_name))
+            node.children.append(child)
+            self._nodes += 1
+            path.append((child, player_name))
+            player_name = game.update_current_turn(player_name)
+
+        winner = self._rollout(player_name)
+
+        for node, mover in path:
+            node.visits += 1
+
+            if winner is None:
+                node.wins += 0.5
+            elif winner == mover:
+                node.wins += 1.0
+
+        while game.get_undo_depth():
+            game.undo_move()
+
+    def _rollout(self, player_name):
+        """
+        Plays random moves from the private game's position until someone wins or the rollout limit is
+        reached, and returns the winner's name. A game that is not over is given to the player ahead in
+        material, or None if neither is. The moves are taken back by the caller.
+        """
+
+        game = self._game
+        choice = self._random.choice
+
+        for ply in range(self._rollout_limit):
+            if game.get_winner() is not None:
+                return game.get_winner()
+
+            moves = list(game.legal_moves(player_name))
+            if not moves:
+                break
+
+            move = choice(moves)
+            game.apply_move(player_name, move[0], move[1])
+            player_name = game.update_current_turn(player_name)
+
+        if game.get_winner() is not None:
+            return game.get_winner()
+
+        opponent_name = game.update_current_turn(player_name)
+        counts = game.get_marble_count()
+        marbles = counts[0] - counts[1]
+
+        if game.get_player_color(player_name) == "B":
+            marbles = -marbles
+
+        score = RED_MARBLE_SCORE * (game.get_captured(player_name) - game.get_captured(opponent_name)) \
+            + MARBLE_SCORE * marbles
+
+        if score > 0:
+            return player_name
+        elif score < 0:
+            return opponent_name
+
+        return None
@@ -0,0 +1,311 @@
+# Author: Matt Sanders
+# Date: 10/18/2026
+# Description: This program defines an archive of many games of 'Kuba' from KubaGame.py that is read
+#              through mmap, so any ply of any game can be rebuilt without reading the games before it.
+
+import mmap
+import struct
+
+from KubaGame import KubaGame, STATE_SIZE
+from KubaRecord import END, GameRecord, encode_header, read_games, replay_events, read_header
+
+# An archive file is:
+#   the header, HEADER below,
+#   each game: its game record from KubaRecord.py, its snapshots, the HISTORY_COUNT of each snapshot and the
+#   position history of its last snapshot,
+#   the index: one INDEX_ENTRY per game.
+# A snapshot is KubaGame.get_state_bytes after every snapshot_interval plies, so rebuilding a ply replays
+# fewer than snapshot_interval moves. A ply is one move or pass of the game record. The Ko rule compares with
+# the positions before a snapshot too, so a game also keeps KubaGame.get_history_bytes of its last snapshot,
+# whose first HISTORY_COUNT positions are the history of each snapshot before it. Version 1 archives have no
+# histories, and their games are replayed from the start unless they have no Ko rule.
+MAGIC = b"KUBAARCH"
+VERSION = 2
+HEADER = struct.Struct("<8sIIQQ")       # magic, version, snapshot interval, game count, index offset
+INDEX_ENTRY = struct.Struct("<QQQI")    # record offset, first event offset, snapshots offset, ply count
+HISTORY_COUNT = struct.Struct("<I")     # positions in the history of a snapshot, 9 bytes each
+
+
+class ArchiveWriter:
+    """
+    Writes game records into a new archive file with snapshots and an index. Games are added with add_game
+    and the archive can only be read once close has written the index. It takes the path of the file and
+    optionally the number of plies between snapshots.
+    """
+
+    def __init__(self, path, snapshot_interval=32):
+        """
+        Opens the file and writes a header that close finishes. Returns nothing.
+        """
+
+        if snapshot_interval < 1:
+            raise ValueError("The snapshot interval must be at least 1.")
+
+        self._file = open(path, "wb")
+        self._snapshot_interval = snapshot_interval
+        self._index = bytearray()
+        self._game_count = 0
+        self._file.write(HEADER.pack(MAGIC, VERSION, snapshot_interval, 0, 0))
+
+    def __enter__(self):
+        """
+        Returns the writer for a with statement, which closes it at the end.
+        """
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Writes the index and closes the file at the end of a with statement. Returns nothing.
+        """
+
+        self.close()
+
+    def get_game_count(self):
+        """
+        Returns the number of games added as an integer. Takes no parameters.
+        """
+
+        return self._game_count
+
+    def add_game(self, record):
+        """
+        Adds a GameRecord, such as one from KubaRecord.read_games, to the archive. The game is replayed
+        to take its snapshots and their position histories. Returns the index of the game in the archive as
+        an integer.
+        """
+
+        events = record.get_events()
+        header = encode_header(record.get_players(), record.get_ko_rule())
+        record_offset = self._file.tell()
+        self._file.write(header)
+        self._file.write(events)
+        self._file.write(bytes((END,)))
+
+        snapshots_offset = self._file.tell()
+        plies = 0
+        history_counts = bytearray()
+        history = b""
+
+        game = KubaGame(*record.get_players(), ko_rule=record.get_ko_rule())
+
+        for player_name, move, game in replay_events(game, events):
+            plies += 1
+
+            if plies % self._snapshot_interval == 0:
+                self._file.write(game.get_state_bytes())
+                history = game.get_history_bytes()
+                history_counts += HISTORY_COUNT.pack(len(history) // 9)
+
+        self._file.write(history_counts)
+        self._file.write(history)
+
+        # The first event of a game that was played is the marker of who moved first
+        first_event = record_offset + len(header) + (1 if plies else 0)
+        self._index += INDEX_ENTRY.pack(record_offset, first_event, snapshots_offset, plies)
+        self._game_count += 1
+        return self._game_count - 1
+
+    def add_games(self, stream):
+        """
+        Adds every game of a binary stream of game records to the archive. Returns nothing.
+        """
+
+        for record in read_games(stream):
+            self.add_game(record)
+
+    def close(self):
+        """
+        Writes the index and the finished header and closes the file. Returns nothing.
+        """
+
+        if self._file.closed:
+            return
+
+        index_offset = self._file.tell()
+        self._file.write(self._index)
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, VERSION, self._snapshot_interval, self._game_count, index_offset))
+        self._file.close()
+
+
+class GameArchive:
+    """
+    Reads an archive written by ArchiveWriter through a read only mmap. Nothing is copied into memory until
+    a game is asked for, and the mapped pages are shared by every process that opens the same file, so
+    worker processes can read one archive at the same time. A GameArchive can be pickled to send it to
+    another process, which maps the file again. It takes the path of the archive.
+    """
+
+    def __init__(self, path):
+        """
+        Maps the file and reads its header. Returns nothing.
+        """
+
+        self._path = path
+        self._open()
+
+    def _open(self):
+        """
+        Maps the archive file and reads the header.
+        """
+
+        with open(self._path, "rb") as archive_file:
+            self._map = mmap.mmap(archive_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self._snapshot_interval, self._game_count, self._index_offset = HEADER.unpack_from(self._map)
+
+        if magic != MAGIC or version not in (1, VERSION):
+            self._map.close()
+            raise ValueError("Not a game archive, or a version that can not be read.")
+
+        self._version = version
+
+    def __getstate__(self):
+        """
+        Returns the state to pickle, only the path of the archive, since the map can not be pickled.
+        """
+
+        return {"_path": self._path}
+
+    def __setstate__(self, state):
+        """
+        Restores a pickled archive by mapping its file again. Takes the state from __getstate__.
+        """
+
+        self._path = state["_path"]
+        self._open()
+
+    def __enter__(self):
+        """
+        Returns the archive for a with statement, which closes it at the end.
+        """
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Closes the archive at the end of a with statement. Returns nothing.
+        """
+
+        self.close()
+
+    def __len__(self):
+        """
+        Returns the number of games in the archive as an integer.
+        """
+
+        return self._game_count
+
+    def close(self):
+        """
+        Unmaps the archive file. Returns nothing.
+        """
+
+        self._map.close()
+
+    def get_game_count(self):
+        """
+        Returns the number of games in the archive as an integer. Takes no parameters.
+        """
+
+        return self._game_count
+
+    def get_snapshot_interval(self):
+        """
+        Returns the number of plies between snapshots as an integer. Takes no parameters.
+        """
+
+        return self._snapshot_interval
+
+    def get_players(self, game_index):
+        """
+        Returns the (name, color) of player one and player two of a game as a tuple of two tuples. Takes the
+        index of the game as an integer.
+        """
+
+        player_one, player_two, ko_rule, first_event = read_header(self._map, self._entry(game_index)[0])
+        return player_one, player_two
+
+    def get_ply_count(self, game_index):
+        """
+        Returns the number of plies, moves and passes, in a game as an integer. Takes the index of the game.
+        """
+
+        return self._entry(game_index)[3]
+
+    def get_record(self, game_index):
+        """
+        Returns a game as a KubaRecord.GameRecord. Only that game is copied out of the archive. Takes the index
+        of the game as an integer.
+        """
+
+        record_offset, first_event, snapshots_offset, plies = self._entry(game_index)
+        player_one, player_two, ko_rule, events_offset = read_header(self._map, record_offset)
+        return GameRecord(player_one, player_two, self._map[events_offset:snapshots_offset - 1], ko_rule)
+
+    def get_snapshots(self, game_index):
+        """
+        Returns the snapshots of a game, the state after every snapshot interval of plies, as a memoryview of
+        the mapped file one STATE_SIZE state after another, without copying them. The archive can not be closed
+        while the memoryview is held. Takes the index of the game as an integer.
+        """
+
+        record_offset, first_event, snapshots_offset, plies = self._entry(game_index)
+        count = plies // self._snapshot_interval
+        return memoryview(self._map)[snapshots_offset:snapshots_offset + count * STATE_SIZE]
+
+    def get_game(self, game_index, ply=None, engine="grid"):
+        """
+        Returns a new KubaGame on the given board engine as it was after the given number of plies of a game,
+        or at the end of the game when ply is None. The nearest snapshot and its position history are loaded
+        and fewer than the snapshot interval of moves are replayed after it, so the game is the same as one
+        replayed from the start, Ko rule and all. Takes the index of the game and the ply as integers.
+        """
+
+        record_offset, first_event, snapshots_offset, plies = self._entry(game_index)
+
+        if ply is None:
+            ply = plies
+        elif not 0 <= ply <= plies:
+            raise IndexError("The game has no ply " + str(ply) + ".")
+
+        player_one, player_two, ko_rule, events_offset = read_header(self._map, record_offset)
+        game = KubaGame(player_one, player_two, engine, ko_rule)
+        snapshot = ply // self._snapshot_interval
+
+        # A version 1 archive has no histories to go with its snapshots for the Ko rule
+        if self._version == 1 and ko_rule != "none":
+            snapshot = 0
+
+        if snapshot == 0:
+            start = events_offset               # Replays from the start, including who moved first
+        else:
+            count = plies // self._snapshot_interval
+            offset = snapshots_offset + (snapshot - 1) * STATE_SIZE
+            game.set_state_bytes(self._map[offset:offset + STATE_SIZE])
+
+            if self._version != 1:
+                counts_offset = snapshots_offset + count * STATE_SIZE
+                history_offset = counts_offset + count * HISTORY_COUNT.size
+                history_count, = HISTORY_COUNT.unpack_from(self._map, counts_offset + (snapshot - 1) * 4)
+                game.set_history_bytes(self._map[history_offset:history_offset + history_count * 9])
+
+            start = first_event + snapshot * self._snapshot_interval
+
+        for event in replay_events(game, self._map[start:first_event + ply]):
+            pass
+
+        return game
+
+    def _entry(self, game_index):
+        """
+        Returns the index entry of a game as a tuple of the record offset, first event offset, snapshots offset
+        and ply count.
+        """
+
+        if not 0 <= game_index < self._game_count:
+            raise IndexError("The archive has no game " + str(game_index) + ".")
+
+        return INDEX_ENTRY.unpack_from(self._map, self._index_offset + game_index * INDEX_ENTRY.size)
+
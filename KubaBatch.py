@@ -0,0 +1,355 @@
+# Author: Matt Sanders
+# Date: 10/18/2026
+# Description: This program plays many games of 'Kuba' at once with NumPy arrays, using the same rules as
+#              the KubaGame class in KubaGame.py. It needs NumPy, which the rest of the game does not.
+
+import numpy as np
+
+EMPTY, WHITE, BLACK, RED = 0, 1, 2, 3       # Codes of the values on a batch board
+CODES = {"X": EMPTY, "W": WHITE, "B": BLACK, "R": RED}
+DIRECTIONS = ("R", "L", "B", "F")           # Direction of each direction index, the same order as legal_moves
+CELLS = 49                                  # Move codes are direction index * CELLS + cell
+
+
+def _build_lines():
+    """
+    Builds the lookup tables for pushes. For each direction it returns the cells of the 7 lines a push in
+    that direction can move along, ordered so the push goes toward the end of the line, and for each cell
+    the line it is on and its position in that line.
+    """
+
+    lines = np.zeros((4, 7, 7), dtype=np.intp)
+    line_of = np.zeros((4, 49), dtype=np.intp)
+    position_of = np.zeros((4, 49), dtype=np.intp)
+
+    for index in range(7):
+        for position in range(7):
+            lines[0, index, position] = index * 7 + position          # Right, along a row
+            lines[1, index, position] = index * 7 + 6 - position      # Left, along a row backward
+            lines[2, index, position] = position * 7 + index          # Backward, down a column
+            lines[3, index, position] = (6 - position) * 7 + index    # Forward, up a column
+
+    for direction in range(4):
+        for index in range(7):
+            line_of[direction, lines[direction, index]] = index
+            position_of[direction, lines[direction, index]] = np.arange(7)
+
+    return lines, line_of, position_of
+
+
+_LINES, _LINE_OF, _POSITION_OF = _build_lines()
+_OPPOSITE = np.array([1, 0, 3, 2])          # Index of the opposite of each direction
+_INDEX = np.arange(7)
+
+
+def _orient(boards, direction):
+    """
+    Returns a (games, line, position) view of the (games, 7, 7) boards in which a push in the given direction
+    index moves toward the end of each line, matching the lines of _LINES.
+    """
+
+    if direction == 0:
+        return boards
+    elif direction == 1:
+        return boards[..., ::-1]
+    elif direction == 2:
+        return boards.transpose(0, 2, 1)
+
+    return boards.transpose(0, 2, 1)[..., ::-1]
+
+
+def _unorient(lines, direction):
+    """
+    Returns a (games, 7, 7) board view of an array laid out by _orient for the given direction index.
+    """
+
+    if direction == 0:
+        return lines
+    elif direction == 1:
+        return lines[..., ::-1]
+    elif direction == 2:
+        return lines.transpose(0, 2, 1)
+
+    return lines[..., ::-1].transpose(0, 2, 1)
+
+
+def _start_board():
+    """
+    Returns the standard starting layout as a 7x7 array of codes.
+    """
+
+    from KubaGame import Board
+
+    return np.array([[CODES[value] for value in row] for row in Board().get_grid()], dtype=np.int8)
+
+
+def legal_move_masks(boards, colors, last_cells, last_directions):
+    """
+    Works out the legal moves of many positions at once with the rules of make_move. Takes a (positions, 7, 7)
+    array of board codes, the color code to move in each position, and the cell and direction index of the
+    opponent's last move in each, -1 if they have not moved. Returns two (positions, 4, 49) arrays: a mask that
+    is True for each legal (direction index, cell) move, and the code of the value each push would knock off,
+    EMPTY if nothing would fall off.
+    """
+
+    games = len(boards)
+    legal = np.zeros((games, 4, 49), dtype=bool)
+    removed = np.zeros((games, 4, 49), dtype=np.int8)
+    color = np.asarray(colors).astype(np.int8)[:, None, None]
+    last_cells = np.asarray(last_cells)
+    last_directions = np.asarray(last_directions)
+
+    for direction in range(4):
+        lines = np.ascontiguousarray(_orient(boards, direction))  # (games, line, position)
+        empty = lines == EMPTY
+
+        # A marble can be pushed if it is at the start of its line or the space behind it is empty
+        access = np.ones_like(empty)
+        access[..., 1:] = empty[..., :-1]
+
+        # Whether there is an empty space at or after each position; if not, the last value falls off
+        open_ahead = empty.copy()
+        for position in range(5, -1, -1):
+            open_ahead[..., position] |= open_ahead[..., position + 1]
+
+        knocked_off = np.where(open_ahead, EMPTY, lines[..., 6:7])
+        allowed = (lines == color) & access & (knocked_off != color)
+
+        # Moves that push back along the line the opponent just pushed, up to the space they moved from
+        undoing = np.nonzero((last_cells >= 0) & (_OPPOSITE[last_directions] == direction))[0]
+
+        if len(undoing):
+            line = _LINE_OF[direction, last_cells[undoing]]
+            position = _POSITION_OF[direction, last_cells[undoing]]
+            line_empty = empty[undoing, line]
+            last_gap = np.where(line_empty & (_INDEX < position[:, None]), _INDEX, -1).max(axis=1)
+            blocked = (_INDEX > last_gap[:, None]) & (_INDEX <= position[:, None])
+            allowed[undoing[:, None], line[:, None], _INDEX] &= ~blocked
+
+        legal[:, direction] = _unorient(allowed, direction).reshape(games, 49)
+        removed[:, direction] = _unorient(knocked_off, direction).reshape(games, 49)
+
+    return legal, removed
+
+
+def random_policy(seed=0):
+    """
+    Returns a policy that picks one of the legal moves of each game at random. A policy takes the legal
+    move mask and the removed value array from BatchSimulator.legal_moves and the simulator, and returns
+    the move code, direction index * CELLS + cell, of each game, or -1 for a game with no move.
+    """
+
+    generator = np.random.default_rng(seed)
+
+    def policy(legal, removed, simulator):
+        codes = np.full(len(legal), -1, dtype=np.intp)
+        playing = np.nonzero(~simulator.get_done())[0]
+        flat = legal[playing].reshape(len(playing), -1)
+        choice = np.argmax(generator.random(flat.shape, dtype=np.float32) * flat, axis=1)
+        codes[playing] = np.where(flat.any(axis=1), choice, -1)
+        return codes
+
+    return policy
+
+
+def greedy_policy(seed=0):
+    """
+    Returns a policy that captures a red marble if it can, otherwise knocks off an opponent's marble if it
+    can, and otherwise picks a legal move at random. See random_policy for how policies are called.
+    """
+
+    generator = np.random.default_rng(seed)
+
+    def policy(legal, removed, simulator):
+        codes = np.full(len(legal), -1, dtype=np.intp)
+        playing = np.nonzero(~simulator.get_done())[0]
+        legal = legal[playing]
+        removed = removed[playing]
+        opponent = (2 - simulator.get_turns()[playing]).astype(np.int8)[:, None, None]
+        score = generator.random(legal.shape, dtype=np.float32) + 2 * (removed == RED) + (removed == opponent)
+        flat = (score * legal).reshape(len(playing), -1)
+        codes[playing] = np.where(flat.any(axis=1), np.argmax(flat, axis=1), -1)
+        return codes
+
+    return policy
+
+
+class BatchSimulator:
+    """
+    Plays a batch of games at once. The boards are one (games, 7, 7) array of codes and every rule of
+    make_move (marble access, not undoing the opponent's last move, not pushing off your own marble, and the
+    capture and knock off win conditions) is worked out for all the games together with array operations.
+    Player 0 has the white marbles and player 1 the black. It takes the number of games, the seed used to
+    pick who moves first in each game, and the number of moves after which an unfinished game is stopped.
+    """
+
+    def __init__(self, games, seed=0, max_plies=1000, red_to_win=7):
+        """
+        Initializes every game to the standard starting layout, the captured and on board marble counts, the
+        last moves, who moves first and the winners. Returns nothing.
+        """
+
+        generator = np.random.default_rng(seed)
+        self._games = games
+        self._max_plies = max_plies
+        self._red_to_win = red_to_win
+        self._boards = np.broadcast_to(_start_board(), (games, 7, 7)).copy()
+        self._captured = np.zeros((games, 2), dtype=np.int16)             # Red marbles captured by each player
+        self._marble_count = np.tile(np.array([8, 8, 13], dtype=np.int16), (games, 1))   # W, B, R on the board
+        self._last_cell = np.full((games, 2), -1, dtype=np.int16)         # Cell of each player's last move
+        self._last_direction = np.full((games, 2), -1, dtype=np.int16)    # Direction index of that move
+        self._turn = generator.integers(0, 2, size=games).astype(np.int8)
+        self._first_player = self._turn.copy()
+        self._winner = np.full(games, -1, dtype=np.int8)
+        self._plies = np.zeros(games, dtype=np.int32)
+        self._done = np.zeros(games, dtype=bool)
+
+    def get_boards(self):
+        """
+        Returns the (games, 7, 7) array of board codes; EMPTY, WHITE, BLACK or RED. Takes no parameters.
+        """
+
+        return self._boards
+
+    def get_turns(self):
+        """
+        Returns an array of the player, 0 or 1, whose turn it is in each game. Takes no parameters.
+        """
+
+        return self._turn
+
+    def get_first_players(self):
+        """
+        Returns an array of the player, 0 or 1, who moved first in each game. Takes no parameters.
+        """
+
+        return self._first_player
+
+    def get_last_moves(self):
+        """
+        Returns the arrays of the cell and direction index of each player's last move in each game, both
+        shaped (games, 2), with -1 for a player who has not moved. Takes no parameters.
+        """
+
+        return self._last_cell, self._last_direction
+
+    def get_done(self):
+        """
+        Returns an array that is True for each game that is over. Takes no parameters.
+        """
+
+        return self._done
+
+    def get_results(self):
+        """
+        Returns a dictionary of arrays with the winner of each game (0, 1, or -1 if there is none), the red
+        marbles captured by each player, the white, black and red marbles left on the board, and the number of
+        moves made. Takes no parameters.
+        """
+
+        return {"winner": self._winner.copy(), "captured": self._captured.copy(),
+                "marble_count": self._marble_count.copy(), "plies": self._plies.copy()}
+
+    def legal_moves(self):
+        """
+        Returns two (games, 4, 49) arrays for the player whose turn it is in each game: a mask that is True
+        for each legal (direction index, cell) move, and the code of the value each push would knock off,
+        EMPTY if nothing would fall off. Games that are over have no legal moves. Takes no parameters.
+        """
+
+        playing = np.nonzero(~self._done)[0]
+        opponent = 1 - self._turn.astype(np.intp)
+        rows = np.arange(self._games)
+        last_cell = self._last_cell[rows, opponent]
+        last_direction = self._last_direction[rows, opponent]
+
+        # Only the games still being played are worked on
+        if len(playing) == self._games:
+            return legal_move_masks(self._boards, self._turn + 1, last_cell, last_direction)
+
+        legal = np.zeros((self._games, 4, 49), dtype=bool)
+        removed = np.zeros((self._games, 4, 49), dtype=np.int8)
+        legal[playing], removed[playing] = legal_move_masks(self._boards[playing], self._turn[playing] + 1,
+                                                            last_cell[playing], last_direction[playing])
+        return legal, removed
+
+    def step(self, policy):
+        """
+        Makes one move in every game that is not over, using the policy to choose them, and returns the array
+        of move codes, direction index * CELLS + cell, that were made, -1 for games that did not move. A game whose
+        player has no legal move is stopped without a winner.
+        """
+
+        legal, removed = self.legal_moves()
+        codes = np.asarray(policy(legal, removed, self), dtype=np.intp)
+        active = ~self._done
+        codes = np.where(active, codes, -1)
+
+        stuck = active & (codes < 0)
+        self._done |= stuck
+
+        moving = np.nonzero(codes >= 0)[0]
+        if len(moving):
+            self._push(moving, codes[moving] % CELLS, codes[moving] // CELLS)
+
+        return codes
+
+    def run(self, policy=None):
+        """
+        Plays every game until it is over or reaches the move limit and returns get_results. Takes the
+        policy to choose moves with, random_policy() if None.
+        """
+
+        if policy is None:
+            policy = random_policy()
+
+        while not self._done.all():
+            self.step(policy)
+
+        return self.get_results()
+
+    def _push(self, games, cells, directions):
+        """
+        Pushes the given cell in the given direction index in each of the given games, and updates the
+        counts, last moves, turns and winners.
+        """
+
+        flat = self._boards.reshape(self._games, 49)
+        line_cells = _LINES[directions, _LINE_OF[directions, cells]]      # (moves, 7)
+        position = _POSITION_OF[directions, cells]
+        values = flat[games[:, None], line_cells]
+
+        # The push stops at the first empty space in front of the marble, or runs off the end of the line
+        gaps = (values == EMPTY) & (_INDEX >= position[:, None])
+        has_gap = gaps.any(axis=1)
+        end = np.where(has_gap, gaps.argmax(axis=1), 6)
+        knocked_off = np.where(has_gap, EMPTY, values[:, 6])
+
+        source = np.where((_INDEX > position[:, None]) & (_INDEX <= end[:, None]), _INDEX - 1, _INDEX)
+        shifted = np.take_along_axis(values, source, axis=1)
+        shifted[np.arange(len(games)), position] = EMPTY
+        flat[games[:, None], line_cells] = shifted
+
+        mover = self._turn[games].astype(np.intp)
+
+        # Red marbles knocked off are captured by the player who pushed them
+        red = knocked_off == RED
+        self._captured[games[red], mover[red]] += 1
+        self._marble_count[games[red], 2] -= 1
+        captured_win = red & (self._captured[games, mover] >= self._red_to_win)
+
+        # Opponent's marbles knocked off leave the board
+        marble = (knocked_off == WHITE) | (knocked_off == BLACK)
+        color_index = knocked_off[marble].astype(np.intp) - 1
+        self._marble_count[games[marble], color_index] -= 1
+        eliminated = np.zeros(len(games), dtype=bool)
+        eliminated[marble] = self._marble_count[games[marble], color_index] == 0
+
+        self._last_cell[games, mover] = cells
+        self._last_direction[games, mover] = directions
+        self._turn[games] = 1 - mover
+        self._plies[games] += 1
+
+        won = captured_win | eliminated
+        self._winner[games[won]] = mover[won]
+        self._done[games] |= won | (self._plies[games] >= self._max_plies)
@@ -0,0 +1,354 @@
+# Author: Matt Sanders
+# Date: 10/18/2026
+# Description: This program measures the speed and memory use of the KubaGame class in KubaGame.py with fixed
+#              seeds, writes the results as JSON and compares them with a saved baseline to find regressions.
+
+import argparse
+import gc
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+from KubaGame import KubaGame
+
+VERSION = 1
+DIRECTIONS = ("R", "L", "B", "F")
+_PLAYERS = (("A", "W"), ("B", "B"))
+
+
+def _new_game(engine):
+    """
+    Returns a new KubaGame between the benchmark's players on the given board engine.
+    """
+
+    return KubaGame(_PLAYERS[0], _PLAYERS[1], engine)
+
+
+def _mover(game):
+    """
+    Returns the name of the player to move, player one before the first move.
+    """
+
+    return game.get_current_turn() or _PLAYERS[0][0]
+
+
+def _play_random(game, rng, max_plies):
+    """
+    Plays random legal moves until the game is won, the player to move is stuck or max_plies moves were made.
+    Returns the number of moves made.
+    """
+
+    for ply in range(max_plies):
+        moves = list(game.legal_moves(_mover(game)))
+
+        if not moves or game.get_winner() is not None:
+            return ply
+
+        game.make_move(_mover(game), *rng.choice(moves))
+
+    return max_plies
+
+
+def sample_positions(engine="grid", seed=0, count=200, max_plies=60):
+    """
+    Returns positions reached by random play as a list of get_state_bytes results. The same seed always
+    gives the same positions. Takes the board engine, the seed, the number of positions and the most plies
+    of each random game they are taken from.
+    """
+
+    rng = random.Random(seed)
+    positions = []
+
+    while len(positions) < count:
+        game = _new_game(engine)
+
+        for _ in range(rng.randrange(max_plies)):
+            if _play_random(game, rng, 1) == 0:
+                break
+
+        if game.get_winner() is None:
+            positions.append(game.get_state_bytes())
+
+    return positions
+
+
+def _summary(samples, unit):
+    """
+    Returns the median and 95th percentile of timings in nanoseconds as a dictionary of metrics in the unit,
+    'us' or 'ns'.
+    """
+
+    scale = 1000.0 if unit == "us" else 1.0
+    samples = sorted(samples)
+    return {"median_" + unit: _metric(statistics.median(samples) / scale, unit),
+            "p95_" + unit: _metric(samples[int(len(samples) * 0.95)] / scale, unit)}
+
+
+def _metric(value, unit, better="lower"):
+    """
+    Returns one metric as a dictionary of its value rounded to 4 digits, its unit and whether a lower or higher
+    value is better.
+    """
+
+    return {"value": float("%.4g" % value), "unit": unit, "better": better}
+
+
+def bench_make_move(engine="grid", seed=0, count=200):
+    """
+    Times make_move for legal moves of each direction from sampled positions. Returns a dictionary of the
+    median and 95th percentile microseconds for each direction.
+    """
+
+    rng = random.Random(seed)
+    game = _new_game(engine)
+    timings = {direction: [] for direction in DIRECTIONS}
+
+    for state in sample_positions(engine, seed, count):
+        game.set_state_bytes(state)
+        player = _mover(game)
+        moves = list(game.legal_moves(player))
+
+        for direction in DIRECTIONS:
+            choices = [move for move in moves if move[1] == direction]
+
+            if choices:
+                coordinates = rng.choice(choices)[0]
+                game.set_state_bytes(state)
+                start = time.perf_counter_ns()
+                game.make_move(player, coordinates, direction)
+                timings[direction].append(time.perf_counter_ns() - start)
+
+    results = {}
+
+    for direction in DIRECTIONS:
+        for name, metric in _summary(timings[direction], "us").items():
+            results["make_move." + direction + "." + name] = metric
+
+    return results
+
+
+def bench_checks(engine="grid", seed=0, count=200):
+    """
+    Times check_marble_access for every cell and direction, and reverse_opponents_move for every marble of the
+    player to move in every direction against the opponent's last move, in sampled positions. Returns a
+    dictionary of the median and 95th percentile nanoseconds per call of each.
+    """
+
+    game = _new_game(engine)
+    cells = [((row, column), direction) for row in range(7) for column in range(7) for direction in DIRECTIONS]
+    access = []
+    reverse = []
+
+    for state in sample_positions(engine, seed, count):
+        game.set_state_bytes(state)
+        player = _mover(game)
+        opponent = _PLAYERS[1][0] if player == _PLAYERS[0][0] else _PLAYERS[0][0]
+        opponent_move = game.get_last_move(opponent)
+
+        start = time.perf_counter_ns()
+        for coordinates, direction in cells:
+            game.check_marble_access(coordinates, direction)
+        access.append((time.perf_counter_ns() - start) / len(cells))
+
+        if opponent_move is not None:
+            color = game.get_player_color(player)
+            own = [(coordinates, direction) for coordinates, direction in cells
+                   if game.get_marble(coordinates) == color]
+            start = time.perf_counter_ns()
+            for coordinates, direction in own:
+                game.reverse_opponents_move(coordinates, direction, opponent_move)
+            reverse.append((time.perf_counter_ns() - start) / len(own))
+
+    results = {}
+
+    for name, metric in _summary(access, "ns").items():
+        results["check_marble_access." + name] = metric
+
+    for name, metric in _summary(reverse, "ns").items():
+        results["reverse_opponents_move." + name] = metric
+
+    return results
+
+
+def bench_column_moves(engine="grid", seed=0, count=200):
+    """
+    Times move_forward and move_backward, which rebuild a column of the board, for marbles of the player to
+    move in sampled positions. Returns a dictionary of the median and 95th percentile microseconds of each.
+    """
+
+    rng = random.Random(seed)
+    game = _new_game(engine)
+    timings = {"move_forward": [], "move_backward": []}
+
+    for state in sample_positions(engine, seed, count):
+        game.set_state_bytes(state)
+        color = game.get_player_color(_mover(game))
+        marbles = [(row, column) for row in range(7) for column in range(7) if game.get_marble((row, column)) == color]
+
+        for name in timings:
+            game.set_state_bytes(state)
+            coordinates = rng.choice(marbles)
+            start = time.perf_counter_ns()
+            getattr(game, name)(coordinates)
+            timings[name].append(time.perf_counter_ns() - start)
+
+    results = {}
+
+    for name, samples in timings.items():
+        for summary, metric in _summary(samples, "us").items():
+            results[name + "." + summary] = metric
+
+    return results
+
+
+def bench_games(engine="grid", seed=0, games=50, max_plies=300):
+    """
+    Plays random games from the start, each until it is won or max_plies moves were made. Returns a dictionary
+    of the games and moves played per second.
+    """
+
+    rng = random.Random(seed)
+    plies = 0
+    start = time.perf_counter()
+
+    for _ in range(games):
+        plies += _play_random(_new_game(engine), rng, max_plies)
+
+    seconds = time.perf_counter() - start
+    return {"random_games.games_per_second": _metric(games / seconds, "games/s", "higher"),
+            "random_games.moves_per_second": _metric(plies / seconds, "moves/s", "higher")}
+
+
+def bench_memory(engine="grid", seed=0, games=100, plies=40):
+    """
+    Measures the memory of many games kept at once, each played for a number of random moves, with
+    tracemalloc. Returns a dictionary of the peak bytes per game.
+    """
+
+    rng = random.Random(seed)
+    tracemalloc.start()
+
+    try:
+        kept = []
+
+        for _ in range(games):
+            game = _new_game(engine)
+            _play_random(game, rng, plies)
+            kept.append(game)
+
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {"memory.peak_bytes_per_game": _metric(peak / games, "bytes")}
+
+
+BENCHMARKS = {"make_move": bench_make_move, "checks": bench_checks, "column_moves": bench_column_moves,
+              "random_games": bench_games, "memory": bench_memory}
+
+
+def run_benchmarks(engines=("grid", "bitboard"), seed=0, names=None, repeat=5, progress=None):
+    """
+    Runs the benchmarks on each board engine and returns the report as a dictionary: the version, seed and
+    machine it ran on and the metrics, each keyed 'engine.benchmark.metric' with its value, unit and whether
+    lower or higher is better. Each benchmark runs repeat times with the garbage collector off and keeps the
+    best value of each metric, which is the one least disturbed by the rest of the machine. Takes the engines,
+    the seed, optionally the names of the benchmarks in BENCHMARKS to run, all of them if None, the repeats
+    and a function called with each engine and benchmark name before it runs.
+    """
+
+    metrics = {}
+
+    for engine in engines:
+        for name, benchmark in BENCHMARKS.items():
+            if names is not None and name not in names:
+                continue
+
+            if progress is not None:
+                progress(engine, name)
+
+            for _ in range(repeat):
+                gc.collect()
+                gc.disable()
+
+                try:
+                    results = benchmark(engine, seed)
+                finally:
+                    gc.enable()
+
+                for key, metric in results.items():
+                    best = metrics.setdefault(engine + "." + key, metric)
+
+                    if (metric["value"] < best["value"]) == (metric["better"] == "lower"):
+                        metrics[engine + "." + key] = metric
+
+    return {"version": VERSION, "seed": seed, "repeat": repeat, "python": platform.python_version(),
+            "implementation": platform.python_implementation(), "machine": platform.machine(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "metrics": metrics}
+
+
+def compare(report, baseline, threshold=0.20):
+    """
+    Compares the metrics of a report with a baseline report. Returns a list of dictionaries, one for each metric
+    in both, of its key, the baseline and current values, the relative change and whether it is a regression,
+    which is a change of more than threshold in the worse direction.
+    """
+
+    rows = []
+
+    for key, metric in sorted(report["metrics"].items()):
+        if key not in baseline["metrics"]:
+            continue
+
+        before = baseline["metrics"][key]["value"]
+        change = (metric["value"] - before) / before if before else 0.0
+        worse = change if metric["better"] == "lower" else -change
+        rows.append({"metric": key, "baseline": before, "current": metric["value"], "change": round(change, 4),
+                     "regression": worse > threshold})
+
+    return rows
+
+
+def main():
+    """
+    Runs the benchmarks from the command line. Prints the report as JSON, or a comparison with a baseline,
+    and exits with status 1 if a metric regressed.
+    """
+
+    parser = argparse.ArgumentParser(description="Benchmarks the KubaGame class.")
+    parser.add_argument("--engine", nargs="+", default=["grid", "bitboard"], choices=["grid", "bitboard"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="benchmarks to run")
+    parser.add_argument("--repeat", type=int, default=5, help="runs of each benchmark, keeping the best")
+    parser.add_argument("--output", help="file to write the report to as JSON, such as a new baseline")
+    parser.add_argument("--compare", help="baseline report to compare with")
+    parser.add_argument("--threshold", type=float, default=0.20, help="relative change that counts as a regression")
+    arguments = parser.parse_args()
+
+    report = run_benchmarks(arguments.engine, arguments.seed, arguments.only, arguments.repeat,
+                            lambda engine, name: print(engine, name, file=sys.stderr))
+
+    if arguments.output:
+        with open(arguments.output, "w") as output_file:
+            json.dump(report, output_file, indent=2, sort_keys=True)
+
+    if not arguments.compare:
+        print(json.dumps(report, indent=2, sort_keys=True))
+        return
+
+    with open(arguments.compare) as baseline_file:
+        rows = compare(report, json.load(baseline_file), arguments.threshold)
+
+    regressions = [row for row in rows if row["regression"]]
+    print(json.dumps({"threshold": arguments.threshold, "regressions": regressions, "metrics": rows}, indent=2))
+
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+# Author: Matt Sanders
+# Date: 10/18/2026
+# Description: This program builds an opening book of the best moves of the first plies of 'Kuba' from
+#              KubaGame.py ahead of time, and reads it back through mmap so a move is found in one lookup.
+
+import argparse
+import mmap
+import struct
+import time
+
+from KubaAI import AlphaBetaSearch
+from KubaGame import KubaGame
+from KubaSymmetry import canonical_position, inverse_transform, key_of, transform_move
+
+# A book file is the header followed by a hash table of slots, a power of two of them. Each position is kept
+# once under the key of its canonical form from KubaSymmetry.py, in the first free slot from key & (slots - 1)
+# on. A slot with key 0 is empty. The move of a slot is on the canonical board, as cell * 4 + direction index.
+MAGIC = b"KUBABOOK"
+VERSION = 1
+HEADER = struct.Struct("<8sIIIII")  # magic, version, slots, entries, search depth, plies
+SLOT = struct.Struct("<QiBB2x")     # key, score for the player to move, move, search depth
+_MOVE_ORDER = ("R", "L", "B", "F")
+
+
+def build_opening_book(path, plies=4, search_depth=4, engine="bitboard", progress=None):
+    """
+    Builds an opening book of every position reachable in the given number of plies from the starting layout
+    and writes it to a file. The best move of each position is found with an alpha-beta search to
+    search_depth. Positions that are the same under a symmetry are searched and kept once. Takes the path,
+    the plies, the search depth, the board engine to search with and optionally a function called with the
+    ply and the number of positions searched so far. Returns the number of positions in the book.
+    """
+
+    search = AlphaBetaSearch()          # One table for every position, since they share many lines
+    entries = {}
+    level = [KubaGame(("A", "W"), ("B", "B"), engine)]
+
+    for ply in range(plies + 1):
+        next_level = []
+
+        for game in level:
+            # Nobody has the turn before the first move, so either player can make it
+            movers = [game.get_current_turn()] if game.get_current_turn() is not None else ["A", "B"]
+
+            for player_name in movers:
+                canonical, transform = canonical_position(game, player_name)
+                key = key_of(canonical)
+
+                if key in entries or game.get_winner() is not None:
+                    continue
+
+                move = search.search(game, player_name, None, search_depth)
+
+                if move is None:
+                    continue
+
+                canonical_move = transform_move(move, transform)
+                code = (canonical_move[0][0] * 7 + canonical_move[0][1]) * 4 + _MOVE_ORDER.index(canonical_move[1])
+                entries[key] = (search.get_stats()["score"], code)
+
+                if ply < plies:
+                    # A fork keeps the Ko rule and the positions before, which decide the child's legal moves
+                    for child_move in list(game.legal_moves(player_name)):
+                        child = game.fork()
+                        child.apply_move(player_name, *child_move)
+                        next_level.append(child)
+
+        if progress is not None:
+            progress(ply, len(entries))
+
+        level = next_level
+
+    _write_book(path, entries, search_depth, plies)
+    return len(entries)
+
+
+def _write_book(path, entries, search_depth, plies):
+    """
+    Writes the entries, a dictionary of key to (score, move code), to a book file with a hash table at most
+    half full.
+    """
+
+    slots = 1
+
+    while slots < 2 * len(entries):
+        slots *= 2
+
+    table = bytearray(slots * SLOT.size)
+
+    for key, (score, code) in entries.items():
+        slot = key & (slots - 1)
+
+        while SLOT.unpack_from(table, slot * SLOT.size)[0] != 0:
+            slot = (slot + 1) & (slots - 1)
+
+        SLOT.pack_into(table, slot * SLOT.size, key, score, code, search_depth)
+
+    with open(path, "wb") as book_file:
+        book_file.write(HEADER.pack(MAGIC, VERSION, slots, len(entries), search_depth, plies))
+        book_file.write(table)
+
+
+class OpeningBook:
+    """
+    Reads an opening book file written by build_opening_book through a read only mmap, so books of any size
+    load at once and are shared between processes. get_move finds the book move of a position with one hash
+    table lookup. It takes the path of the book.
+    """
+
+    def __init__(self, path):
+        """
+        Maps the book file and reads its header. Returns nothing.
+        """
+
+        with open(path, "rb") as book_file:
+            self._map = mmap.mmap(book_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self._slots, self._entries, self._search_depth, self._plies = HEADER.unpack_from(self._map)
+
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise ValueError("Not an opening book, or a version that can not be read.")
+
+    def __len__(self):
+        """
+        Returns the number of positions in the book as an integer.
+        """
+
+        return self._entries
+
+    def close(self):
+        """
+        Unmaps the book file. Returns nothing.
+        """
+
+        self._map.close()
+
+    def get_plies(self):
+        """
+        Returns the number of plies from the start the book covers as an integer. Takes no parameters.
+        """
+
+        return self._plies
+
+    def get_search_depth(self):
+        """
+        Returns the depth the book's moves were searched to as an integer. Takes no parameters.
+        """
+
+        return self._search_depth
+
+    def get_entry(self, game, player_name):
+        """
+        Returns the book's move for the player in the game's position and its score, as a tuple of the move,
+        ((row, column), direction), and the score, or None if the position is not in the book. The book only
+        holds positions of the 7x7 board, so games of any other size get None.
+        """
+
+        if game.get_size() != 7:
+            return None
+
+        canonical, transform = canonical_position(game, player_name)
+        key = key_of(canonical)
+        slot = key & (self._slots - 1)
+
+        while True:
+            slot_key, score, code, depth = SLOT.unpack_from(self._map, HEADER.size + slot * SLOT.size)
+
+            if slot_key == 0:
+                return None
+
+            if slot_key == key:
+                move = (divmod(code // 4, 7), _MOVE_ORDER[code % 4])
+                return transform_move(move, inverse_transform(transform)), score
+
+            slot = (slot + 1) & (self._slots - 1)
+
+    def get_move(self, game, player_name):
+        """
+        Returns the book's move for the player in the game's position, ((row, column), direction), or None if
+        the position is not in the book or the move can not be made right now.
+        """
+
+        entry = self.get_entry(game, player_name)
+
+        if entry is None or entry[0] not in game.legal_moves(player_name):
+            return None
+
+        return entry[0]
+
+
+def main():
+    """
+    Builds an opening book from the command line.
+    """
+
+    parser = argparse.ArgumentParser(description="Builds an opening book for Kuba.")
+    parser.add_argument("path")
+    parser.add_argument("--plies", type=int, default=4, help="plies from the start to cover")
+    parser.add_argument("--depth", type=int, default=4, help="search depth of each book move")
+    arguments = parser.parse_args()
+
+    start = time.perf_counter()
+    positions = build_opening_book(arguments.path, arguments.plies, arguments.depth,
+                                   progress=lambda ply, count: print("ply", ply, "positions", count, end="\r"))
+    print("\n" + str(positions), "positions in", round(time.perf_counter() - start, 1), "seconds")
+
+
+if __name__ == "__main__":
+    main()
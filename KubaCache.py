@@ -0,0 +1,355 @@
+# Author: Matt Sanders
+# Date: 10/18/2026
+# Description: This program defines caches of position evaluations and legal move lists for games of 'Kuba'
+#              from KubaGame.py, so positions that many games or searches reach are only worked out once.
+
+import collections
+import random
+import struct
+import zlib
+from multiprocessing import shared_memory
+
+from KubaGame import MAX_BOARD_SIZE
+
+_KEY_SOURCE = random.Random(0x4361636865)
+_CAPTURED_KEYS = [[_KEY_SOURCE.getrandbits(64) for _ in range(14)] for player in range(2)]
+_MOVER_KEYS = {"W": _KEY_SOURCE.getrandbits(64), "B": _KEY_SOURCE.getrandbits(64)}
+
+# Larger boards can have more red marbles to capture; their keys come last so the 7x7 keys stay the same
+for _keys in _CAPTURED_KEYS:
+    _keys += [_KEY_SOURCE.getrandbits(64) for _ in range(MAX_BOARD_SIZE * MAX_BOARD_SIZE + 1 - len(_keys))]
+_DIRECTIONS = ("R", "L", "B", "F")
+
+
+def position_key(game):
+    """
+    Returns a 64-bit key of the game's position as an integer. It is the game's Zobrist hash, which covers the
+    marbles on the board, whose turn it is and both last moves, combined with the red marbles each player has
+    captured, so two games get the same key only when every evaluation of them is the same.
+    """
+
+    (player_one, color_one), (player_two, color_two) = game.get_players()
+    return (game.get_hash() ^ _CAPTURED_KEYS[0][game.get_captured(player_one)]
+            ^ _CAPTURED_KEYS[1][game.get_captured(player_two)])
+
+
+def moves_key(game, player_name):
+    """
+    Returns a 64-bit key for the legal moves of the player in the game's position as an integer.
+    """
+
+    return position_key(game) ^ _MOVER_KEYS[game.get_player_color(player_name)]
+
+
+class PositionCache:
+    """
+    Keeps evaluations and legal move lists by position key in one process, forgetting the least recently
+    used entry once it holds max_entries. It counts hits, misses and evictions. It takes the most entries
+    to keep as a parameter.
+    """
+
+    def __init__(self, max_entries=1 << 16):
+        """
+        Initializes the entries and the counters. Returns nothing.
+        """
+
+        self._max_entries = max_entries
+        self._entries = collections.OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get_stats(self):
+        """
+        Returns a dictionary of the entries held, hits, misses, evictions and hit rate. Takes no parameters.
+        """
+
+        lookups = self._hits + self._misses
+        return {"entries": len(self._entries), "hits": self._hits, "misses": self._misses,
+                "evictions": self._evictions, "hit_rate": self._hits / lookups if lookups else 0.0}
+
+    def get_evaluation(self, key):
+        """
+        Returns the evaluation saved for the position key as an integer, or None. Takes the key.
+        """
+
+        return self._get(key)
+
+    def set_evaluation(self, key, value):
+        """
+        Saves the evaluation of the position key. Takes the key and the value as integers and returns nothing.
+        """
+
+        self._set(key, value)
+
+    def get_moves(self, key):
+        """
+        Returns the legal moves saved for the moves key as a tuple of ((row, column), direction) tuples, or
+        None. Takes the key.
+        """
+
+        return self._get(key)
+
+    def set_moves(self, key, moves):
+        """
+        Saves the legal moves of the moves key. Takes the key and the moves and returns nothing.
+        """
+
+        self._set(key, tuple(moves))
+
+    def clear(self):
+        """
+        Removes every entry and resets the counters. Takes no parameters and returns nothing.
+        """
+
+        self._entries.clear()
+        self._hits = self._misses = self._evictions = 0
+
+    def _get(self, key):
+        """
+        Returns the value of a key and marks it as the most recently used, or None, counting a hit or miss.
+        """
+
+        value = self._entries.get(key)
+
+        if value is None:
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        self._entries.move_to_end(key)
+        return value
+
+    def _set(self, key, value):
+        """
+        Saves a value as the most recently used entry, forgetting the least recently used one if it is full.
+        """
+
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+
+        if len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+
+class SharedPositionCache:
+    """
+    Keeps evaluations and legal move lists by position key in a block of shared memory that several processes
+    can use at once. The block is split into buckets of WAYS slots, and a new entry takes the least recently
+    used slot of its bucket. There are no locks: each slot holds a checksum of its contents, and a slot
+    being written by another process at the same time fails the check and counts as a miss. The hit and
+    miss counters belong to each process. The cache is pickled as the name of its block, so a worker
+    process started by the process that made the cache attaches to the same memory when it receives it. It
+    takes the number of slots and optionally the name of an existing block to attach to.
+    """
+
+    WAYS = 4
+    _TICK = struct.Struct("<I")             # Shared clock at the start of the block, counting slot uses
+    _SLOT = struct.Struct("<QQIiB32s")      # key, key check, last used tick, evaluation, move count, moves
+    _EVALUATION = 255                       # Move count of a slot that holds an evaluation
+
+    def __init__(self, slots=1 << 16, name=None):
+        """
+        Creates the block of shared memory, or attaches to the named one, and initializes the counters.
+        Returns nothing.
+        """
+
+        self._slots = max(self.WAYS, slots - slots % self.WAYS)
+        self._size = self._TICK.size + self._slots * self._SLOT.size
+
+        if name is None:
+            self._memory = shared_memory.SharedMemory(create=True, size=self._size)
+            self._memory.buf[:self._size] = bytes(self._size)
+            self._owner = True
+        else:
+            self._memory = _attach(name)
+            self._owner = False
+
+        self._buckets = self._slots // self.WAYS
+        self._hits = 0
+        self._misses = 0
+
+    def __getstate__(self):
+        """
+        Returns the state to pickle, the number of slots and the name of the block of shared memory.
+        """
+
+        return {"slots": self._slots, "name": self._memory.name}
+
+    def __setstate__(self, state):
+        """
+        Restores a pickled cache by attaching to its block of shared memory. Takes the state from __getstate__.
+        """
+
+        self.__init__(state["slots"], state["name"])
+
+    def get_name(self):
+        """
+        Returns the name of the block of shared memory as a string. Takes no parameters.
+        """
+
+        return self._memory.name
+
+    def get_stats(self):
+        """
+        Returns a dictionary of this process's hits, misses and hit rate and the number of slots. Takes no
+        parameters.
+        """
+
+        lookups = self._hits + self._misses
+        return {"slots": self._slots, "hits": self._hits, "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0}
+
+    def get_evaluation(self, key):
+        """
+        Returns the evaluation saved for the position key as an integer, or None. Takes the key.
+        """
+
+        found = self._find(key)
+
+        if found is None or found[1] != self._EVALUATION:
+            return self._miss()
+
+        self._hits += 1
+        return found[0]
+
+    def set_evaluation(self, key, value):
+        """
+        Saves the evaluation of the position key. Takes the key and the value as integers and returns nothing.
+        """
+
+        self._store(key, value, self._EVALUATION, b"")
+
+    def get_moves(self, key):
+        """
+        Returns the legal moves saved for the moves key as a tuple of ((row, column), direction) tuples, or
+        None. Takes the key.
+        """
+
+        found = self._find(key)
+
+        if found is None or found[1] == self._EVALUATION:
+            return self._miss()
+
+        self._hits += 1
+        return tuple((divmod(code // 4, 7), _DIRECTIONS[code % 4]) for code in found[2][:found[1]])
+
+    def set_moves(self, key, moves):
+        """
+        Saves the legal moves of the moves key. A list of more than 32 moves, or with a move beyond the
+        seventh row or column of a larger board, is not saved. Takes the key and the moves and returns nothing.
+        """
+
+        moves = tuple(moves)
+
+        if len(moves) > 32 or any(row >= 7 or column >= 7 for (row, column), direction in moves):
+            return
+
+        codes = bytes((row * 7 + column) * 4 + _DIRECTIONS.index(direction) for (row, column), direction in moves)
+        self._store(key, 0, len(codes), codes)
+
+    def clear(self):
+        """
+        Empties every slot and resets this process's counters. Takes no parameters and returns nothing.
+        """
+
+        self._memory.buf[:self._size] = bytes(self._size)
+        self._hits = self._misses = 0
+
+    def close(self):
+        """
+        Detaches from the shared memory, and frees it if this cache created it. Returns nothing.
+        """
+
+        self._memory.close()
+
+        if self._owner:
+            self._memory.unlink()
+
+    def _miss(self):
+        """
+        Counts a miss and returns None.
+        """
+
+        self._misses += 1
+        return None
+
+    def _next_tick(self):
+        """
+        Advances the shared clock and returns its new value. Two processes can read the same value, which
+        only makes their slots look equally old.
+        """
+
+        tick = (self._TICK.unpack_from(self._memory.buf)[0] + 1) & 0xFFFFFFFF
+        self._TICK.pack_into(self._memory.buf, 0, tick)
+        return tick
+
+    def _check(self, key, tick, value, count, moves):
+        """
+        Returns the checksum saved with a slot's contents.
+        """
+
+        return key ^ zlib.crc32(struct.pack("<Ii", tick, value) + bytes((count,)) + moves)
+
+    def _find(self, key):
+        """
+        Returns the evaluation, move count and moves of the key's slot as a tuple, or None if it is not in
+        its bucket.
+        """
+
+        buffer = self._memory.buf
+        start = (key % self._buckets) * self.WAYS
+
+        for slot in range(start, start + self.WAYS):
+            offset = self._TICK.size + slot * self._SLOT.size
+            slot_key, check, tick, value, count, moves = self._SLOT.unpack_from(buffer, offset)
+
+            if slot_key == key and check == self._check(key, tick, value, count, moves):
+                tick = self._next_tick()
+                self._SLOT.pack_into(buffer, offset, key, self._check(key, tick, value, count, moves), tick, value,
+                                     count, moves)
+                return value, count, moves
+
+        return None
+
+    def _store(self, key, value, count, moves):
+        """
+        Saves a slot in the key's bucket, using the slot that already holds the key or the least recently
+        used one.
+        """
+
+        buffer = self._memory.buf
+        start = (key % self._buckets) * self.WAYS
+        chosen = start
+        oldest = None
+
+        for slot in range(start, start + self.WAYS):
+            slot_key, check, tick, *rest = self._SLOT.unpack_from(buffer, self._TICK.size + slot * self._SLOT.size)
+
+            if slot_key == key:
+                chosen = slot
+                break
+
+            if oldest is None or tick < oldest:
+                chosen = slot
+                oldest = tick
+
+        tick = self._next_tick()
+        moves = moves.ljust(32, b"\0")
+        self._SLOT.pack_into(buffer, self._TICK.size + chosen * self._SLOT.size, key,
+                             self._check(key, tick, value, count, moves), tick, value, count, moves)
+
+
+def _attach(name):
+    """
+    Returns the named block of shared memory without letting this process free it when it exits, which
+    only the process that created it should do.
+    """
+
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 the block is registered with the resource tracker, which worker processes
+        # share with the process that started them, so it is still only freed by the creator
+        return shared_memory.SharedMemory(name=name)
@@ -0,0 +1,170 @@
+# Author: Matt Sanders
+# Date: 10/18/2026
+# Description: This program turns many positions of 'Kuba' from KubaGame.py at once into NumPy feature planes
+#              for training evaluation models. It needs NumPy, which the rest of the game does not.
+
+import numpy as np
+
+from KubaBatch import BLACK, RED, WHITE, legal_move_masks
+from KubaGame import STATE_SIZE
+
+# The features of a position are PLANES, each a 7x7 plane in the order below, and the red marbles captured by
+# the white and the black player. The planes are the cells of each color, a plane of ones when white is to
+# move, the cell each color last moved from, and the cells with a legal move in each direction for the player
+# to move. Positions are read from KubaGame.get_state_bytes, which numbers the players instead of naming their
+# colors, so the color of player one is given with them. Before the first move player one is taken to move.
+PLANES = ("white", "black", "red", "white_to_move", "white_last_move", "black_last_move",
+          "legal_R", "legal_L", "legal_B", "legal_F")
+CAPTURED = ("white", "black")
+_CODE_OF = np.zeros(256, dtype=np.int8)     # Board code of each ASCII cell value of a state
+_CODE_OF[ord("W")], _CODE_OF[ord("B")], _CODE_OF[ord("R")] = WHITE, BLACK, RED
+
+
+def allocate(count, dtype=np.float32):
+    """
+    Returns new arrays for the features of count positions, shaped (count, len(PLANES), 7, 7) for the planes
+    and (count, 2) for the captured red marbles, of the given NumPy type. Arrays made once and passed to
+    encode_states again and again are filled in place.
+    """
+
+    return np.zeros((count, len(PLANES), 7, 7), dtype=dtype), np.zeros((count, len(CAPTURED)), dtype=dtype)
+
+
+def _state_array(states):
+    """
+    Returns states as a (positions, STATE_SIZE) array of bytes, a view of the same memory unless they are a
+    list of separate states. Takes a bytes-like object of states one after another, such as an mmap, a
+    sequence of get_state_bytes results, or an array.
+    """
+
+    if isinstance(states, (list, tuple)):
+        states = b"".join(states)
+
+    if not isinstance(states, np.ndarray):
+        states = np.frombuffer(states, dtype=np.uint8)
+
+    if states.size % STATE_SIZE:
+        raise ValueError("Game states are " + str(STATE_SIZE) + " bytes long.")
+
+    return states.reshape(-1, STATE_SIZE)
+
+
+def encode_states(states, first_colors="W", planes=None, captured=None, chunk=4096):
+    """
+    Writes the features of many game states into the planes and captured arrays and returns them as a tuple.
+    Takes the states (a bytes-like object of get_state_bytes results one after another, a list of them or a
+    (positions, STATE_SIZE) array of bytes), the color of player one, 'W' or 'B', or an array of its ASCII code
+    for each position, and optionally the arrays from allocate to fill, which are made when None. The states are
+    read without copying them and worked on chunk positions at a time.
+    """
+
+    states = _state_array(states)
+    count = len(states)
+
+    if planes is None or captured is None:
+        new_planes, new_captured = allocate(count)
+        planes = new_planes if planes is None else planes
+        captured = new_captured if captured is None else captured
+
+    if planes.shape != (count, len(PLANES), 7, 7) or not planes.flags.c_contiguous:
+        raise ValueError("The planes must be a C-contiguous array shaped (positions, len(PLANES), 7, 7).")
+
+    if captured.shape != (count, len(CAPTURED)):
+        raise ValueError("The captured array must be shaped (positions, 2).")
+
+    if isinstance(first_colors, str):
+        first_colors = np.full(count, ord(first_colors), dtype=np.uint8)
+
+    flat = planes.reshape(count, len(PLANES), 49)
+
+    for start in range(0, count, chunk):
+        _encode_chunk(states[start:start + chunk], np.asarray(first_colors[start:start + chunk]),
+                      flat[start:start + chunk], captured[start:start + chunk])
+
+    return planes, captured
+
+
+def _encode_chunk(states, first_colors, planes, captured):
+    """
+    Fills the (positions, len(PLANES), 49) planes and the captured counts of a chunk of states.
+    """
+
+    cells = states[:, :49]
+    rows = np.arange(len(states))
+    first_white = first_colors == ord("W")
+
+    np.equal(cells, ord("W"), out=planes[:, 0])
+    np.equal(cells, ord("B"), out=planes[:, 1])
+    np.equal(cells, ord("R"), out=planes[:, 2])
+
+    # Bytes 52 to 54 are player one's captured red marbles, marbles and last move, 55 to 57 player two's
+    white_offset = np.where(first_white, 52, 55)
+    black_offset = np.where(first_white, 55, 52)
+    captured[:, 0] = states[rows, white_offset]
+    captured[:, 1] = states[rows, black_offset]
+    white_move = states[rows, white_offset + 2].astype(np.intp)
+    black_move = states[rows, black_offset + 2].astype(np.intp)
+
+    # Byte 58 is the player to move, 1 or 2, or 0 before the first move
+    white_to_move = np.where(states[:, 58] == 2, ~first_white, first_white)
+    planes[:, 3] = white_to_move[:, None]
+
+    planes[:, 4:6] = 0
+    for plane, moves in ((4, white_move), (5, black_move)):
+        moved = np.nonzero(moves != 255)[0]
+        planes[moved, plane, moves[moved] // 4] = 1
+
+    # The opponent's last move is the one that can forbid a push back along its line
+    opponent_move = np.where(white_to_move, black_move, white_move)
+    moved = opponent_move != 255
+    legal = legal_move_masks(_CODE_OF[cells].reshape(-1, 7, 7), np.where(white_to_move, WHITE, BLACK),
+                             np.where(moved, opponent_move // 4, -1), np.where(moved, opponent_move % 4, -1))[0]
+    legal &= (states[:, 59] == 0)[:, None, None]       # Byte 59 is the winner, and nobody moves after a win
+    planes[:, 6:10] = legal
+
+
+def encode_games(games, planes=None, captured=None):
+    """
+    Writes the features of the current position of each KubaGame in a sequence into the planes and captured
+    arrays, made when None, and returns them as a tuple, the same as encode_states. Every game must be on a
+    7x7 board.
+    """
+
+    games = list(games)
+
+    if any(game.get_size() != 7 for game in games):
+        raise ValueError("Features are only made for games on a 7x7 board.")
+
+    states = b"".join(game.get_state_bytes() for game in games)
+    first_colors = np.array([ord(game.get_players()[0][1]) for game in games], dtype=np.uint8)
+    return encode_states(states, first_colors, planes, captured)
+
+
+def archive_states(archive, game_indexes=None, every_ply=False, engine="bitboard"):
+    """
+    Returns the positions of games in a KubaArchive.GameArchive as a tuple of a (positions, STATE_SIZE) array
+    of states and an array of player one's color for each, ready for encode_states. By default only the
+    snapshots are taken, which are read straight from the archive; with every_ply each game is replayed once on
+    the given board engine for the state after every ply. Takes the archive, the indexes of the games, all of
+    them if None, every_ply and the engine.
+    """
+
+    if game_indexes is None:
+        game_indexes = range(archive.get_game_count())
+
+    parts = []
+    colors = []
+
+    for game_index in game_indexes:
+        if every_ply:
+            states = b"".join(game.get_state_bytes() for game in archive.get_record(game_index).replay(engine))
+        else:
+            states = archive.get_snapshots(game_index)
+
+        parts.append(np.frombuffer(states, dtype=np.uint8))
+        colors.append(np.full(len(states) // STATE_SIZE, ord(archive.get_players(game_index)[0][1]), np.uint8))
+
+    if not parts:
+        return np.zeros((0, STATE_SIZE), dtype=np.uint8), np.zeros(0, dtype=np.uint8)
+
+    return np.concatenate(parts).reshape(-1, STATE_SIZE), np.concatenate(colors)
@@ -3,325 +3,261 @@
 # Description: This program defines methods for playing a game called 'Kuba'. There is
 #              a method that defines the game board, the players, the game itself.
 
+import random
+
+
 class Board:
     """
     Defines the game board, sets up the initialization, methods to update it when a player moves and it keeps
-    track of the number of each color marble currently on the board. It takes no parameters. The KubaGame class
-    is the only class that it communicates with in order to update it's state and track the marbles that are still
-    in play.
+    track of the number of each color marble currently on the board. It optionally takes the starting layout, a
+    square list of rows of 'W', 'B', 'R' and 'X', the standard 7x7 layout if None. The KubaGame class is the only
+    class that it communicates with in order to update it's state and track the marbles that are still in play.
     """
 
-    def __init__(self):
+    __slots__ = ("_grid", "_size", "_cell_keys", "_state_of_board", "_cell_hash", "_state_hash", "_owned_rows")
+
+    def __init__(self, layout=None):
         """
         Initializes the game board at set up and the total of each color marble on the board. returns nothing and
-        takes no parameters.
+        takes the layout.
         """
 
         # initializes the game board positions
-        self._grid = [["W", "W", "X", "X", "X", "B", "B"], ["W", "W", "X", "R", "X", "B", "B"],
-                      ["X", "X", "R", "R", "R", "X", "X"], ["X", "R", "R", "R", "R", "R", "X"],
-                      ["X", "X", "R", "R", "R", "X", "X"], ["B", "B", "X", "R", "X", "W", "W"],
-                      ["B", "B", "X", "X", "X", "W", "W"]]
-        self._state_of_board = [8, 8, 13]  # Initializes the count of marbles of each color on the board (W, B, R)
-
-    def get_grid(self):
-        """
-        Returns the game board as a list. Takes no parameters.
-        """
-
-        return self._grid
-
-    def set_grid(self, new_grid):
-        """
-         Updates the game board positions after any change to the marbles on the board. It
-         takes a new list as a parameter and returns nothing.
-        """
-
-        self._grid = new_grid
-
-    def get_state_of_board(self):
-        """
-        Returns a tuple of the count of each color marble currently on the board, ('W', 'B', 'R'); in that order.
-        It takes no parameters.
-        """
-
-        return tuple(self._state_of_board)
-
-    def set_state_of_board(self, color_knocked_off):
-        """
-        Updates the count of each color on the board. It takes a string for the color that was knocked off the
-        end of the board as a parameter and returns nothing.
-        """
-
-        if color_knocked_off == "W":        # Check of a white marble is knocked off
-            self._state_of_board[0] -= 1
-        elif color_knocked_off == "B":      # Check if a black marble is knocked off
-            self._state_of_board[1] -= 1
-        elif color_knocked_off == "R":      # Check if a red marble is knocked off
-            self._state_of_board[2] -= 1
-
-
-class Player:
-    """
-    Defines each game player based on their name and color of marble. It holds methods to initialize the name,
-    marble color, count of captured red marbles, current count of player's marbles, and the most recent move
-    made by that player. It takes player name and marble color as parameters. It only needs to communicate with
-    the KubaGame class in order to update information concerning the player.
-    """
-
-    def __init__(self, players_name, marble_color):
-        """
-        Initializes the player's name, marble color, number of red marbles, number of their marbles,
-        and the coordinates of their most recent move. It takes strings of players' name and their
-        marble color ('W' or 'B') and returns nothing.
-        """
-
-        self._players_name = players_name
-        self._marble_color = marble_color
-        self._red_marbles = 0               # Initializes the number of captured red marbles
-        self._marbles = 8                   # Initializes the number of marbles they have on the board
-        self._last_move = None              # Initializes the last move made
-
-    def get_players_name(self):
-        """
-        Returns the player's name as a string. Takes no parameters.
-        """
-
-        return self._players_name
-
-    def get_marble_color(self):
+        self._grid = _layout_grid(layout)
+        self._size = len(self._grid)
+        self._cell_keys = _tables(self._size)["cell_keys"]
+        self._state_of_board = _count_marbles(self._grid)   # Count of marbles of each color on the board (W, B, R)
+        self._cell_hash = _grid_hash(self._grid, self._cell_keys)   # Zobrist hash of the marbles on the board
+        self._state_hash = 0                                        # Zobrist hash of the turn and last moves
+        self._owned_rows = [True] * self._size      # Rows not shared with a fork, which can be changed in place
+
+    def __getstate__(self):
         """
-        Returns the color of the player's marbles as a string. Takes no parameters.
+        Returns the board's attributes for pickling and copying, leaving out the Zobrist keys, which are the
+        same for every board of its size.
         """
 
-        return self._marble_color
+        return {name: getattr(self, name) for name in self.__slots__ if name != "_cell_keys"}
 
-    def get_red_marbles(self):
+    def __setstate__(self, state):
         """
-        Returns the number of the red marbles the player has captured as an integer.
-        Takes no parameters.
+        Sets the board's attributes from a dictionary returned by __getstate__ and looks up the keys again.
         """
 
-        return self._red_marbles
-
-    def set_red_marbles(self):
-        """
-        Updates the number of captured red marbles. Takes no parameters and returns nothing.
-        """
+        for name, value in state.items():
+            setattr(self, name, value)
 
-        self._red_marbles += 1
+        self._cell_keys = _tables(self._size)["cell_keys"]
 
-    def get_marbles(self):
+    def get_size(self):
         """
-        Returns the number of player's stones on the board as an integer. Takes no parameters.
+        Returns the number of rows, and of columns, of the board as an integer. Takes no parameters.
         """
 
-        return self._marbles
+        return self._size
 
-    def set_marbles(self):
+    def get_grid(self):
         """
-        Updates the number of player's stones left on the board. Takes no parameters and returns nothing.
+        Returns a copy of the game board as a list of lists of strings. Changing the list does not change the
+        board, or any fork of it. Takes no parameters.
         """
 
-        self._marbles -= 1
+        return [list(row) for row in self._grid]
 
-    def get_last_move(self):
+    def set_grid(self, new_grid):
         """
-        Returns the coordinates of the last move made by the player as a tuple of integers.
-        Takes no parameters.
+         Updates the game board positions after any change to the marbles on the board. It
+         takes a new list as a parameter and returns nothing.
         """
 
-        return self._last_move
+        self._grid = new_grid
+        self._cell_hash = _grid_hash(new_grid, self._cell_keys)
+        self._owned_rows = [True] * len(new_grid)
 
-    def set_last_move(self, coordinates, direction_moved):
+    def fork(self):
         """
-         Updates the _last_move with the coordinates and direction of the last move made by the player as a tuple. Takes
-         a tuple of integers, (row, column), as coordinates and a direction as a string. It returns nothing.
+        Returns a new Board with the same marbles, counts and hashes that shares this board's row lists
+        instead of copying them. Whichever board changes a shared row first copies it, so forking takes the
+        same time however the game has gone and a push only copies the rows it touches. Takes no parameters.
         """
 
-        self._last_move = (coordinates, direction_moved)
-
-
-class KubaGame:
-    """
-    The main class for the game to run. It holds methods for updating the board information, the players information
-    and in order to execute a move in any of the four directions (right, left, forward and backward). It keeps track
-    of which players' turn it is and if a winner has been declared. It updates how many red marbles have been captured
-    by each player and how many marbles are left on the board. It can also provide information about the board and
-    about each player. It takes two parameter: player_one and player_two as tuples of players' name and their marble
-    color (white or black). It communicates with the Board class in order to initialize the board, update the board
-    after a move has been executed, judge if a valid move can be executed and access the count of each color of marble
-    currently on the board. It communicates with the Player class in order to initialize each player in the game,
-    access the number of red marbles that have been captured by a player, and allow each player to try and execute
-    a new move. It communicates with the exception class to handle a player name entered into the make_move and
-    get_captured methods who is not actually playing the game.
-    """
-
-    def __init__(self, player_one, player_two):
+        board = Board.__new__(Board)
+        board._grid = list(self._grid)
+        board._size = self._size
+        board._cell_keys = self._cell_keys
+        board._state_of_board = list(self._state_of_board)
+        board._cell_hash = self._cell_hash
+        board._state_hash = self._state_hash
+        board._owned_rows = [False] * self._size
+        self._owned_rows = [False] * self._size
+        return board
+
+    def _own_row(self, index):
         """
-        Initializes the players, the game board, the current player who turn it is and who has one the game.
-        It takes two tuples, (player name, marble color) in that order of the players playing the game. and
-        returns nothing.
+        Returns the list of the row at the index for changing in place, copying it first if it is shared with
+        a fork of the board.
         """
 
-        self._player1 = Player(player_one[0], player_one[1].upper())    # Initializes the first player
-        self._player2 = Player(player_two[0], player_two[1].upper())    # Initializes the second player
+        if self._owned_rows[index]:
+            return self._grid[index]
 
-        # player dictionary
-        self._players = {player_one[0]: self._player1, player_two[0]: self._player2}
-        self._game_board = Board()                                      # Initializes the game board
-        self._current_turn = None                                       # Any player can start the game
-        self._winner = None                                             # Nobody has one yet
+        row = self._grid[index] = list(self._grid[index])
+        self._owned_rows[index] = True
+        return row
 
-    def get_current_turn(self):
+    def get_state_of_board(self):
         """
-        Returns which players' turn it is as a string. Takes no parameters.
+        Returns a tuple of the count of each color marble currently on the board, ('W', 'B', 'R'); in that order.
+        It takes no parameters.
         """
 
-        return self._current_turn
+        return tuple(self._state_of_board)
 
-    def get_winner(self):
+    def set_state_of_board(self, color_knocked_off):
         """
-        Returns the players' name who has won the game as a string. Takes no parameters.
+        Updates the count of each color on the board. It takes a string for the color that was knocked off the
+        end of the board as a parameter and returns nothing.
         """
 
-        return self._winner
+        if color_knocked_off == "W":        # Check of a white marble is knocked off
+            self._state_of_board[0] -= 1
+        elif color_knocked_off == "B":      # Check if a black marble is knocked off
+            self._state_of_board[1] -= 1
+        elif color_knocked_off == "R":      # Check if a red marble is knocked off
+            self._state_of_board[2] -= 1
 
-    def get_captured(self, players_name):
+    def get_marble(self, coordinates):
         """
-        Returns the number of red marbles a specified player has captured as an integer. Takes the
-        player's name as a string for a parameter. Returns nothing or returns a message saying that
-        the entered name does not match a player in the current game.
+        Returns the color of the marble at the given coordinates as a string, 'W', 'B', 'R' or 'X'. It takes
+        the coordinates as a tuple of integers, (row, column).
         """
 
-        # Handles exception for an entered name that is not a player in the game
-        try:
-            return self._players[players_name].get_red_marbles()
-        except IndexError:
-            return "That player is not part of this game."
+        return self._grid[coordinates[0]][coordinates[1]]
 
-    def get_marble_count(self):
+    def push(self, starting_coordinate, direction):
         """
-        Returns a tuple of the number of white, black and red marbles still on the board; in that order.
-        Takes no parameters.
+        Pushes the marble at the starting coordinate one space in the given direction, 'R', 'L', 'B' or 'F',
+        along with every marble in front of it up to the first empty space or the edge of the board. It takes
+        the coordinates as a tuple of integers, (row, column), and the direction as a string. Returns the value
+        removed from the row or column as a string, or None if the direction is not valid.
         """
 
-        return self._game_board.get_state_of_board()
-
-    def get_marble(self, coordinates):
-        """
-        Checks the board for the color of marble at the specified coordinate value. Coordinates
-        are input as a tuple of integers, (row, column); in that order as a parameter.
-        The function returns 'W', 'B', 'R', or 'X'; white, black, red, or empty space respectively as a string.
-        """
+        if direction == "R":
+            return self.push_right(starting_coordinate)
+        elif direction == "L":
+            return self.push_left(starting_coordinate)
+        elif direction == "B":
+            return self.push_backward(starting_coordinate)
+        elif direction == "F":
+            return self.push_forward(starting_coordinate)
 
-        return self._game_board.get_grid()[coordinates[0]][coordinates[1]]
+        return None
 
-    def move_right(self, starting_coordinate):
+    def push_right(self, starting_coordinate):
         """
-        Executes a move to the right and updates the game board. It takes the coordinates
-        of the marble being moved as a tuple of integers, (row, column), as a parameter. It returns the
-        value removed to shift the values within the row as a string and the updated board
-        as a list.
+        Shifts the values in a row one space to the right from the starting coordinate. It takes the
+        coordinates of the marble being moved as a tuple of integers, (row, column), and returns the value
+        removed to shift the row as a string.
         """
 
-        current_board = self._game_board.get_grid()                 # Saves the current board to a variable
+        row = self._own_row(starting_coordinate[0])
         start_pos = starting_coordinate[1]                          # Sets the loop starting position
 
-        while start_pos <= (len(current_board[starting_coordinate[0]]) - 1):
-            # Sets the character that is removed from the board
-            end_char = current_board[starting_coordinate[0]][start_pos]
-
+        while start_pos <= (len(row) - 1):
             # Checks for an empty square or the end of the row
-            if end_char == 'X' or start_pos == (len(current_board[starting_coordinate[0]]) - 1):
-                removed_value = current_board[starting_coordinate[0]].pop(start_pos)    # Removes the last value
+            if row[start_pos] == 'X' or start_pos == (len(row) - 1):
+                old_values = row[starting_coordinate[1]:start_pos + 1]
+                removed_value = row.pop(start_pos)                  # Removes the last value
+                row.insert(starting_coordinate[1], "X")             # Inserts a value before the moved marble
 
-                # Inserts a value before the moved marble
-                current_board[starting_coordinate[0]].insert(starting_coordinate[1], "X")
-                return removed_value, current_board     # Returns the removed value and the updated marble positions
+                first_cell = starting_coordinate[0] * self._size + starting_coordinate[1]
+                self._rehash(range(first_cell, first_cell + len(old_values)), old_values,
+                             row[starting_coordinate[1]:start_pos + 1])
+                return removed_value
 
             start_pos += 1
 
-    def move_left(self, starting_coordinate):
+    def push_left(self, starting_coordinate):
         """
-        Executes a move to the left and updates the game board. It takes the coordinates
-        of the marble being moved as a tuple of integers, (row, column), as a parameter. It returns
-        the value removed to shift the values within the row as a string and the updated
-        board as a list.
+        Shifts the values in a row one space to the left from the starting coordinate. It takes the
+        coordinates of the marble being moved as a tuple of integers, (row, column), and returns the value
+        removed to shift the row as a string.
         """
 
-        current_board = self._game_board.get_grid()                 # Saves the current board to a variable
+        row = self._own_row(starting_coordinate[0])
         start_pos = starting_coordinate[1]                          # Sets the loop starting position
 
         while start_pos >= 0:
-            # Sets the character that is removed from the board
-            end_char = current_board[starting_coordinate[0]][start_pos]
-
-            if end_char == 'X' or start_pos == 0:           # Checks for an empty square or the beginning of the row
-                removed_value = current_board[starting_coordinate[0]].pop(start_pos)        # Removes the last value
+            if row[start_pos] == 'X' or start_pos == 0:            # Checks for an empty square or the row start
+                old_values = row[start_pos:starting_coordinate[1] + 1]
+                removed_value = row.pop(start_pos)                  # Removes the last value
+                row.insert(starting_coordinate[1], "X")             # Inserts a value before the moved marble
 
-                # Inserts a value before the moved marble
-                current_board[starting_coordinate[0]].insert(starting_coordinate[1], "X")
-                return removed_value, current_board     # Returns the removed value and the updated marble positions
+                first_cell = starting_coordinate[0] * self._size + start_pos
+                self._rehash(range(first_cell, first_cell + len(old_values)), old_values,
+                             row[start_pos:starting_coordinate[1] + 1])
+                return removed_value
 
             start_pos -= 1
 
-    def move_backward(self, starting_coordinate):
+    def push_backward(self, starting_coordinate):
         """
-        Executes a backward move on the board and updates the game board. It takes the
-        coordinates of the marble being moved as a tuple of integers, (row, column), as a parameter.
-        It returns the value removed to shift the values within the column as a string
-        and the updated board as a list.
+        Shifts the values in a column one space backward, toward the last row, from the starting coordinate.
+        It takes the coordinates of the marble being moved as a tuple of integers, (row, column), and returns
+        the value removed to shift the column as a string.
         """
 
-        current_board = self._game_board.get_grid()                 # Saves the current board to a variable
         start_pos = starting_coordinate[0]                          # Sets the loop starting position
         column = []                                                 # Initializes a temporary list for column values
 
-        while start_pos <= (len(current_board) - 1):
-            end_char = current_board[start_pos][starting_coordinate[1]]  # Sets the current character on the board
+        while start_pos <= (len(self._grid) - 1):
+            end_char = self._grid[start_pos][starting_coordinate[1]]    # Sets the current character on the board
             column.append(end_char)
 
             # Checks for an empty square or the end of the column
-            if end_char == 'X' or start_pos == (len(current_board) - 1):
+            if end_char == 'X' or start_pos == (len(self._grid) - 1):
+                old_values = list(column)
                 removed_value = column.pop(-1)                # Removes the last value in the temp list
                 column.insert(0, 'X')
                 start_pos = starting_coordinate[0]            # Sets the reassignment starting position
 
                 for value in column:
-                    current_board[start_pos][starting_coordinate[1]] = value # Update positions on the saved board
+                    self._own_row(start_pos)[starting_coordinate[1]] = value    # Update positions on the board
                     start_pos += 1
 
-                return removed_value, current_board     # Returns the value that was removed and the updated board
+                first_cell = starting_coordinate[0] * self._size + starting_coordinate[1]
+                self._rehash(range(first_cell, first_cell + self._size * len(column), self._size), old_values, column)
+                return removed_value
 
             start_pos += 1
 
-    def move_forward(self, starting_coordinate):
+    def push_forward(self, starting_coordinate):
         """
-        Executes a forward move on the board and updates the game board. It takes the
-        coordinates of the marble being moved as a tuple of integers, (row, column), as a parameter.
-        It returns the value removed to shift the values in the column as a string and
-        the updated board as a list.
+        Shifts the values in a column one space forward, toward the first row, from the starting coordinate.
+        It takes the coordinates of the marble being moved as a tuple of integers, (row, column), and returns
+        the value removed to shift the column as a string.
         """
 
-        current_board = self._game_board.get_grid()                 # Saves the current board to a variable
         start_pos = starting_coordinate[0]                          # Sets the loop starting position
         column = []                                                 # Initializes a temporary list for column values
 
         while start_pos >= 0:
-            end_char = current_board[start_pos][starting_coordinate[1]]  # Sets the current character on the board
+            end_char = self._grid[start_pos][starting_coordinate[1]]    # Sets the current character on the board
             column.append(end_char)
 
             if end_char == 'X' or start_pos == 0:   # Checks for an empty square or the beginning of the column
+                old_values = list(column)
                 removed_value = column.pop(-1)      # Removes the last value in the temp list
                 column.insert(0, 'X')
                 start_pos = starting_coordinate[0]  # Sets the reassignment starting position
 
                 for value in column:
-                    current_board[start_pos][starting_coordinate[1]] = value # Update positions on the saved board
+                    self._own_row(start_pos)[starting_coordinate[1]] = value    # Update positions on the board
                     start_pos -= 1
 
-                return removed_value, current_board     # Returns the removed value and the updated board
+                first_cell = starting_coordinate[0] * self._size + starting_coordinate[1]
+                self._rehash(range(first_cell, first_cell - self._size * len(column), -self._size), old_values, column)
+                return removed_value
 
             start_pos -= 1
 
@@ -334,7 +270,7 @@ class KubaGame:
         pair as a tuple, (row, column), in order and a direction, 'R', 'L', 'B', 'F'.
         """
 
-        board_position = self._game_board.get_grid()
+        board_position = self._grid
 
         if move_direction == "R":
 
@@ -347,7 +283,7 @@ class KubaGame:
 
         elif move_direction == "L":
 
-            if coordinate_pair[1] == 6:     # Checks for the right edge of the board
+            if coordinate_pair[1] == self._size - 1:    # Checks for the right edge of the board
                 return True
             elif board_position[coordinate_pair[0]][coordinate_pair[1] + 1] == "X": # Checks position to right of marble
                 return True
@@ -365,7 +301,7 @@ class KubaGame:
 
         elif move_direction == "F":
 
-            if coordinate_pair[0] == 6:     # Checks for the bottom edge of board
+            if coordinate_pair[0] == self._size - 1:    # Checks for the bottom edge of board
                 return True
             elif board_position[coordinate_pair[0] + 1][coordinate_pair[1]] == "X": # Checks position behind marble
                 return True
@@ -381,7 +317,7 @@ class KubaGame:
         returns True if the move will not undo the opponents and False if it will.
         """
 
-        board = self._game_board.get_grid()
+        board = self._grid
 
         if opponent_move is None:      # Checks if the opponent has not made a move yet
             return True
@@ -390,7 +326,7 @@ class KubaGame:
             if move_coordinates[0] == opponent_move[0][0]:  #Check if in the same row
                 index = move_coordinates[1]
 
-                while index <= 6:
+                while index < self._size:
 
                     # Checks for an empty space at the same point in the grid as the opponent just moved from
                     if board[move_coordinates[0]][index] == "X" and index != opponent_move[0][1]:
@@ -421,7 +357,7 @@ class KubaGame:
             if move_coordinates[1] == opponent_move[0][1]:  # Checks if we're in the same column
                 index = move_coordinates[0]
 
-                while index <= 6:
+                while index < self._size:
 
                     # Checks for an empty space at the same point in the grid as the opponent just moved from
                     if board[index][move_coordinates[1]] == "X" and index != opponent_move[0][0]:
@@ -449,136 +385,2134 @@ class KubaGame:
 
         return True
 
-    def update_current_turn(self, players_name):
+    def get_hash(self):
         """
-        Handles updating the current turn. Takes current player name as a string for a parameter and
-        doesn't return anything.
+        Returns the 64-bit Zobrist hash of the position as an integer. It covers the marbles on the board,
+        whose turn it is and both players' last moves, and it is updated as the position changes instead
+        of being computed from the whole board. Takes no parameters.
         """
 
-        if players_name == self._player1.get_players_name():
-            return self._player2.get_players_name()
+        return self._cell_hash ^ self._state_hash
 
-        return self._player1.get_players_name()
+    def get_cell_hash(self):
+        """
+        Returns the part of the Zobrist hash that covers only the marbles on the board as an integer.
+        Takes no parameters.
+        """
 
-    def make_move(self, player_name, marble_coordinate, movement_direction):
+        return self._cell_hash
+
+    def get_state_hash(self):
         """
-         Moves the marbles on the board is the specified direction. It also updates
-         the board, checks for a winner, makes sure it is the specified player's turn,
-         makes sure the player is not reversing the opponents last move or trying to
-         make the same move, it makes sure the player is not trying to push their own
-         marble off the board, updates the number of marbles left on the board
-         after the move has been made and makes sure that the player is only going to
-         move their own marble. It takes the players' name as string, the coordinate of
-         the marble they want to move as a tuple of integers, (row, column), and the
-         direction they want to move as a string for parameters. It returns False if
-         the proposed move is not valid, True if the proposed move is valid, or a message
-         if the player trying to make the move is not a valid player.
+        Returns the part of the Zobrist hash that covers the turn and last moves as an integer.
+        Takes no parameters.
         """
 
-        # Check for a winner of the game
-        if self._winner is not None:
-            return False
+        return self._state_hash
 
-        # Check for the the players' turn or the start of the game
-        if self._current_turn != player_name and self._current_turn is not None:
-            return False
+    def set_state_hash(self, state_hash):
+        """
+        Sets the part of the Zobrist hash that covers the turn and last moves. Returns nothing.
+        """
 
-        # Checks if the coordinates are valid
-        if marble_coordinate[0] < 0 or marble_coordinate[0] > 6:
-            self._current_turn = self.update_current_turn(player_name)  # Updates the current turn to the next player
-            return False
-        elif marble_coordinate[1] < 0 or marble_coordinate[1] > 6:
-            self._current_turn = self.update_current_turn(player_name)  # Updates the current turn to the next player
-            return False
+        self._state_hash = state_hash
 
-        # Check for access to the marble
-        if not self.check_marble_access(marble_coordinate, movement_direction):
-            self._current_turn = self.update_current_turn(player_name)  # Updates the current turn to the next player
-            return False
+    def update_hash(self, key):
+        """
+        Adds or removes a turn or last move key, from turn_key or last_move_key, to or from the hash.
+        Returns nothing.
+        """
 
-        # Check for a player trying to move any mable but their own
-        if self._players[player_name].get_marble_color() != self.get_marble(marble_coordinate):
-            self._current_turn = self.update_current_turn(player_name)  # Updates the current turn to the next player
-            return False
+        self._state_hash ^= key
 
-        # Check for reversing an opponents previous move
-        if player_name == self._player1.get_players_name():
+    def _rehash(self, cells, old_values, new_values):
+        """
+        Updates the cell hash for the cells of a row or column whose values changed from old_values to
+        new_values.
+        """
 
-            if not self.reverse_opponents_move(marble_coordinate, movement_direction, self._player2.get_last_move()):
-                self._current_turn = self.update_current_turn(player_name) # Updates the current turn to the next player
-                return False
+        for cell, old_value, new_value in zip(cells, old_values, new_values):
+            if old_value != new_value:
+                self._cell_hash ^= self._cell_keys[old_value][cell] ^ self._cell_keys[new_value][cell]
 
-        elif player_name == self._player2.get_players_name():
+    def restore_state_of_board(self, state_of_board):
+        """
+        Sets the count of each color on the board back to a tuple returned by get_state_of_board. Returns nothing.
+        """
 
-            if not self.reverse_opponents_move(marble_coordinate, movement_direction, self._player1.get_last_move()):
-                self._current_turn = self.update_current_turn(player_name) # Updates the current turn to the next player
-                return False
+        self._state_of_board = list(state_of_board)
 
-        # Make the move
-        if movement_direction == "R":
-            made_move = self.move_right(marble_coordinate) # Return the value removed at the new board arrangement
-        elif movement_direction == "L":
-            made_move = self.move_left(marble_coordinate) # Return the value removed at the new board arrangement
-        elif movement_direction == "B":
-            made_move = self.move_backward(marble_coordinate) # Return the value removed at the new board arrangement
-        elif movement_direction == "F":
-            made_move = self.move_forward(marble_coordinate) # Return the value removed at the new board arrangement
-        else:
-            self._current_turn = self.update_current_turn(player_name) # Updates the current turn to the next player
-            return False
+    def get_line_state(self, starting_coordinate, direction):
+        """
+        Returns a copy of the row or column a push from the starting coordinate in the given direction would
+        change, so it can be put back with set_line_state. It takes the coordinates as a tuple of integers,
+        (row, column), and the direction as a string.
+        """
 
-        try:
-            # Check removed value and update board and players' marble counts
-            if made_move[0] == "R":
-                self._players[player_name].set_red_marbles()   # Adds one to the captured marbles for the player
+        if direction == "R" or direction == "L":
+            return starting_coordinate[0], None, tuple(self._grid[starting_coordinate[0]]), self._cell_hash
 
-                # Sets players last move
-                self._players[player_name].set_last_move(marble_coordinate, movement_direction)
-                self._game_board.set_state_of_board("R")  # Update count of red marbles on board
-                self._game_board.set_grid(made_move[1])   # Update game board
-                self._current_turn = self.update_current_turn(player_name)  # Update the current turn
+        return None, starting_coordinate[1], tuple(row[starting_coordinate[1]] for row in self._grid), self._cell_hash
 
-                if self._players[player_name].get_red_marbles() == 7:    # Check if the player has won
-                    self._winner = player_name
-                    return True
+    def set_line_state(self, line_state):
+        """
+        Puts a row or column returned by get_line_state back on the board. The row lists are changed in place,
+        and only the rows with a different value, so no more rows shared with a fork are copied than needed.
+        Returns nothing.
+        """
 
-                return True
+        row, column, values, self._cell_hash = line_state
 
-            elif made_move[0] == "X":
-                # Sets players' last move
-                self._players[player_name].set_last_move(marble_coordinate, movement_direction)
-                self._game_board.set_grid(made_move[1]) # Updates the game board
-                self._current_turn = self.update_current_turn(player_name)  # Updates the current turn
-                return True
+        if column is None:
+            if tuple(self._grid[row]) != values:
+                self._own_row(row)[:] = values
+        else:
+            for index, value in enumerate(values):
+                if self._grid[index][column] != value:
+                    self._own_row(index)[column] = value
 
-            # Checks if the player is removing their marble
-            elif made_move[0] == self._players[player_name].get_marble_color():
-                self._current_turn = self.update_current_turn(player_name)  # Updates the current turn
-                return False
-            else:
-                # Sets players' last move
-                self._players[player_name].set_last_move(marble_coordinate, movement_direction)
-                self._current_turn = self.update_current_turn(player_name)  # Updates the current turn
-                self._game_board.set_grid(made_move[1]) # Updates the game board
-                self._game_board.set_state_of_board(made_move[0])   # Updates the count of marbles on board
+    def get_line(self, starting_coordinate, direction):
+        """
+        Returns the values of the row, for 'R' or 'L', or the column, for 'B' or 'F', through the starting
+        coordinate as a tuple of strings, from left to right or top to bottom. It takes the coordinates as a
+        tuple of integers, (row, column), and the direction as a string.
+        """
 
-                if self._player1.get_marble_color() == made_move[0]:
-                    self._player1.set_marbles() # Updates player 1's marble count
+        if direction == "R" or direction == "L":
+            return tuple(self._grid[starting_coordinate[0]])
 
-                    if self._player1.get_marbles() == 0: # Checks if player 1 has marbles on the board
-                        self._winner = player_name
-                        return True
+        return tuple(row[starting_coordinate[1]] for row in self._grid)
 
-                    return True
+    def removed_by_push(self, starting_coordinate, direction):
+        """
+        Returns the value a push from the starting coordinate in the given direction would remove, as a
+        string, without changing the board. It takes the coordinates as a tuple of integers, (row, column),
+        and the direction as a string. Returns None if the direction is not valid.
+        """
 
-                elif self._player2.get_marble_color() == made_move[0]:
-                    self._player2.set_marbles() # Updates player 2's marble count
+        if direction not in _DIRECTIONS:
+            return None
 
-                    if self._player2.get_marbles() == 0:    # Checks if player 2 has marbles on the board
-                        self._winner = player_name
-                        return True
+        row_step, column_step = _DIRECTIONS[direction]
+        row, column = starting_coordinate
+        size = self._size
 
-                    return True
+        while True:
+            value = self._grid[row][column]
+
+            # Checks for an empty square or the edge of the board
+            if value == "X" or not (0 <= row + row_step < size and 0 <= column + column_step < size):
+                return value
+
+            row += row_step
+            column += column_step
+
+    def legal_moves(self, marble_color, opponent_move):
+        """
+        Yields every legal move for the given marble color as a tuple of the coordinates, (row, column), and
+        the direction. A move is legal if the marble can be reached, it does not undo the opponents last move
+        and it does not push one of the player's own marbles off the board. It takes the marble color as a
+        string and the opponents last move.
+        """
+
+        for row in range(self._size):
+            for column in range(self._size):
+                if self._grid[row][column] != marble_color:
+                    continue
+
+                for direction in _MOVE_ORDER:
+                    coordinates = (row, column)
+
+                    if (self.check_marble_access(coordinates, direction)
+                            and self.reverse_opponents_move(coordinates, direction, opponent_move)
+                            and self.removed_by_push(coordinates, direction) != marble_color):
+                        yield coordinates, direction
+
+
+class BitBoard:
+    """
+    Defines the game board as three integer bit masks, one each for the white, black and red marbles, where
+    bit (row * size + column) is set when that color occupies the cell. It has the same methods as the Board
+    class so the KubaGame class can use either one, but pushes, edge ejections and access checks are done with
+    shifts and masks instead of list operations. It optionally takes the starting layout, like the Board class.
+    """
+
+    __slots__ = ("_white", "_black", "_red", "_cell_hash", "_state_hash", "_state_of_board", "_size", "_steps",
+                 "_rays", "_ray_ends", "_behind", "_edges", "_full_board", "_cell_keys")
+
+    def __init__(self, layout=None):
+        """
+        Initializes the masks from the starting layout, the standard one of the Board class if None, the lookup
+        tables of its size and the total of each color marble on the board. Returns nothing.
+        """
+
+        grid = _layout_grid(layout)
+        self._size = len(grid)
+        self._set_tables()
+        self._white = 0
+        self._black = 0
+        self._red = 0
+        self._cell_hash = 0                 # Zobrist hash of the marbles on the board
+        self._state_hash = 0                # Zobrist hash of the turn and last moves
+        self.set_grid(grid)                 # Builds the masks from the starting layout
+        self._state_of_board = _count_marbles(grid)   # Count of marbles of each color on the board (W, B, R)
+
+    def _set_tables(self):
+        """
+        Looks up the rays, edges, steps and Zobrist keys of the board's size, which every board of that size
+        shares.
+        """
+
+        tables = _tables(self._size)
+        self._steps = tables["steps"]
+        self._rays = tables["rays"]
+        self._ray_ends = tables["ray_ends"]
+        self._behind = tables["behind"]
+        self._edges = tables["edges"]
+        self._full_board = tables["full_board"]
+        self._cell_keys = tables["cell_keys"]
+
+    def __getstate__(self):
+        """
+        Returns the board's masks, counts, hashes and size for pickling and copying, leaving out the lookup
+        tables.
+        """
+
+        return {"_white": self._white, "_black": self._black, "_red": self._red, "_cell_hash": self._cell_hash,
+                "_state_hash": self._state_hash, "_state_of_board": self._state_of_board, "_size": self._size}
+
+    def __setstate__(self, state):
+        """
+        Sets the board's attributes from a dictionary returned by __getstate__ and looks up the tables again.
+        """
+
+        for name, value in state.items():
+            setattr(self, name, value)
+
+        self._set_tables()
+
+    def get_size(self):
+        """
+        Returns the number of rows, and of columns, of the board as an integer. Takes no parameters.
+        """
+
+        return self._size
+
+    def fork(self):
+        """
+        Returns a new BitBoard with the same masks, counts and hashes. The masks are integers, which never
+        change in place, so only the counts are copied. Takes no parameters.
+        """
+
+        board = BitBoard.__new__(BitBoard)
+
+        for name in BitBoard.__slots__:
+            setattr(board, name, getattr(self, name))
+
+        board._state_of_board = list(self._state_of_board)
+        return board
+
+    def get_grid(self):
+        """
+        Returns the game board as a new list of lists of strings built from the masks. Changing the list does
+        not change the board. Takes no parameters.
+        """
+
+        grid = []
+
+        for row in range(self._size):
+            grid.append([self.get_marble((row, column)) for column in range(self._size)])
+
+        return grid
+
+    def set_grid(self, new_grid):
+        """
+        Rebuilds the masks from a list of lists of strings of the board's size. It takes the new list as a
+        parameter and returns nothing.
+        """
+
+        self._white = self._black = self._red = 0
+
+        for row in range(self._size):
+            for column in range(self._size):
+                bit = 1 << (row * self._size + column)
+
+                if new_grid[row][column] == "W":
+                    self._white |= bit
+                elif new_grid[row][column] == "B":
+                    self._black |= bit
+                elif new_grid[row][column] == "R":
+                    self._red |= bit
+
+        self._cell_hash = _grid_hash(new_grid, self._cell_keys)
+
+    def get_state_of_board(self):
+        """
+        Returns a tuple of the count of each color marble currently on the board, ('W', 'B', 'R'); in that order.
+        It takes no parameters.
+        """
+
+        return tuple(self._state_of_board)
+
+    def set_state_of_board(self, color_knocked_off):
+        """
+        Updates the count of each color on the board. It takes a string for the color that was knocked off the
+        end of the board as a parameter and returns nothing.
+        """
+
+        if color_knocked_off == "W":
+            self._state_of_board[0] -= 1
+        elif color_knocked_off == "B":
+            self._state_of_board[1] -= 1
+        elif color_knocked_off == "R":
+            self._state_of_board[2] -= 1
+
+    def get_marble(self, coordinates):
+        """
+        Returns the color of the marble at the given coordinates as a string, 'W', 'B', 'R' or 'X'. It takes
+        the coordinates as a tuple of integers, (row, column).
+        """
+
+        return self._color_at(1 << (coordinates[0] * self._size + coordinates[1]))
+
+    def _color_at(self, bit):
+        """
+        Returns the color of the marble on the cell with the given single bit mask as a string.
+        """
+
+        if self._white & bit:
+            return "W"
+        elif self._black & bit:
+            return "B"
+        elif self._red & bit:
+            return "R"
+
+        return "X"
+
+    def push(self, starting_coordinate, direction):
+        """
+        Pushes the marble at the starting coordinate one space in the given direction, 'R', 'L', 'B' or 'F',
+        along with every marble in front of it up to the first empty space or the edge of the board. It takes
+        the coordinates as a tuple of integers, (row, column), and the direction as a string. Returns the value
+        removed from the row or column as a string, or None if the direction is not valid.
+        """
+
+        if direction not in _DIRECTIONS:
+            return None
+
+        cell = starting_coordinate[0] * self._size + starting_coordinate[1]
+        rays = self._rays[direction]
+        ray = rays[cell]
+        empty = ray & ~(self._white | self._black | self._red)
+        step = self._steps[direction]
+
+        if empty:
+            # The line stops at the first empty cell in front of the marble
+            if step > 0:
+                end = (empty & -empty).bit_length() - 1
+            else:
+                end = empty.bit_length() - 1
+            removed_value = "X"
+        else:
+            # The line runs to the edge and the marble on the edge falls off
+            end = self._ray_ends[direction][cell]
+            removed_value = self._color_at(1 << end)
+
+        segment = ray ^ rays[end]               # Cells from the moved marble up to, not including, the end cell
+        keep = ~(segment | (1 << end))
+
+        if step > 0:
+            white = (self._white & keep) | ((self._white & segment) << step)
+            black = (self._black & keep) | ((self._black & segment) << step)
+            red = (self._red & keep) | ((self._red & segment) << step)
+        else:
+            white = (self._white & keep) | ((self._white & segment) >> -step)
+            black = (self._black & keep) | ((self._black & segment) >> -step)
+            red = (self._red & keep) | ((self._red & segment) >> -step)
+
+        # Only the cells whose color changed are hashed again
+        keys = self._cell_keys
+        self._cell_hash ^= (_mask_hash(white ^ self._white, keys["W"]) ^ _mask_hash(black ^ self._black, keys["B"])
+                            ^ _mask_hash(red ^ self._red, keys["R"]))
+        self._white, self._black, self._red = white, black, red
+        return removed_value
+
+    def push_right(self, starting_coordinate):
+        """
+        Shifts the values in a row one space to the right from the starting coordinate and returns the value
+        removed as a string. It takes the coordinates as a tuple of integers, (row, column).
+        """
+
+        return self.push(starting_coordinate, "R")
+
+    def push_left(self, starting_coordinate):
+        """
+        Shifts the values in a row one space to the left from the starting coordinate and returns the value
+        removed as a string. It takes the coordinates as a tuple of integers, (row, column).
+        """
+
+        return self.push(starting_coordinate, "L")
+
+    def push_backward(self, starting_coordinate):
+        """
+        Shifts the values in a column one space backward from the starting coordinate and returns the value
+        removed as a string. It takes the coordinates as a tuple of integers, (row, column).
+        """
+
+        return self.push(starting_coordinate, "B")
+
+    def push_forward(self, starting_coordinate):
+        """
+        Shifts the values in a column one space forward from the starting coordinate and returns the value
+        removed as a string. It takes the coordinates as a tuple of integers, (row, column).
+        """
+
+        return self.push(starting_coordinate, "F")
+
+    def check_marble_access(self, coordinate_pair, move_direction):
+        """
+        Checks if there is an empty space, or the edge of the board, one space behind the marble opposite the
+        given movement direction. Returns True if there is, otherwise False. It takes a coordinate pair as a
+        tuple, (row, column), and a direction, 'R', 'L', 'B', 'F'.
+        """
+
+        if move_direction not in _DIRECTIONS:
+            return False  # Output if a valid direction is not used
+
+        behind = self._behind[move_direction][coordinate_pair[0] * self._size + coordinate_pair[1]]
+
+        # An empty mask means the marble is on the edge of the board
+        return not behind & (self._white | self._black | self._red)
+
+    def reverse_opponents_move(self, move_coordinates, move_direction, opponent_move):
+        """
+        Checks if the proposed move will result in undoing the opponents previous move. It takes the
+        proposed coordinates, the direction, and opponents last move coordinates; returns True if the
+        move will not undo the opponents and False if it will.
+        """
+
+        if opponent_move is None or _OPPOSITES.get(move_direction) != opponent_move[1]:
+            return True
+
+        rays = self._rays[move_direction]
+        ray = rays[move_coordinates[0] * self._size + move_coordinates[1]]
+        opponent_cell = opponent_move[0][0] * self._size + opponent_move[0][1]
+
+        # Checks if the space the opponent moved from is in front of the marble in the same line
+        if not ray & (1 << opponent_cell):
+            return True
+
+        # The move undoes the opponents if the line is full up to the space they moved from
+        between = ray ^ rays[opponent_cell]
+        return bool(between & ~(self._white | self._black | self._red))
+
+    def get_hash(self):
+        """
+        Returns the 64-bit Zobrist hash of the position as an integer. It covers the marbles on the board,
+        whose turn it is and both players' last moves, and it is updated as the position changes instead
+        of being computed from the whole board. Takes no parameters.
+        """
+
+        return self._cell_hash ^ self._state_hash
+
+    def get_cell_hash(self):
+        """
+        Returns the part of the Zobrist hash that covers only the marbles on the board as an integer.
+        Takes no parameters.
+        """
+
+        return self._cell_hash
+
+    def get_state_hash(self):
+        """
+        Returns the part of the Zobrist hash that covers the turn and last moves as an integer.
+        Takes no parameters.
+        """
+
+        return self._state_hash
+
+    def set_state_hash(self, state_hash):
+        """
+        Sets the part of the Zobrist hash that covers the turn and last moves. Returns nothing.
+        """
+
+        self._state_hash = state_hash
+
+    def update_hash(self, key):
+        """
+        Adds or removes a turn or last move key, from turn_key or last_move_key, to or from the hash.
+        Returns nothing.
+        """
+
+        self._state_hash ^= key
+
+    def restore_state_of_board(self, state_of_board):
+        """
+        Sets the count of each color on the board back to a tuple returned by get_state_of_board. Returns nothing.
+        """
+
+        self._state_of_board = list(state_of_board)
+
+    def get_line_state(self, starting_coordinate, direction):
+        """
+        Returns the three color masks so a push can be put back with set_line_state. The whole board is only
+        three integers, so there is no need to copy just the row or column. It takes the same parameters as
+        the Board class.
+        """
+
+        return self._white, self._black, self._red, self._cell_hash
+
+    def set_line_state(self, line_state):
+        """
+        Puts the masks returned by get_line_state back on the board. Returns nothing.
+        """
+
+        self._white, self._black, self._red, self._cell_hash = line_state
+
+    def get_line(self, starting_coordinate, direction):
+        """
+        Returns the values of the row or column through the starting coordinate as a tuple of strings, the
+        same as the Board class. It takes the same parameters as the Board class.
+        """
+
+        if direction == "R" or direction == "L":
+            first, step = starting_coordinate[0] * self._size, 1
+        else:
+            first, step = starting_coordinate[1], self._size
+
+        white, black, red = self._white, self._black, self._red
+        values = []
+
+        for cell in range(first, first + self._size * step, step):
+            bit = 1 << cell
+            values.append("W" if white & bit else "B" if black & bit else "R" if red & bit else "X")
+
+        return tuple(values)
+
+    def removed_by_push(self, starting_coordinate, direction):
+        """
+        Returns the value a push from the starting coordinate in the given direction would remove, as a
+        string, without changing the board. It takes the coordinates as a tuple of integers, (row, column),
+        and the direction as a string. Returns None if the direction is not valid.
+        """
+
+        if direction not in _DIRECTIONS:
+            return None
+
+        cell = starting_coordinate[0] * self._size + starting_coordinate[1]
+
+        if self._rays[direction][cell] & ~(self._white | self._black | self._red):
+            return "X"
+
+        return self._color_at(1 << self._ray_ends[direction][cell])
+
+    def legal_moves(self, marble_color, opponent_move):
+        """
+        Yields every legal move for the given marble color as a tuple of the coordinates, (row, column), and
+        the direction, in the same order as the Board class. The access check for all of the player's marbles
+        is done at once per direction by shifting the mask of empty cells. It takes the marble color as a
+        string and the opponents last move.
+        """
+
+        if marble_color == "W":
+            own = self._white
+        elif marble_color == "B":
+            own = self._black
+        else:
+            return
+
+        size = self._size
+        rays = self._rays
+        ray_ends = self._ray_ends
+        edges = self._edges
+        occupied = self._white | self._black | self._red
+        empty = ~occupied & self._full_board
+
+        # Marbles with an empty space or the edge behind them, for each direction
+        access = {"R": own & (edges["R"] | (empty << 1)), "L": own & (edges["L"] | (empty >> 1)),
+                  "B": own & (edges["B"] | (empty << size)), "F": own & (edges["F"] | (empty >> size))}
+
+        # The one direction the opponents last move can forbid, and the cell they moved from
+        if opponent_move is not None:
+            blocked_direction = _OPPOSITES.get(opponent_move[1])
+            opponent_bit = 1 << (opponent_move[0][0] * size + opponent_move[0][1])
+            opponent_ray = rays[blocked_direction][opponent_move[0][0] * size + opponent_move[0][1]]
+        else:
+            blocked_direction = None
+
+        while own:
+            bit = own & -own
+            own ^= bit
+            cell = bit.bit_length() - 1
+
+            for direction in _MOVE_ORDER:
+                if not access[direction] & bit:
+                    continue
+
+                ray = rays[direction][cell]
+
+                # Checks for pushing one of the player's own marbles off the edge
+                if not ray & empty and self._color_at(1 << ray_ends[direction][cell]) == marble_color:
+                    continue
+
+                # Checks for undoing the opponents last move
+                if direction == blocked_direction and ray & opponent_bit and not (ray ^ opponent_ray) & empty:
+                    continue
+
+                yield divmod(cell, size), direction
+
+
+def standard_layout(size=7):
+    """
+    Returns the starting layout of a board of the given odd size as a list of strings, one for each row: a
+    square of each player's marbles in two opposite corners, white at the top left and bottom right and black
+    at the other two, and a diamond of red marbles in the middle. On the standard 7x7 board that is 8 marbles
+    for each player and 13 red marbles.
+    """
+
+    if size % 2 == 0 or not 5 <= size <= MAX_BOARD_SIZE:
+        raise ValueError("The standard layout needs an odd board size from 5 to " + str(MAX_BOARD_SIZE) + ".")
+
+    corner = (size - 1) // 3            # Side of each corner square
+    middle = size // 2
+    radius = middle - 1                 # Cells from the middle to each point of the diamond
+    layout = []
+
+    for row in range(size):
+        values = ""
+
+        for column in range(size):
+            top, left = row < corner, column < corner
+            bottom, right = row >= size - corner, column >= size - corner
+
+            if (top and left) or (bottom and right):
+                values += "W"
+            elif (top and right) or (bottom and left):
+                values += "B"
+            elif abs(row - middle) + abs(column - middle) <= radius:
+                values += "R"
+            else:
+                values += "X"
+
+        layout.append(values)
+
+    return layout
+
+
+def _layout_grid(layout):
+    """
+    Returns a starting layout as a new list of lists of strings, the standard 7x7 layout if it is None. Raises
+    a ValueError unless the layout is square, from MIN_BOARD_SIZE to MAX_BOARD_SIZE on a side, and only holds
+    'W', 'B', 'R' and 'X'.
+    """
+
+    if layout is None:
+        return [list(row) for row in _STANDARD_LAYOUT]
+
+    grid = [list(row) for row in layout]
+
+    if not MIN_BOARD_SIZE <= len(grid) <= MAX_BOARD_SIZE or any(len(row) != len(grid) for row in grid):
+        raise ValueError("A layout must be a square from " + str(MIN_BOARD_SIZE) + " to " + str(MAX_BOARD_SIZE)
+                         + " cells on a side.")
+
+    if any(value not in ("W", "B", "R", "X") for row in grid for value in row):
+        raise ValueError("A layout can only hold 'W', 'B', 'R' and 'X'.")
+
+    return grid
+
+
+def _count_marbles(grid):
+    """
+    Returns the count of the white, black and red marbles in a list of lists of strings as a list, in that
+    order.
+    """
+
+    return [sum(row.count(color) for row in grid) for color in ("W", "B", "R")]
+
+
+def _build_rays(size):
+    """
+    Builds the lookup tables used by the BitBoard class for a board of the given size. For each direction and
+    cell it returns the mask of the cells from that cell to the edge of the board in that direction, the index
+    of the edge cell, and the mask of the cell one space behind it (0 when the cell is on the edge it would be
+    pushed away from).
+    """
+
+    rays = {}
+    ray_ends = {}
+    behind = {}
+
+    for direction, (row_step, column_step) in _DIRECTIONS.items():
+        rays[direction] = []
+        ray_ends[direction] = []
+        behind[direction] = []
+
+        for cell in range(size * size):
+            row, column = divmod(cell, size)
+            mask = 0
+
+            while 0 <= row < size and 0 <= column < size:
+                mask |= 1 << (row * size + column)
+                end = row * size + column
+                row += row_step
+                column += column_step
+
+            rays[direction].append(mask)
+            ray_ends[direction].append(end)
+
+            row, column = divmod(cell, size)
+            row -= row_step
+            column -= column_step
+
+            if 0 <= row < size and 0 <= column < size:
+                behind[direction].append(1 << (row * size + column))
+            else:
+                behind[direction].append(0)
+
+    return rays, ray_ends, behind
+
+
+def _build_keys(size):
+    """
+    Returns the Zobrist keys of a board of the given size: the keys of each color on each cell, 0 for an empty
+    cell, of each color's turn and of each color's last move. The generator is seeded so hashes match between
+    processes and runs, and the 7x7 board keeps the keys it has always had.
+    """
+
+    source = random.Random(0x4B756261 ^ ((size - 7) << 32))
+    cell_keys = {color: [source.getrandbits(64) for _ in range(size * size)] for color in ("W", "B", "R")}
+    cell_keys["X"] = [0] * (size * size)
+    turn_keys = {"W": source.getrandbits(64), "B": source.getrandbits(64)}
+    last_move_keys = {color: [source.getrandbits(64) for _ in range(size * size * 4)] for color in ("W", "B")}
+    return cell_keys, turn_keys, last_move_keys
+
+
+def _tables(size):
+    """
+    Returns the lookup tables of a board of the given size as a dictionary, building them the first time the
+    size is used. Every board of the same size shares them.
+    """
+
+    tables = _TABLES.get(size)
+
+    if tables is None:
+        rays, ray_ends, behind = _build_rays(size)
+        cell_keys, turn_keys, last_move_keys = _build_keys(size)
+
+        # Cells on the edge of the board with no space behind them for a push in each direction
+        edges = {direction: sum(1 << cell for cell in range(size * size) if not behind[direction][cell])
+                 for direction in _DIRECTIONS}
+        tables = {"steps": {"R": 1, "L": -1, "B": size, "F": -size}, "rays": rays, "ray_ends": ray_ends,
+                  "behind": behind, "edges": edges, "full_board": (1 << size * size) - 1, "cell_keys": cell_keys,
+                  "turn_keys": turn_keys, "last_move_keys": last_move_keys}
+        _TABLES[size] = tables
+
+    return tables
+
+
+def _grid_hash(grid, keys):
+    """
+    Returns the Zobrist hash of the marbles in a square list of lists of strings, using the cell keys of its size.
+    """
+
+    cell_hash = 0
+    size = len(grid)
+
+    for row in range(size):
+        for column in range(size):
+            cell_hash ^= keys[grid[row][column]][row * size + column]
+
+    return cell_hash
+
+
+def _mask_hash(mask, keys):
+    """
+    Returns the Zobrist keys of every cell set in the mask combined together.
+    """
+
+    cell_hash = 0
+
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
+        cell_hash ^= keys[bit.bit_length() - 1]
+
+    return cell_hash
+
+
+def turn_key(marble_color):
+    """
+    Returns the Zobrist key for it being the turn of the player with the given marble color. The key is 0
+    when no player has the turn yet.
+    """
+
+    return _TURN_KEYS.get(marble_color, 0)
+
+
+def last_move_key(marble_color, last_move, size=7):
+    """
+    Returns the Zobrist key for the last move, ((row, column), direction), of the player with the given
+    marble color on a board of the given size. The key is 0 when the player has not moved yet.
+    """
+
+    if last_move is None:
+        return 0
+
+    keys = (_TABLES.get(size) or _tables(size))["last_move_keys"][marble_color]
+    return keys[(last_move[0][0] * size + last_move[0][1]) * 4 + _DIRECTION_INDEX[last_move[1]]]
+
+
+def _code_size(size):
+    """
+    Returns the number of bytes a move code takes in get_state_bytes on a board of the given size: one while
+    every code fits below 255, as on the 7x7 board, otherwise two.
+    """
+
+    return 1 if size * size * 4 < 255 else 2
+
+
+def _move_code(move, size=7):
+    """
+    Returns a move, ((row, column), direction), on a board of the given size as a number, cell * 4 + direction
+    index, or for None the largest number the move code's bytes can hold, 255 on the 7x7 board.
+    """
+
+    if move is None:
+        return (1 << 8 * _code_size(size)) - 1
+
+    return (move[0][0] * size + move[0][1]) * 4 + _DIRECTION_INDEX[move[1]]
+
+
+def _move_from_code(code, size=7):
+    """
+    Returns the move, ((row, column), direction), of a number from _move_code, or None.
+    """
+
+    if code == (1 << 8 * _code_size(size)) - 1:
+        return None
+
+    cell, direction = divmod(code, 4)
+    return divmod(cell, size), _MOVE_ORDER[direction]
+
+
+_DIRECTIONS = {"R": (0, 1), "L": (0, -1), "B": (1, 0), "F": (-1, 0)}   # (row, column) step of each direction
+_OPPOSITES = {"R": "L", "L": "R", "B": "F", "F": "B"}
+_MOVE_ORDER = ("R", "L", "B", "F")                                     # Order moves are generated in
+_DIRECTION_INDEX = {direction: index for index, direction in enumerate(_MOVE_ORDER)}
+MIN_BOARD_SIZE = 3                                                      # Smallest and largest boards a game can have
+MAX_BOARD_SIZE = 15
+_STANDARD_LAYOUT = standard_layout(7)
+_TABLES = {}                                                            # Lookup tables of each board size used
+_TURN_KEYS = _tables(7)["turn_keys"]                                    # The same on boards of every size
+_ENGINES = {"grid": Board, "bitboard": BitBoard}                       # Board classes a game can be played on
+STATE_SIZE = 60                                                         # Length of get_state_bytes on a 7x7 board
+KO_RULES = ("none", "ko", "superko")                                    # Repetition rules a game can be played with
+
+
+class Player:
+    """
+    Defines each game player based on their name and color of marble. It holds methods to initialize the name,
+    marble color, count of captured red marbles, current count of player's marbles, and the most recent move
+    made by that player. It takes player name and marble color as parameters. It only needs to communicate with
+    the KubaGame class in order to update information concerning the player.
+    """
+
+    __slots__ = ("_players_name", "_marble_color", "_red_marbles", "_marbles", "_last_move")
+
+    def __init__(self, players_name, marble_color, marbles=8):
+        """
+        Initializes the player's name, marble color, number of red marbles, number of their marbles,
+        and the coordinates of their most recent move. It takes strings of players' name and their
+        marble color ('W' or 'B'), and optionally the number of marbles they start with, and returns nothing.
+        """
+
+        self._players_name = players_name
+        self._marble_color = marble_color
+        self._red_marbles = 0               # Initializes the number of captured red marbles
+        self._marbles = marbles             # Initializes the number of marbles they have on the board
+        self._last_move = None              # Initializes the last move made
+
+    def get_players_name(self):
+        """
+        Returns the player's name as a string. Takes no parameters.
+        """
+
+        return self._players_name
+
+    def get_marble_color(self):
+        """
+        Returns the color of the player's marbles as a string. Takes no parameters.
+        """
+
+        return self._marble_color
+
+    def get_red_marbles(self):
+        """
+        Returns the number of the red marbles the player has captured as an integer.
+        Takes no parameters.
+        """
+
+        return self._red_marbles
+
+    def set_red_marbles(self):
+        """
+        Updates the number of captured red marbles. Takes no parameters and returns nothing.
+        """
+
+        self._red_marbles += 1
+
+    def get_marbles(self):
+        """
+        Returns the number of player's stones on the board as an integer. Takes no parameters.
+        """
+
+        return self._marbles
+
+    def set_marbles(self):
+        """
+        Updates the number of player's stones left on the board. Takes no parameters and returns nothing.
+        """
+
+        self._marbles -= 1
+
+    def get_last_move(self):
+        """
+        Returns the coordinates of the last move made by the player as a tuple of integers.
+        Takes no parameters.
+        """
+
+        return self._last_move
+
+    def set_last_move(self, coordinates, direction_moved):
+        """
+         Updates the _last_move with the coordinates and direction of the last move made by the player as a tuple. Takes
+         a tuple of integers, (row, column), as coordinates and a direction as a string. It returns nothing.
+        """
+
+        self._last_move = (coordinates, direction_moved)
+
+    def get_state(self):
+        """
+        Returns the player's captured red marbles, marbles on the board and last move as a tuple, in that
+        order. Takes no parameters.
+        """
+
+        return self._red_marbles, self._marbles, self._last_move
+
+    def set_state(self, red_marbles, marbles, last_move):
+        """
+        Restores the player's captured red marbles, marbles on the board and last move to values returned
+        by get_state. Returns nothing.
+        """
+
+        self._red_marbles = red_marbles
+        self._marbles = marbles
+        self._last_move = last_move
+
+
+class TranspositionTable:
+    """
+    A fixed size table of results keyed by the 64-bit position hash from Board.get_hash, shared by search code
+    and anything else that wants to remember something about a position, such as a repetition check. Each key
+    maps to one slot. When two positions want the same slot, the one searched deeper is kept, unless the
+    stored one is left over from an earlier search, in which case it is always replaced. It takes the number
+    of slots as a parameter, rounded up to a power of two.
+    """
+
+    EXACT = 0           # The value is the exact score of the position
+    LOWER = 1           # The value is a lower bound, the search failed high
+    UPPER = 2           # The value is an upper bound, the search failed low
+
+    def __init__(self, size=1 << 16):
+        """
+        Initializes the empty slots and the search generation. Takes the number of slots as an integer.
+        """
+
+        slots = 1
+        while slots < size:
+            slots <<= 1
+
+        self._mask = slots - 1
+        self._slots = [None] * slots    # Each slot is (key, depth, value, flag, move, generation) or None
+        self._generation = 0
+
+    def get_size(self):
+        """
+        Returns the number of slots in the table as an integer. Takes no parameters.
+        """
+
+        return self._mask + 1
+
+    def get_entry(self, key):
+        """
+        Returns the (depth, value, flag, move) stored for the position hash, or None if the position is not
+        in the table. Takes the hash as an integer.
+        """
+
+        entry = self._slots[key & self._mask]
+
+        if entry is None or entry[0] != key:
+            return None
+
+        return entry[1:5]
+
+    def set_entry(self, key, depth, value, flag=EXACT, move=None):
+        """
+        Stores a result for the position hash if the replacement policy allows it. Takes the hash, the depth
+        the position was searched to, the value, how the value bounds the real score and the best move found.
+        Returns True if it was stored and False if a deeper result from this search was kept instead.
+        """
+
+        index = key & self._mask
+        entry = self._slots[index]
+
+        if entry is not None and entry[0] != key and entry[5] == self._generation and entry[1] > depth:
+            return False
+
+        self._slots[index] = (key, depth, value, flag, move, self._generation)
+        return True
+
+    def get_entries(self, min_depth=0):
+        """
+        Returns a list of the (key, depth, value, flag, move) of every stored entry searched to at least
+        min_depth, so they can be sent to another table with merge. Takes the minimum depth as an integer.
+        """
+
+        return [entry[:5] for entry in self._slots if entry is not None and entry[1] >= min_depth]
+
+    def merge(self, entries):
+        """
+        Stores a list of entries from get_entries in this table, using the same replacement policy as
+        set_entry. Returns nothing.
+        """
+
+        for key, depth, value, flag, move in entries:
+            self.set_entry(key, depth, value, flag, move)
+
+    def new_search(self):
+        """
+        Starts a new search generation, so entries from earlier searches are replaced first. Returns nothing.
+        """
+
+        self._generation += 1
+
+    def clear(self):
+        """
+        Removes every entry from the table. Returns nothing.
+        """
+
+        self._slots = [None] * (self._mask + 1)
+        self._generation = 0
+
+
+class KubaGame:
+    """
+    The main class for the game to run. It holds methods for updating the board information, the players information
+    and in order to execute a move in any of the four directions (right, left, forward and backward). It keeps track
+    of which players' turn it is and if a winner has been declared. It updates how many red marbles have been captured
+    by each player and how many marbles are left on the board. It can also provide information about the board and
+    about each player. It takes two parameter: player_one and player_two as tuples of players' name and their marble
+    color (white or black). It communicates with the Board class in order to initialize the board, update the board
+    after a move has been executed, judge if a valid move can be executed and access the count of each color of marble
+    currently on the board. It communicates with the Player class in order to initialize each player in the game,
+    access the number of red marbles that have been captured by a player, and allow each player to try and execute
+    a new move. It communicates with the exception class to handle a player name entered into the make_move and
+    get_captured methods who is not actually playing the game.
+    """
+
+    __slots__ = ("_player1", "_player2", "_players", "_game_board", "_current_turn", "_winner", "_undo_stack",
+                 "_search", "_recorder", "_book", "_metrics", "_ko_rule", "_history", "_seen", "_size", "_red_to_win",
+                 "_shared_seen", "_history_keys")
+
+    def __init__(self, player_one, player_two, engine="grid", ko_rule="ko", size=7, layout=None, red_to_win=None):
+        """
+        Initializes the players, the game board, the current player who turn it is and who has one the game.
+        It takes two tuples, (player name, marble color) in that order of the players playing the game. and
+        returns nothing. An optional engine string picks how the board is stored: 'grid' for the list of
+        lists Board, or 'bitboard' for the BitBoard. Both play exactly the same game. An optional ko_rule
+        picks which repeated positions are not allowed, as described in set_ko_rule. The board is size by size
+        with the standard_layout of that size, unless a starting layout, a square list of rows of 'W', 'B',
+        'R' and 'X', is given. A player wins by capturing red_to_win red marbles, by default more than half of
+        the red marbles on the board at the start, 7 of the 13 on the standard board, or by pushing all of the
+        opponent's marbles off.
+        """
+
+        if engine not in _ENGINES:
+            raise ValueError("Unknown board engine: " + str(engine))
+
+        if ko_rule not in KO_RULES:
+            raise ValueError("Unknown Ko rule: " + str(ko_rule))
+
+        if layout is None and size != 7:
+            layout = standard_layout(size)
+
+        self._game_board = _ENGINES[engine](layout)                     # Initializes the game board
+        self._size = self._game_board.get_size()
+        counts = self._game_board.get_state_of_board()
+        self._red_to_win = counts[2] // 2 + 1 if red_to_win is None else red_to_win
+
+        if layout is not None and size not in (7, self._size):
+            raise ValueError("The layout is not " + str(size) + " cells on a side.")
+
+        # Initializes the first and second player with the marbles of their color on the board
+        self._player1 = Player(player_one[0], player_one[1].upper(), counts[0 if player_one[1].upper() == "W" else 1])
+        self._player2 = Player(player_two[0], player_two[1].upper(), counts[0 if player_two[1].upper() == "W" else 1])
+
+        # player dictionary
+        self._players = {player_one[0]: self._player1, player_two[0]: self._player2}
+        self._current_turn = None                                       # Any player can start the game
+        self._winner = None                                             # Nobody has one yet
+        self._undo_stack = []                                           # Undo records for apply_move
+        self._search = None                                             # Computer player, made when first used
+        self._recorder = None                                           # Game record writer, if one is attached
+        self._book = None                                               # Opening book best_move looks in first
+        self._metrics = None                                            # Timers and counters of make_move, if set
+        self._ko_rule = ko_rule
+
+        # The marbles on the board after each move, as linked (cell hash, player who moved, previous entry)
+        # tuples from the latest back to the start that forks of the game share, and under superko how many
+        # times each cell hash is in it, so a repeated position is found without looking at the board
+        self._history_keys = None           # Cell keys of the history if not the board's, see set_history_bytes
+        self._history = (self._game_board.get_cell_hash(), None, None)
+        self._seen = self._count_history() if ko_rule == "superko" else None
+        self._shared_seen = False           # True while a fork uses the same counts, which are copied to change them
+
+    def __getstate__(self):
+        """
+        Returns the game's attributes for pickling and copying, leaving out the computer player, whose table
+        and worker processes belong to this game only, the game record writer, the opening book and the
+        metrics.
+        """
+
+        state = {name: getattr(self, name) for name in self.__slots__}
+        state["_search"] = None
+        state["_recorder"] = None
+        state["_book"] = None
+        state["_metrics"] = None
+        state["_history"] = self._history_entries()     # A list, as a long chain is too deep to pickle
+        return state
+
+    def __setstate__(self, state):
+        """
+        Sets the game's attributes from a dictionary returned by __getstate__ when unpickling or copying.
+        """
+
+        for name, value in state.items():
+            setattr(self, name, value)
+
+        self._history = None
+
+        for cell_hash, player_name in state["_history"]:
+            self._history = (cell_hash, player_name, self._history)
+
+    def set_recorder(self, recorder):
+        """
+        Attaches an object that is told about every call to make_move that changes the game, or detaches it
+        when None. The recorder's record_move(game, player_name, coordinates, direction) is called for moves
+        that changed the board and record_pass(game, player_name) for rejected moves that only passed the
+        turn. Returns nothing.
+        """
+
+        self._recorder = recorder
+
+    def get_recorder(self):
+        """
+        Returns the attached game record writer, or None. Takes no parameters.
+        """
+
+        return self._recorder
+
+    def set_opening_book(self, book):
+        """
+        Sets an OpeningBook from KubaBook.py that best_move looks in before searching, or None for no book.
+        Returns nothing.
+        """
+
+        self._book = book
+
+    def get_opening_book(self):
+        """
+        Returns the opening book best_move looks in, or None. Takes no parameters.
+        """
+
+        return self._book
+
+    def set_metrics(self, metrics):
+        """
+        Sets a MoveMetrics from KubaMetrics.py that times every call to make_move and counts its result, or
+        None to stop. Without metrics make_move does no timing at all. Returns nothing.
+        """
+
+        self._metrics = metrics
+
+    def get_metrics(self):
+        """
+        Returns the MoveMetrics make_move reports to, or None. Takes no parameters.
+        """
+
+        return self._metrics
+
+    def set_ko_rule(self, ko_rule):
+        """
+        Sets which repeated positions make_move rejects. 'none' only has the rule that a player can not push
+        back along the line of the opponent's last push. 'ko' also rejects a move that puts the marbles back
+        where they were before the opponent's last move, and 'superko' one that puts them anywhere they have
+        been before in the game. Positions are compared by the hash of the marbles on the board. Takes the
+        rule as a string and returns nothing.
+        """
+
+        if ko_rule not in KO_RULES:
+            raise ValueError("Unknown Ko rule: " + str(ko_rule))
+
+        if ko_rule != "superko":
+            self._seen = None
+        elif self._seen is None:
+            self._seen = self._count_history()
+
+        self._shared_seen = False
+        self._ko_rule = ko_rule
+
+    def get_ko_rule(self):
+        """
+        Returns the repetition rule of the game, 'none', 'ko' or 'superko', as a string. Takes no parameters.
+        """
+
+        return self._ko_rule
+
+    def get_current_turn(self):
+        """
+        Returns which players' turn it is as a string. Takes no parameters.
+        """
+
+        return self._current_turn
+
+    def set_current_turn(self, players_name):
+        """
+        Sets whose turn it is and updates the turn key in the board's hash. Takes the player's name as a
+        string and returns nothing.
+        """
+
+        board = self._game_board
+
+        if self._current_turn is not None:
+            board.update_hash(turn_key(self._players[self._current_turn].get_marble_color()))
+
+        if players_name is not None:
+            board.update_hash(turn_key(self._players[players_name].get_marble_color()))
+
+        self._current_turn = players_name
+
+    def get_hash(self):
+        """
+        Returns the 64-bit Zobrist hash of the current position as an integer, covering the marbles on the
+        board, whose turn it is and both players' last moves. Takes no parameters.
+        """
+
+        return self._game_board.get_hash()
+
+    def get_cell_hash(self):
+        """
+        Returns the 64-bit Zobrist hash of only the marbles on the board as an integer, the hash the Ko rule
+        compares positions with. Takes no parameters.
+        """
+
+        return self._game_board.get_cell_hash()
+
+    def get_winner(self):
+        """
+        Returns the players' name who has won the game as a string. Takes no parameters.
+        """
+
+        return self._winner
+
+    def get_captured(self, players_name):
+        """
+        Returns the number of red marbles a specified player has captured as an integer. Takes the
+        player's name as a string for a parameter. Returns nothing or returns a message saying that
+        the entered name does not match a player in the current game.
+        """
+
+        # Handles exception for an entered name that is not a player in the game
+        try:
+            return self._players[players_name].get_red_marbles()
+        except IndexError:
+            return "That player is not part of this game."
+
+    def get_players(self):
+        """
+        Returns the (player name, marble color) of player one and player two as a tuple of two tuples, the
+        same way they are given to KubaGame. Takes no parameters.
+        """
+
+        return ((self._player1.get_players_name(), self._player1.get_marble_color()),
+                (self._player2.get_players_name(), self._player2.get_marble_color()))
+
+    def get_engine(self):
+        """
+        Returns the name of the board engine the game is played on, 'grid' or 'bitboard', as a string.
+        Takes no parameters.
+        """
+
+        for engine, board_class in _ENGINES.items():
+            if type(self._game_board) is board_class:
+                return engine
+
+    def get_size(self):
+        """
+        Returns the number of rows, and of columns, of the board as an integer, 7 for the standard board.
+        Takes no parameters.
+        """
+
+        return self._size
+
+    def get_red_to_win(self):
+        """
+        Returns the number of red marbles a player has to capture to win as an integer. Takes no parameters.
+        """
+
+        return self._red_to_win
+
+    def get_player_color(self, players_name):
+        """
+        Returns the color of the specified player's marbles as a string. Takes the player's name as a string.
+        """
+
+        return self._players[players_name].get_marble_color()
+
+    def get_last_move(self, players_name):
+        """
+        Returns the last move made by the specified player as a tuple of the coordinates, (row, column), and
+        the direction, or None if they have not moved. Takes the player's name as a string.
+        """
+
+        return self._players[players_name].get_last_move()
+
+    def get_marble_count(self):
+        """
+        Returns a tuple of the number of white, black and red marbles still on the board; in that order.
+        Takes no parameters.
+        """
+
+        return self._game_board.get_state_of_board()
+
+    def get_marble(self, coordinates):
+        """
+        Checks the board for the color of marble at the specified coordinate value. Coordinates
+        are input as a tuple of integers, (row, column); in that order as a parameter.
+        The function returns 'W', 'B', 'R', or 'X'; white, black, red, or empty space respectively as a string.
+        """
+
+        return self._game_board.get_marble(coordinates)
+
+    def move_right(self, starting_coordinate):
+        """
+        Executes a move to the right and updates the game board. It takes the coordinates
+        of the marble being moved as a tuple of integers, (row, column), as a parameter. It returns the
+        value removed to shift the values within the row as a string and the updated board
+        as a list.
+        """
+
+        removed_value = self._game_board.push_right(starting_coordinate)
+        return removed_value, self._game_board.get_grid()   # Returns the removed value and the updated marble positions
+
+    def move_left(self, starting_coordinate):
+        """
+        Executes a move to the left and updates the game board. It takes the coordinates
+        of the marble being moved as a tuple of integers, (row, column), as a parameter. It returns
+        the value removed to shift the values within the row as a string and the updated
+        board as a list.
+        """
+
+        removed_value = self._game_board.push_left(starting_coordinate)
+        return removed_value, self._game_board.get_grid()   # Returns the removed value and the updated marble positions
+
+    def move_backward(self, starting_coordinate):
+        """
+        Executes a backward move on the board and updates the game board. It takes the
+        coordinates of the marble being moved as a tuple of integers, (row, column), as a parameter.
+        It returns the value removed to shift the values within the column as a string
+        and the updated board as a list.
+        """
+
+        removed_value = self._game_board.push_backward(starting_coordinate)
+        return removed_value, self._game_board.get_grid()   # Returns the value that was removed and the updated board
+
+    def move_forward(self, starting_coordinate):
+        """
+        Executes a forward move on the board and updates the game board. It takes the
+        coordinates of the marble being moved as a tuple of integers, (row, column), as a parameter.
+        It returns the value removed to shift the values in the column as a string and
+        the updated board as a list.
+        """
+
+        removed_value = self._game_board.push_forward(starting_coordinate)
+        return removed_value, self._game_board.get_grid()   # Returns the removed value and the updated board
+
+    def check_marble_access(self, coordinate_pair, move_direction):
+        """
+        Checks if there is an empty space on the side of the marble one space
+        in the direction opposite the given movement direction based on the
+        coordinates of the marble that is being moved. If there is not an empty
+        space, it returns False, otherwise it returns True. It takes a coordinate
+        pair as a tuple, (row, column), in order and a direction, 'R', 'L', 'B', 'F'.
+        """
+
+        return self._game_board.check_marble_access(coordinate_pair, move_direction)
+
+    def reverse_opponents_move(self, move_coordinates, move_direction, opponent_move):
+        """
+        Checks if the proposed move will result in undoing the opponents previous move.
+        It takes the proposed coordinates, the direction, and opponents last move coordinates;
+        returns True if the move will not undo the opponents and False if it will.
+        """
+
+        return self._game_board.reverse_opponents_move(move_coordinates, move_direction, opponent_move)
+
+    def removed_by_push(self, marble_coordinate, movement_direction):
+        """
+        Returns the value a push of the marble in the given direction would knock off the board, as a string,
+        or 'X' if nothing would fall off, without changing the board. It takes the coordinates of the marble
+        as a tuple of integers, (row, column), and the direction as a string.
+        """
+
+        return self._game_board.removed_by_push(marble_coordinate, movement_direction)
+
+    def legal_moves(self, player_name):
+        """
+        Yields every move the player can make right now as a tuple of the marble coordinates, (row, column),
+        and the direction, 'R', 'L', 'B' or 'F'. It uses the same rules as make_move: it must be the player's
+        turn, the marble must be theirs and reachable, the move can not undo the opponents last move and it can
+        not push one of their own marbles off the board. Nothing is yielded once the game has a winner. Takes
+        the player's name as a string.
+        """
+
+        if self._winner is not None:
+            return
+
+        if self._current_turn != player_name and self._current_turn is not None:
+            return
+
+        if player_name == self._player1.get_players_name():
+            opponent_move = self._player2.get_last_move()
+        else:
+            opponent_move = self._player1.get_last_move()
+
+        marble_color = self._players[player_name].get_marble_color()
+
+        if not self._may_repeat(player_name):
+            yield from self._game_board.legal_moves(marble_color, opponent_move)
+            return
+
+        board = self._game_board
+
+        for move in board.legal_moves(marble_color, opponent_move):
+            line_state = board.get_line_state(*move)
+            board.push(*move)
+            repeated = self._repeats(player_name, self._history_hash())
+            board.set_line_state(line_state)
+
+            if not repeated:
+                yield move
+
+    def evaluate_moves(self, player_name, moves):
+        """
+        Checks many candidate moves of a player at once without changing the game, not even the turn that a
+        rejected make_move passes on. Returns a list with a tuple for each move, in order, of whether
+        make_move would accept it, the reason it would be rejected or None, and the value the push would
+        knock off the board, 'W', 'B', 'R' or 'X' for nothing. The reasons are those of KubaMetrics.py. The
+        value is None for moves rejected before the push could be worked out: a game that is over, the wrong
+        turn, bad coordinates, a bad direction, no access or the wrong color. Each row and column is read once
+        for all the moves along it. Takes the player's name as a string and the moves as (coordinates,
+        direction) pairs.
+        """
+
+        moves = list(moves)
+
+        if self._winner is not None:
+            return [(False, "game_over", None)] * len(moves)
+
+        if self._current_turn != player_name and self._current_turn is not None:
+            return [(False, "wrong_turn", None)] * len(moves)
+
+        if player_name == self._player1.get_players_name():
+            opponent_move = self._player2.get_last_move()
+        elif player_name == self._player2.get_players_name():
+            opponent_move = self._player1.get_last_move()
+        else:
+            opponent_move = None
+
+        check_repeat = self._ko_rule != "none" and self._may_repeat(player_name)
+        size = self._size
+        last_index = size - 1
+        results = []
+        lines = {}      # Values and the nearest empty cell on each side of every cell, of each line read so far
+
+        for coordinates, direction in moves:
+            row, column = coordinates
+
+            if not (0 <= row <= last_index and 0 <= column <= last_index):
+                results.append((False, "bad_coordinate", None))
+                continue
+
+            if direction not in _MOVE_ORDER:
+                results.append((False, "bad_direction", None))
+                continue
+
+            # A move's position along its line, the line's number, and the cell steps along the line and across
+            vertical = direction == "B" or direction == "F"
+
+            if vertical:
+                position, line, stride, across = row, column, size, 1
+            else:
+                position, line, stride, across = column, row, 1, size
+
+            line_key = (vertical, line)
+
+            if line_key not in lines:
+                values = self._game_board.get_line(coordinates, direction)
+                after = [size] * (size + 1)     # First empty cell at or after each position, size if none
+                before = [-1] * (size + 1)      # Last empty cell at or before each position, -1 if none
+
+                for index in range(last_index, -1, -1):
+                    after[index] = index if values[index] == "X" else after[index + 1]
+
+                for index in range(size):
+                    before[index] = index if values[index] == "X" else before[index - 1]
+
+                lines[line_key] = values, after, before
+
+            values, after, before = lines[line_key]
+            forward = direction == "R" or direction == "B"
+
+            # Check for access to the marble
+            behind = position - 1 if forward else position + 1
+
+            if 0 <= behind <= last_index and values[behind] != "X":
+                results.append((False, "no_access", None))
+                continue
+
+            # Check for a player trying to move any marble but their own
+            if values[position] != self._players[player_name].get_marble_color():
+                results.append((False, "wrong_color", None))
+                continue
+
+            # The push moves every marble from this one up to the first empty cell, or off the far edge
+            if forward:
+                gap = after[position]
+                removed_value = "X" if gap <= last_index else values[last_index]
+                last = min(gap, last_index)
+            else:
+                gap = before[position]
+                removed_value = "X" if gap >= 0 else values[0]
+                last = max(gap, 0)
+
+            # Check for reversing an opponents previous move, which is a push back with the line full from this
+            # marble up to the space the opponent moved from
+            if (opponent_move is not None and direction == _OPPOSITES[opponent_move[1]]
+                    and opponent_move[0][1 if vertical else 0] == line):
+                opponent_position = opponent_move[0][0 if vertical else 1]
+
+                if (position <= opponent_position <= gap) if forward else (gap <= opponent_position <= position):
+                    results.append((False, "ko_reversal", removed_value))
+                    continue
+
+            if removed_value == values[position]:
+                results.append((False, "self_ejection", removed_value))
+                continue
+
+            if check_repeat:
+                keys = self._history_keys or _tables(size)["cell_keys"]
+                cell_hash = self._history_hash()
+                step = 1 if forward else -1
+
+                for index in range(position, last + step, step):
+                    new_value = "X" if index == position else values[index - step]
+                    cell = index * stride + line * across
+                    cell_hash ^= keys[values[index]][cell] ^ keys[new_value][cell]
+
+                if self._repeats(player_name, cell_hash):
+                    results.append((False, "repetition", removed_value))
+                    continue
+
+            results.append((True, None, removed_value))
+
+        return results
+
+    def _may_repeat(self, player_name):
+        """
+        Returns True if a move of the player could put the marbles somewhere the Ko rule does not allow, so
+        the position after each move has to be checked, otherwise False.
+        """
+
+        if self._ko_rule == "superko":
+            return True
+
+        # A push changes at least two cells of its own line, so right after the opponent's move only a push
+        # back along the same line that refills the space they moved from can undo it, and
+        # reverse_opponents_move already rejects those. Only after a pass is the position further back.
+        return self._ko_rule == "ko" and self._history[2] is not None and self._history[1] == player_name
+
+    def _history_hash(self):
+        """
+        Returns the cell hash of the marbles on the board the way the position history keeps it, which is the
+        board's own cell hash unless set_history_bytes was given the cells of another board.
+        """
+
+        if self._history_keys is None:
+            return self._game_board.get_cell_hash()
+
+        return _grid_hash(self._game_board.get_grid(), self._history_keys)
+
+    def _repeats(self, player_name, cell_hash):
+        """
+        Returns True if the player's move leading to the marbles with the given cell hash is not allowed by
+        the Ko rule, otherwise False.
+        """
+
+        if self._ko_rule == "superko":
+            return cell_hash in self._seen
+
+        if self._ko_rule == "ko":
+            # The position before the opponent's most recent move
+            entry = self._history
+
+            while entry[2] is not None:
+                if entry[1] not in (player_name, None):
+                    return entry[2][0] == cell_hash
+
+                entry = entry[2]
+
+        return False
+
+    def _history_entries(self):
+        """
+        Returns the position history as a list of (cell hash, player who moved) tuples with the start first.
+        """
+
+        entries = []
+        entry = self._history
+
+        while entry is not None:
+            entries.append(entry[:2])
+            entry = entry[2]
+
+        entries.reverse()
+        return entries
+
+    def _count_history(self):
+        """
+        Returns a dictionary of how many times each cell hash is in the position history, for superko.
+        """
+
+        seen = {}
+
+        for cell_hash, player_name in self._history_entries():
+            seen[cell_hash] = seen.get(cell_hash, 0) + 1
+
+        return seen
+
+    def finish_move(self, player_name, marble_coordinate, movement_direction, removed_value):
+        """
+        Updates the players, the marble counts, the current turn and the winner after a valid move has been
+        pushed on the board. It takes the players' name, the coordinates and direction of the move and the
+        value the push removed from the board. Returns nothing.
+        """
+
+        player = self._players[player_name]
+        marble_color = player.get_marble_color()
+
+        # Sets players' last move and swaps its key in the board's hash
+        self._game_board.update_hash(last_move_key(marble_color, player.get_last_move(), self._size)
+                                     ^ last_move_key(marble_color, (marble_coordinate, movement_direction), self._size))
+        player.set_last_move(marble_coordinate, movement_direction)
+        self.set_current_turn(self.update_current_turn(player_name))  # Updates the current turn
+
+        # Adds the new position to the history for the Ko rule
+        cell_hash = self._history_hash()
+        self._history = (cell_hash, player_name, self._history)
+
+        if self._seen is not None:
+            if self._shared_seen:
+                self._own_seen()
+
+            self._seen[cell_hash] = self._seen.get(cell_hash, 0) + 1
+
+        if removed_value == "R":
+            self._players[player_name].set_red_marbles()   # Adds one to the captured marbles for the player
+            self._game_board.set_state_of_board("R")       # Update count of red marbles on board
+
+            if self._players[player_name].get_red_marbles() == self._red_to_win:    # Check if the player has won
+                self._winner = player_name
+
+        elif removed_value != "X":
+            self._game_board.set_state_of_board(removed_value)   # Updates the count of marbles on board
+
+            if self._player1.get_marble_color() == removed_value:
+                self._player1.set_marbles() # Updates player 1's marble count
+
+                if self._player1.get_marbles() == 0: # Checks if player 1 has marbles on the board
+                    self._winner = player_name
+
+            elif self._player2.get_marble_color() == removed_value:
+                self._player2.set_marbles() # Updates player 2's marble count
+
+                if self._player2.get_marbles() == 0:    # Checks if player 2 has marbles on the board
+                    self._winner = player_name
+
+    def apply_move(self, player_name, marble_coordinate, movement_direction):
+        """
+        Makes a move that is already known to be legal, such as one from legal_moves, and saves what it
+        changed so it can be taken back with undo_move. The move is not checked. It takes the same
+        parameters as make_move and returns the value the push removed from the board as a string.
+        """
+
+        # Saves the changed line, the turn, the winner, both players, the marble counts and the hash
+        self._undo_stack.append((self._game_board.get_line_state(marble_coordinate, movement_direction),
+                                 self._current_turn, self._winner, self._player1.get_state(),
+                                 self._player2.get_state(), self._game_board.get_state_of_board(),
+                                 self._game_board.get_state_hash()))
+
+        removed_value = self._game_board.push(marble_coordinate, movement_direction)
+        self.finish_move(player_name, marble_coordinate, movement_direction, removed_value)
+        return removed_value
+
+    def undo_move(self):
+        """
+        Takes back the most recent move made with apply_move. Returns True if a move was taken back or
+        False if there was nothing to undo. Takes no parameters.
+        """
+
+        if not self._undo_stack:
+            return False
+
+        (line_state, current_turn, winner, player1_state, player2_state, state_of_board,
+         state_hash) = self._undo_stack.pop()
+        self._game_board.set_line_state(line_state)
+        self._game_board.restore_state_of_board(state_of_board)
+        self._game_board.set_state_hash(state_hash)
+        self._player1.set_state(*player1_state)
+        self._player2.set_state(*player2_state)
+        self._current_turn = current_turn
+        self._winner = winner
+
+        cell_hash = self._history[0]
+        self._history = self._history[2]
+
+        if self._seen is not None:
+            if self._shared_seen:
+                self._own_seen()
+
+            if self._seen[cell_hash] == 1:
+                del self._seen[cell_hash]
+            else:
+                self._seen[cell_hash] -= 1
+
+        return True
+
+    def get_undo_depth(self):
+        """
+        Returns the number of moves made with apply_move that can still be taken back as an integer.
+        Takes no parameters.
+        """
+
+        return len(self._undo_stack)
+
+    def clear_undo(self):
+        """
+        Forgets every undo record so the moves made with apply_move can no longer be taken back.
+        Takes no parameters and returns nothing.
+        """
+
+        self._undo_stack = []
+
+    def fork(self):
+        """
+        Returns a new KubaGame in the same state as this one, for playing out a branch without changing this
+        game. The two games share the board's rows and the position history the Ko rule looks at until one of
+        them changes them, and then copy only what they change, so a fork is quick however long the game has
+        gone on and many forks of one game share most of their memory. The fork starts with no undo records
+        and without the computer player, game record writer or metrics, but with the same opening book.
+        Takes no parameters.
+        """
+
+        game = KubaGame.__new__(KubaGame)
+        game._game_board = self._game_board.fork()
+        game._player1 = Player(self._player1.get_players_name(), self._player1.get_marble_color())
+        game._player1.set_state(*self._player1.get_state())
+        game._player2 = Player(self._player2.get_players_name(), self._player2.get_marble_color())
+        game._player2.set_state(*self._player2.get_state())
+        game._players = {game._player1.get_players_name(): game._player1,
+                         game._player2.get_players_name(): game._player2}
+        game._current_turn = self._current_turn
+        game._winner = self._winner
+        game._undo_stack = []
+        game._search = None
+        game._recorder = None
+        game._book = self._book
+        game._metrics = None
+        game._ko_rule = self._ko_rule
+        game._size = self._size
+        game._red_to_win = self._red_to_win
+        game._history = self._history
+        game._history_keys = self._history_keys
+        game._seen = self._seen
+        game._shared_seen = self._shared_seen = self._seen is not None
+        return game
+
+    def _own_seen(self):
+        """
+        Copies the superko counts of the cell hashes in the history, which this game shares with a fork, so
+        they can be changed.
+        """
+
+        self._seen = dict(self._seen)
+        self._shared_seen = False
+
+    def get_state_bytes(self):
+        """
+        Returns the whole state of the game as a bytes object of get_state_size bytes, STATE_SIZE on the 7x7
+        board: the cells of the board, the marble counts, each player's captured red marbles, marbles and last
+        move, whose turn it is and the winner. A last move is one byte on boards up to 7x7 and two bytes,
+        little endian, on larger ones. The player names are not included. Takes no parameters.
+        """
+
+        state = bytearray()
+
+        for row in self._game_board.get_grid():
+            state += "".join(row).encode("ascii")
+
+        state += bytes(self._game_board.get_state_of_board())
+        code_size = _code_size(self._size)
+
+        for player in (self._player1, self._player2):
+            red_marbles, marbles, last_move = player.get_state()
+            state += bytes((red_marbles, marbles)) + _move_code(last_move, self._size).to_bytes(code_size, "little")
+
+        state += bytes((self._player_number(self._current_turn), self._player_number(self._winner)))
+        return bytes(state)
+
+    def get_state_size(self):
+        """
+        Returns the length of get_state_bytes for the game's board size as an integer, STATE_SIZE on the 7x7
+        board. Takes no parameters.
+        """
+
+        return self._size * self._size + 3 + 2 * (2 + _code_size(self._size)) + 2
+
+    def set_state_bytes(self, state):
+        """
+        Sets the game to a state returned by get_state_bytes of a game with the same players and board size,
+        rebuilding the board and its hash. Forgets every undo record and the positions before this one, which
+        the Ko rule compares with. Takes the state as a bytes-like object and returns nothing.
+        """
+
+        size = self._size
+        cell_count = size * size
+        code_size = _code_size(size)
+
+        if len(state) != self.get_state_size():
+            raise ValueError("A game state is " + str(self.get_state_size()) + " bytes long.")
+
+        cells = bytes(state[:cell_count]).decode("ascii")
+        self._game_board.set_grid([list(cells[row * size:row * size + size]) for row in range(size)])
+        self._game_board.restore_state_of_board(tuple(state[cell_count:cell_count + 3]))
+        self._game_board.set_state_hash(0)
+        self._current_turn = None
+        offset = cell_count + 3
+
+        for player in (self._player1, self._player2):
+            last_move = _move_from_code(int.from_bytes(state[offset + 2:offset + 2 + code_size], "little"), size)
+            player.set_state(state[offset], state[offset + 1], last_move)
+            self._game_board.update_hash(last_move_key(player.get_marble_color(), last_move, size))
+            offset += 2 + code_size
+
+        players = (None, self._player1.get_players_name(), self._player2.get_players_name())
+        self.set_current_turn(players[state[offset]])
+        self._winner = players[state[offset + 1]]
+        self._undo_stack = []
+        self._history_keys = None
+        self._history = (self._game_board.get_cell_hash(), None, None)
+        self._seen = self._count_history() if self._ko_rule == "superko" else None
+        self._shared_seen = False
+
+    def get_history_bytes(self):
+        """
+        Returns the position history the Ko rule compares with as a bytes object of 9 bytes for each position
+        from the start: the cell hash, 8 bytes little endian, and the player who moved to it, 0, 1 or 2 as in
+        get_state_bytes. Kept with get_state_bytes, it lets a rebuilt game go on under the same Ko rule.
+        Takes no parameters.
+        """
+
+        history = bytearray()
+
+        for cell_hash, player_name in self._history_entries():
+            history += cell_hash.to_bytes(8, "little") + bytes((self._player_number(player_name),))
+
+        return bytes(history)
+
+    def set_history_bytes(self, history, cells=None, swap_colors=False):
+        """
+        Sets the position history to one returned by get_history_bytes, after set_state_bytes has set the
+        game to the state it was taken with. The last position of the history is not always the marbles on
+        the board, since a push of the player's own marble off the board is rejected after it moved them.
+        The history can also come from a game whose board is turned or mirrored from this one, such as by
+        KubaSymmetry.transformed_game: cells then gives, for each cell of this board, row * size + column,
+        the cell of that game's board it is, and swap_colors is True if the white and black marbles changed
+        places too. Positions are then compared, and kept, as they would be on that board, so the Ko rule
+        allows the same moves as in that game, and get_history_bytes returns them that way. Raises ValueError
+        if the history is not one from get_history_bytes. Takes the history as a bytes-like object and
+        returns nothing.
+        """
+
+        if not history or len(history) % 9 or max(history[8::9]) > 2:
+            raise ValueError("A position history is 9 bytes for each position.")
+
+        if cells is None and not swap_colors:
+            self._history_keys = None
+        else:
+            keys = _tables(self._size)["cell_keys"]
+            cells = range(self._size * self._size) if cells is None else cells
+            swapped = {"W": "B", "B": "W", "R": "R", "X": "X"} if swap_colors else {value: value for value in keys}
+            self._history_keys = {value: [keys[swapped[value]][cell] for cell in cells] for value in keys}
+
+        players = (None, self._player1.get_players_name(), self._player2.get_players_name())
+        entries = None
+
+        for offset in range(0, len(history), 9):
+            cell_hash = int.from_bytes(history[offset:offset + 8], "little")
+            entries = (cell_hash, players[history[offset + 8]], entries)
+
+        self._history = entries
+        self._seen = self._count_history() if self._ko_rule == "superko" else None
+        self._shared_seen = False
+
+    def _player_number(self, players_name):
+        """
+        Returns 1 for player one, 2 for player two or 0 for None, as used by get_state_bytes.
+        """
+
+        if players_name is None:
+            return 0
+        elif players_name == self._player1.get_players_name():
+            return 1
+
+        return 2
+
+    def best_move(self, player_name, time_budget_ms=1000, max_depth=64, workers=1, seed=0, cache=None):
+        """
+        Returns the best move the computer can find for the player within the time budget in milliseconds,
+        as a tuple of the coordinates, (row, column), and the direction, or None if the player can not move.
+        It does not make the move. The search is an iterative deepening alpha-beta search from KubaAI.py and
+        it keeps its transposition table between calls. Takes the player's name as a string, the time budget
+        as a number or None to search to max_depth, and optionally the number of worker processes to split
+        the search across, the seed that orders the moves between them and a position cache from KubaCache.py
+        to share evaluations and move lists with other games. A search with a fixed max_depth, seed and
+        number of workers always returns the same move. When an opening book is set and has the position, its
+        move is returned without searching.
+        """
+
+        if self._book is not None:
+            move = self._book.get_move(self, player_name)
+
+            if move is not None:
+                return move
+
+        if workers > 1:
+            from KubaAI import ParallelSearch
+
+            if (not isinstance(self._search, ParallelSearch) or self._search.get_workers() != workers
+                    or self._search.get_cache() is not cache):
+                self.close_search()
+                self._search = ParallelSearch(workers, cache=cache)
+
+            return self._search.search(self, player_name, time_budget_ms, max_depth, seed)
+
+        from KubaAI import AlphaBetaSearch
+
+        if not isinstance(self._search, AlphaBetaSearch) or self._search.get_cache() is not cache:
+            self.close_search()
+            self._search = AlphaBetaSearch(cache=cache)
+
+        return self._search.search(self, player_name, time_budget_ms, max_depth)
+
+    def close_search(self):
+        """
+        Stops the worker processes of a parallel best_move search, if there are any, and drops the computer
+        player and its table. Takes no parameters and returns nothing.
+        """
+
+        if self._search is not None and hasattr(self._search, "close"):
+            self._search.close()
+
+        self._search = None
+
+    def get_search_stats(self):
+        """
+        Returns a dictionary of the depth, score, nodes, seconds and nodes per second of the last best_move
+        search, or None if best_move has not been used. Takes no parameters.
+        """
+
+        if self._search is None:
+            return None
+
+        return self._search.get_stats()
+
+    def update_current_turn(self, players_name):
+        """
+        Handles updating the current turn. Takes current player name as a string for a parameter and
+        doesn't return anything.
+        """
+
+        if players_name == self._player1.get_players_name():
+            return self._player2.get_players_name()
+
+        return self._player1.get_players_name()
+
+    def make_move(self, player_name, marble_coordinate, movement_direction):
+        """
+         Moves the marbles on the board is the specified direction. It also updates
+         the board, checks for a winner, makes sure it is the specified player's turn,
+         makes sure the player is not reversing the opponents last move or trying to
+         make the same move, it makes sure the player is not trying to push their own
+         marble off the board, updates the number of marbles left on the board
+         after the move has been made and makes sure that the player is only going to
+         move their own marble. It takes the players' name as string, the coordinate of
+         the marble they want to move as a tuple of integers, (row, column), and the
+         direction they want to move as a string for parameters. It returns False if
+         the proposed move is not valid, True if the proposed move is valid, or a message
+         if the player trying to make the move is not a valid player.
+        """
+
+        if self._recorder is None:
+            return self._make_move(player_name, marble_coordinate, movement_direction, self._metrics)
+
+        # Records every attempt that changed the game, so replaying the record gives the same game
+        previous_turn = self._current_turn
+        cell_hash = self._game_board.get_cell_hash()
+        result = self._make_move(player_name, marble_coordinate, movement_direction, self._metrics)
+
+        if result is True or self._game_board.get_cell_hash() != cell_hash:
+            self._recorder.record_move(self, player_name, marble_coordinate, movement_direction)
+        elif self._current_turn != previous_turn:
+            self._recorder.record_pass(self, player_name)   # A rejected move that only passed the turn
+
+        return result
+
+    def _make_move(self, player_name, marble_coordinate, movement_direction, metrics=None):
+        """
+        Does the work of make_move. It takes the same parameters and returns the same values, and optionally
+        a MoveMetrics to time the phases of the move with and tell whether it was accepted or why not.
+        """
+
+        start = mark = 0 if metrics is None else metrics.start_move()
+
+        # Check for a winner of the game
+        if self._winner is not None:
+            return self._rejected(metrics, "game_over", start, player_name, marble_coordinate, movement_direction)
+
+        # Check for the the players' turn or the start of the game
+        if self._current_turn != player_name and self._current_turn is not None:
+            return self._rejected(metrics, "wrong_turn", start, player_name, marble_coordinate, movement_direction)
+
+        # Checks if the coordinates are valid
+        if marble_coordinate[0] < 0 or marble_coordinate[0] >= self._size:
+            self.set_current_turn(self.update_current_turn(player_name))  # Updates the current turn to the next player
+            return self._rejected(metrics, "bad_coordinate", start, player_name, marble_coordinate,
+                                  movement_direction)
+        elif marble_coordinate[1] < 0 or marble_coordinate[1] >= self._size:
+            self.set_current_turn(self.update_current_turn(player_name))  # Updates the current turn to the next player
+            return self._rejected(metrics, "bad_coordinate", start, player_name, marble_coordinate,
+                                  movement_direction)
+
+        # Checks if the direction is valid, before the access check, which has no side to look at for it
+        if movement_direction not in _MOVE_ORDER:
+            self.set_current_turn(self.update_current_turn(player_name))  # Updates the current turn to the next player
+            return self._rejected(metrics, "bad_direction", start, player_name, marble_coordinate,
+                                  movement_direction)
+
+        # Check for access to the marble
+        if not self.check_marble_access(marble_coordinate, movement_direction):
+            self.set_current_turn(self.update_current_turn(player_name))  # Updates the current turn to the next player
+            return self._rejected(metrics, "no_access", start, player_name, marble_coordinate, movement_direction)
+
+        # Check for a player trying to move any mable but their own
+        if self._players[player_name].get_marble_color() != self.get_marble(marble_coordinate):
+            self.set_current_turn(self.update_current_turn(player_name))  # Updates the current turn to the next player
+            return self._rejected(metrics, "wrong_color", start, player_name, marble_coordinate, movement_direction)
+
+        if metrics is not None:
+            mark = metrics.end_phase("validation", mark)
+
+        # Check for reversing an opponents previous move
+        if player_name == self._player1.get_players_name():
+
+            if not self.reverse_opponents_move(marble_coordinate, movement_direction, self._player2.get_last_move()):
+                self.set_current_turn(self.update_current_turn(player_name))  # Updates the turn to the next player
+                return self._rejected(metrics, "ko_reversal", start, player_name, marble_coordinate,
+                                      movement_direction)
+
+        elif player_name == self._player2.get_players_name():
+
+            if not self.reverse_opponents_move(marble_coordinate, movement_direction, self._player1.get_last_move()):
+                self.set_current_turn(self.update_current_turn(player_name))  # Updates the turn to the next player
+                return self._rejected(metrics, "ko_reversal", start, player_name, marble_coordinate,
+                                      movement_direction)
+
+        # Keeps the line the move changes if the move has to be checked against earlier positions
+        check_repeat = self._ko_rule != "none" and self._may_repeat(player_name)
+
+        if check_repeat:
+            line_state = self._game_board.get_line_state(marble_coordinate, movement_direction)
+
+        if metrics is not None:
+            mark = metrics.end_phase("reverse", mark)
+
+        # Make the move
+        if movement_direction == "R":
+            removed_value = self._game_board.push_right(marble_coordinate) # Return the value removed from the row
+        elif movement_direction == "L":
+            removed_value = self._game_board.push_left(marble_coordinate) # Return the value removed from the row
+        elif movement_direction == "B":
+            removed_value = self._game_board.push_backward(marble_coordinate) # Return the value removed from the column
+        else:
+            removed_value = self._game_board.push_forward(marble_coordinate) # Return the value removed from the column
+
+        if metrics is not None:
+            mark = metrics.end_phase("push", mark)
+
+        try:
+            # Checks if the player is removing their marble
+            if removed_value == self._players[player_name].get_marble_color():
+                self.set_current_turn(self.update_current_turn(player_name))  # Updates the current turn
+                return self._rejected(metrics, "self_ejection", start, player_name, marble_coordinate,
+                                      movement_direction)
+
+            # Checks if the move repeats a position the Ko rule does not allow, and takes the push back if so
+            if check_repeat and self._repeats(player_name, self._history_hash()):
+                self._game_board.set_line_state(line_state)
+                self.set_current_turn(self.update_current_turn(player_name))  # Updates the current turn
+                return self._rejected(metrics, "repetition", start, player_name, marble_coordinate,
+                                      movement_direction)
+
+            self.finish_move(player_name, marble_coordinate, movement_direction, removed_value)
+
+            if metrics is not None:
+                metrics.end_phase("finish", mark)
+                metrics.end_move(start, player_name, marble_coordinate, movement_direction)
+
+            return True
 
         except IndexError:
             return "This player is not in this game."
+
+    def _rejected(self, metrics, reason, start, player_name, marble_coordinate, movement_direction):
+        """
+        Tells the metrics, if there are any, that make_move rejected a move for the given reason and returns
+        False for make_move to return.
+        """
+
+        if metrics is not None:
+            metrics.end_move(start, player_name, marble_coordinate, movement_direction, reason)
+
+        return False
+
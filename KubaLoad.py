@@ -0,0 +1,125 @@
+# Author: Matt Sanders
+# Date: 10/18/2026
+# Description: This program is a load generator for the game server in KubaServer.py. It opens many games
+#              at once and plays random legal moves in all of them to measure how many requests the server
+#              can answer.
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+
+async def _exchange(reader, writer, requests):
+    """
+    Sends a batch of requests on one connection without waiting between them and returns the responses in
+    the same order.
+    """
+
+    writer.write(b"".join(json.dumps(request, separators=(",", ":")).encode() + b"\n" for request in requests))
+    await writer.drain()
+    responses = []
+
+    for _ in requests:
+        responses.append(json.loads(await reader.readline()))
+
+    return responses
+
+
+async def _play_connection(host, port, games, moves_per_game, seed, counts):
+    """
+    Opens one connection, starts its games and plays rounds of one random legal move in every game that is
+    still going until each has finished or made moves_per_game moves. Adds what it did to counts.
+    """
+
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port, limit=1 << 20)
+
+    try:
+        responses = await _exchange(reader, writer, [{"op": "new", "players": [["A", "W"], ["B", "B"]]}
+                                                     for _ in range(games)])
+        sessions = {response["result"]: "A" for response in responses}     # Session to the player to move
+        counts["requests"] += games
+        moves = 0
+
+        while sessions and moves < moves_per_game:
+            numbers = list(sessions)
+            responses = await _exchange(reader, writer, [{"op": "legal", "session": number,
+                                                          "player": sessions[number]} for number in numbers])
+            requests = []
+
+            for number, response in zip(numbers, responses):
+                if response["ok"] and response["result"]:
+                    coordinates, direction = rng.choice(response["result"])
+                    requests.append({"op": "move", "session": number, "player": sessions[number],
+                                     "coordinates": coordinates, "direction": direction})
+                else:
+                    del sessions[number]        # The player can not move
+
+            responses = await _exchange(reader, writer, requests)
+            counts["requests"] += len(numbers) + len(requests)
+            counts["moves"] += len(requests)
+            moves += 1
+
+            for request, response in zip(requests, responses):
+                if not response["ok"]:
+                    del sessions[request["session"]]    # The session was evicted or closed
+                    continue
+
+                result = response["result"]
+
+                if result["winner"] is not None:
+                    del sessions[request["session"]]
+                    counts["finished"] += 1
+                else:
+                    sessions[request["session"]] = result["turn"]
+
+        numbers = list(sessions)
+        await _exchange(reader, writer, [{"op": "close", "session": number} for number in numbers])
+        counts["requests"] += len(numbers)
+
+    finally:
+        writer.close()
+
+
+async def run_load(host="127.0.0.1", port=8765, games=10000, connections=100, moves_per_game=50, seed=0):
+    """
+    Plays the given number of games at once on a running game server, split across the given number of
+    connections. Returns a dictionary of the games, requests, moves and finished games, the seconds it took
+    and the requests and moves per second.
+    """
+
+    counts = {"requests": 0, "moves": 0, "finished": 0}
+    shares = [games // connections + (1 if index < games % connections else 0) for index in range(connections)]
+    start = time.perf_counter()
+    await asyncio.gather(*(_play_connection(host, port, share, moves_per_game, seed + index, counts)
+                           for index, share in enumerate(shares) if share))
+    seconds = time.perf_counter() - start
+
+    return {"games": games, "connections": connections, "requests": counts["requests"], "moves": counts["moves"],
+            "finished": counts["finished"], "seconds": round(seconds, 3),
+            "requests_per_second": round(counts["requests"] / seconds, 1),
+            "moves_per_second": round(counts["moves"] / seconds, 1)}
+
+
+def main():
+    """
+    Runs the load generator from the command line and prints its results as JSON.
+    """
+
+    parser = argparse.ArgumentParser(description="Plays many random games at once on a Kuba game server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--games", type=int, default=10000, help="games played at the same time")
+    parser.add_argument("--connections", type=int, default=100)
+    parser.add_argument("--moves", type=int, default=50, help="most moves made in each game")
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run_load(arguments.host, arguments.port, arguments.games, arguments.connections,
+                                          arguments.moves, arguments.seed)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+# Author: Matt Sanders
+# Date: 10/18/2026
+# Description: This program collects timings and counters from the make_move method of KubaGame.py and
+#              serves them in the Prometheus text format, to find where time goes when moves get slow.
+
+import http.server
+import threading
+import time
+
+# A move is timed in four phases: the checks of the turn, coordinates, direction, access and color, the check
+# that it does not push back the opponent's last move, the push itself and the work after it, which rejects
+# pushing off a player's own marble and otherwise updates the players and looks for a winner.
+PHASES = ("validation", "reverse", "push", "finish")
+REJECTIONS = ("game_over", "wrong_turn", "bad_coordinate", "bad_direction", "no_access", "wrong_color",
+              "ko_reversal", "self_ejection", "repetition")
+BUCKETS = (0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.01)  # Seconds
+
+
+class MoveMetrics:
+    """
+    Counts and times the calls to make_move of the games it is set on with KubaGame.set_metrics. It keeps the
+    time spent in each phase of a move, a histogram of whole calls, the accepted moves and the rejected
+    ones by reason, and can pass the details of every call to a sink. One MoveMetrics can be shared by
+    many games played from one thread. It optionally takes the sink, a function called with a dictionary
+    of each call's player, move, result, rejection reason and phase timings in nanoseconds.
+    """
+
+    def __init__(self, sink=None):
+        """
+        Initializes the sink and the counters. Returns nothing.
+        """
+
+        self._sink = sink
+        self._phases = {}               # Nanoseconds of each phase of the call being timed, for the sink
+        self.reset()
+
+    def reset(self):
+        """
+        Sets every counter and timer back to zero. Takes no parameters and returns nothing.
+        """
+
+        self._calls = 0
+        self._accepted = 0
+        self._rejections = dict.fromkeys(REJECTIONS, 0)
+        self._phase_nanoseconds = dict.fromkeys(PHASES, 0)
+        self._phase_counts = dict.fromkeys(PHASES, 0)
+        self._buckets = [0] * len(BUCKETS)
+        self._total_nanoseconds = 0
+
+    def set_sink(self, sink):
+        """
+        Sets the function called with the details of every call, or None for no sink. Returns nothing.
+        """
+
+        self._sink = sink
+
+    def get_sink(self):
+        """
+        Returns the function called with the details of every call, or None. Takes no parameters.
+        """
+
+        return self._sink
+
+    def get_counts(self):
+        """
+        Returns a dictionary of the calls to make_move, the accepted moves and a dictionary of the rejected
+        moves by reason. Takes no parameters.
+        """
+
+        return {"calls": self._calls, "accepted": self._accepted, "rejections": dict(self._rejections)}
+
+    def get_phase_times(self):
+        """
+        Returns a dictionary of the number of times each phase ran and the seconds spent in it, as a tuple.
+        Takes no parameters.
+        """
+
+        return {phase: (self._phase_counts[phase], self._phase_nanoseconds[phase] / 1e9) for phase in PHASES}
+
+    def start_move(self):
+        """
+        Starts timing a call to make_move. Returns the start time in nanoseconds, which is also the start of
+        the first phase.
+        """
+
+        if self._sink is not None:
+            self._phases = {}
+
+        return time.perf_counter_ns()
+
+    def end_phase(self, phase, mark):
+        """
+        Adds the time since mark to a phase. Takes the phase and the time it started in nanoseconds, and
+        returns the current time, the start of the next phase.
+        """
+
+        now = time.perf_counter_ns()
+        self._phase_nanoseconds[phase] += now - mark
+        self._phase_counts[phase] += 1
+
+        if self._sink is not None:
+            self._phases[phase] = now - mark
+
+        return now
+
+    def end_move(self, start, player_name, marble_coordinate, movement_direction, reason=None):
+        """
+        Finishes timing a call to make_move and counts it as accepted, or as rejected for the reason given.
+        Takes the start time from start_move, the player, coordinates and direction of the call and the reason.
+        Returns nothing.
+        """
+
+        elapsed = time.perf_counter_ns() - start
+        self._calls += 1
+        self._total_nanoseconds += elapsed
+
+        if reason is None:
+            self._accepted += 1
+        else:
+            self._rejections[reason] += 1
+
+        for index, bound in enumerate(BUCKETS):
+            if elapsed <= bound * 1e9:
+                self._buckets[index] += 1
+                break
+
+        if self._sink is not None:
+            self._sink({"player": player_name, "coordinates": marble_coordinate, "direction": movement_direction,
+                        "accepted": reason is None, "reason": reason, "phases_ns": self._phases,
+                        "total_ns": elapsed})
+
+    def render_prometheus(self):
+        """
+        Returns the counters and timers in the Prometheus text exposition format as a string. Takes no
+        parameters.
+        """
+
+        lines = ["# HELP kuba_make_move_calls_total Calls to KubaGame.make_move.",
+                 "# TYPE kuba_make_move_calls_total counter",
+                 "kuba_make_move_calls_total " + str(self._calls),
+                 "# HELP kuba_moves_accepted_total Moves make_move accepted.",
+                 "# TYPE kuba_moves_accepted_total counter",
+                 "kuba_moves_accepted_total " + str(self._accepted),
+                 "# HELP kuba_move_rejections_total Moves make_move rejected, by reason.",
+                 "# TYPE kuba_move_rejections_total counter"]
+        lines += ['kuba_move_rejections_total{reason="%s"} %d' % item for item in self._rejections.items()]
+        lines += ["# HELP kuba_make_move_phase_seconds_total Seconds spent in each phase of make_move.",
+                  "# TYPE kuba_make_move_phase_seconds_total counter"]
+        lines += ['kuba_make_move_phase_seconds_total{phase="%s"} %.9f' % (phase, nanoseconds / 1e9)
+                  for phase, nanoseconds in self._phase_nanoseconds.items()]
+        lines += ["# HELP kuba_make_move_phase_runs_total Times each phase of make_move ran.",
+                  "# TYPE kuba_make_move_phase_runs_total counter"]
+        lines += ['kuba_make_move_phase_runs_total{phase="%s"} %d' % item for item in self._phase_counts.items()]
+        lines += ["# HELP kuba_make_move_seconds Seconds each call to make_move took.",
+                  "# TYPE kuba_make_move_seconds histogram"]
+        cumulative = 0
+
+        for bound, count in zip(BUCKETS, self._buckets):
+            cumulative += count
+            lines.append('kuba_make_move_seconds_bucket{le="%g"} %d' % (bound, cumulative))
+
+        lines += ['kuba_make_move_seconds_bucket{le="+Inf"} %d' % self._calls,
+                  "kuba_make_move_seconds_sum %.9f" % (self._total_nanoseconds / 1e9),
+                  "kuba_make_move_seconds_count %d" % self._calls]
+        return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Answers GET /metrics with the server's MoveMetrics in the Prometheus text format.
+    """
+
+    def do_GET(self):
+        """
+        Sends the metrics, or a 404 for any other path. Returns nothing.
+        """
+
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+
+        body = self.server.metrics.render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """
+        Keeps the requests out of the standard error. Returns nothing.
+        """
+
+
+def serve_metrics(metrics, host="127.0.0.1", port=9464):
+    """
+    Serves the MoveMetrics at http://host:port/metrics from a background thread so a Prometheus server can
+    scrape it. Returns the http.server.ThreadingHTTPServer; its shutdown method stops it and its
+    server_address holds the port when 0 was given.
+    """
+
+    server = http.server.ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    server.metrics = metrics
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
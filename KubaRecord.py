@@ -0,0 +1,344 @@
+# Author: Matt Sanders
+# Date: 10/18/2026
+# Description: This program defines a compact binary record of games of 'Kuba' from KubaGame.py. There is
+#              a writer that records each move as it is made and a reader that replays the records.
+
+from KubaGame import KO_RULES, KubaGame, standard_layout
+
+# A file holds any number of game records one after another. Each record is:
+#   b"KUBA", the format version byte, the Ko rule byte, the index of the rule in KubaGame.KO_RULES,
+#   for player one then player two: the marble color byte, a 2 byte name length and the UTF-8 name,
+#   one byte per event, and the END byte.
+# An event byte below 196 is a move, cell * 4 + direction index, where cell is row * 7 + column. The first
+# event is always FIRST_PLAYER_ONE or FIRST_PLAYER_TWO, and after it each event is made by the player whose
+# turn it is. UTF-8 names never contain the END byte. Version 1 records have no Ko rule byte and were played
+# with the 'ko' rule.
+MAGIC = b"KUBA"
+VERSION = 2
+FIRST_PLAYER_ONE = 0xFC     # Player one made the first move
+FIRST_PLAYER_TWO = 0xFD     # Player two made the first move
+PASS = 0xFE                 # A rejected move that only passed the turn to the other player
+END = 0xFF                  # The end of a game record
+DIRECTIONS = ("R", "L", "B", "F")
+_STANDARD_CELLS = "".join(standard_layout()).encode()      # The cells of get_state_bytes when a game starts
+
+
+def encode_move(coordinates, direction):
+    """
+    Returns the event byte of a move as an integer. Takes the coordinates as a tuple of integers,
+    (row, column), and the direction as a string.
+    """
+
+    return (coordinates[0] * 7 + coordinates[1]) * 4 + DIRECTIONS.index(direction)
+
+
+def decode_move(code):
+    """
+    Returns the move of an event byte as a tuple of the coordinates, (row, column), and the direction.
+    """
+
+    cell, direction = divmod(code, 4)
+    return divmod(cell, 7), DIRECTIONS[direction]
+
+
+def encode_header(players, ko_rule="ko"):
+    """
+    Returns the header of a game record as a bytes object. Takes the (name, color) of player one and
+    player two as a tuple of two tuples, as returned by KubaGame.get_players, and the Ko rule of the game.
+    """
+
+    header = bytearray(MAGIC)
+    header.append(VERSION)
+    header.append(KO_RULES.index(ko_rule))
+
+    for name, color in players:
+        encoded_name = name.encode("utf-8")
+        header += color.encode("ascii")
+        header += len(encoded_name).to_bytes(2, "little")
+        header += encoded_name
+
+    return bytes(header)
+
+
+def replay_events(game, events):
+    """
+    Makes the moves and passes of a sequence of event bytes in the game, yielding the player's name, the
+    move, ((row, column), direction), or None for a pass, and the game after each one. The events can start
+    in the middle of a game, in which case the first one is made by the player whose turn it is. Raises
+    ValueError if the game rejects a move of the events, which means the game is not the one they were
+    recorded in, such as a game with a different Ko rule.
+    """
+
+    players = game.get_players()
+    player_name = game.get_current_turn()
+
+    if player_name is None:
+        player_name = players[0][0]
+
+    for code in events:
+        if code == FIRST_PLAYER_ONE:
+            player_name = players[0][0]
+            continue
+        elif code == FIRST_PLAYER_TWO:
+            player_name = players[1][0]
+            continue
+
+        if code == PASS:
+            move = None
+            game.make_move(player_name, (-1, -1), "R")      # An invalid coordinate only passes the turn
+        else:
+            move = decode_move(code)
+            cell_hash = game.get_cell_hash()
+
+            # A rejected move that pushed off the player's own marble changed the board and was recorded too
+            if game.make_move(player_name, move[0], move[1]) is not True and game.get_cell_hash() == cell_hash:
+                raise ValueError("The game rejected the recorded move " + str(move) + " of " + player_name + ".")
+
+        yield player_name, move, game
+        player_name = game.get_current_turn()
+
+
+class GameRecord:
+    """
+    One game read from a record file. It holds the players, as (name, color) tuples the way they are given to
+    KubaGame, the Ko rule and the event bytes of the game, and it can replay the game. It takes the two
+    players, the events as a bytes object and the Ko rule.
+    """
+
+    def __init__(self, player_one, player_two, events, ko_rule="ko"):
+        """
+        Initializes the players, the events and the Ko rule. Returns nothing.
+        """
+
+        self._player_one = player_one
+        self._player_two = player_two
+        self._events = events
+        self._ko_rule = ko_rule
+
+    def get_players(self):
+        """
+        Returns the (name, color) of player one and player two as a tuple of two tuples. Takes no parameters.
+        """
+
+        return self._player_one, self._player_two
+
+    def get_events(self):
+        """
+        Returns the event bytes of the game as a bytes object. Takes no parameters.
+        """
+
+        return self._events
+
+    def get_ko_rule(self):
+        """
+        Returns the Ko rule the game was played with as a string. Takes no parameters.
+        """
+
+        return self._ko_rule
+
+    def get_moves(self):
+        """
+        Yields each move or pass of the game in order as a tuple of the player's name and the move, ((row,
+        column), direction), or None for a pass. Takes no parameters.
+        """
+
+        game = KubaGame(self._player_one, self._player_two, ko_rule=self._ko_rule)
+
+        for player_name, move, game in replay_events(game, self._events):
+            yield player_name, move
+
+    def replay(self, engine="grid"):
+        """
+        Yields the game after each move or pass of the record, replayed into a new KubaGame on the given
+        board engine. The same KubaGame object is yielded every time, so only one game is kept in memory.
+        """
+
+        game = KubaGame(self._player_one, self._player_two, engine, self._ko_rule)
+
+        for player_name, move, game in replay_events(game, self._events):
+            yield game
+
+
+class GameRecordWriter:
+    """
+    Writes game records to a binary stream as the games are played. start_game writes the header of a game
+    and attaches the writer to it with set_recorder, so every make_move that changes the game writes one
+    byte, and end_game finishes the record. Games are written one at a time. It takes a stream opened for
+    writing bytes as a parameter.
+    """
+
+    def __init__(self, stream):
+        """
+        Initializes the stream, the game being recorded and the count of games written. Returns nothing.
+        """
+
+        self._stream = stream
+        self._game = None
+        self._names = None
+        self._first_event = True
+        self._games_written = 0
+
+    def get_games_written(self):
+        """
+        Returns the number of finished game records written as an integer. Takes no parameters.
+        """
+
+        return self._games_written
+
+    def start_game(self, game):
+        """
+        Writes the header of a new game and starts recording its moves. The game must not have been played
+        yet and must be on the standard 7x7 board, whose moves fit in the record's bytes. Ends the record of the
+        previous game if it was not ended. Returns nothing.
+        """
+
+        if self._game is not None:
+            self.end_game()
+
+        if game.get_current_turn() is not None:
+            raise ValueError("Only a game that has not been played yet can be recorded.")
+
+        # A record replays from the standard board, so the game must start from it
+        if game.get_state_bytes()[:49] != _STANDARD_CELLS or game.get_red_to_win() != 7:
+            raise ValueError("Only games on the standard 7x7 board can be recorded.")
+
+        self._stream.write(encode_header(game.get_players(), game.get_ko_rule()))
+        self._game = game
+        self._names = tuple(name for name, color in game.get_players())
+        self._first_event = True
+        game.set_recorder(self)
+
+    def record_move(self, game, player_name, coordinates, direction):
+        """
+        Writes a move that changed the board. Called by make_move. Returns nothing.
+        """
+
+        self._write_first_player(player_name)
+        self._stream.write(bytes((encode_move(coordinates, direction),)))
+
+    def record_pass(self, game, player_name):
+        """
+        Writes a rejected move that only passed the turn. Called by make_move. Returns nothing.
+        """
+
+        self._write_first_player(player_name)
+        self._stream.write(bytes((PASS,)))
+
+    def end_game(self):
+        """
+        Finishes the record of the game being recorded and stops recording it. Returns nothing.
+        """
+
+        if self._game is None:
+            return
+
+        self._stream.write(bytes((END,)))
+        self._game.set_recorder(None)
+        self._game = None
+        self._games_written += 1
+
+    def _write_first_player(self, player_name):
+        """
+        Writes which player made the first move before the first event of a game.
+        """
+
+        if self._first_event:
+            self._first_event = False
+
+            if player_name == self._names[1]:
+                self._stream.write(bytes((FIRST_PLAYER_TWO,)))
+            else:
+                self._stream.write(bytes((FIRST_PLAYER_ONE,)))
+
+
+def read_games(stream, chunk_size=1 << 16):
+    """
+    Yields a GameRecord for each game in a binary stream of game records. The stream is read in chunks of
+    chunk_size bytes and only the game being read is kept in memory, so archives of any size can be read.
+    Raises ValueError if the stream is not a game record file or ends in the middle of a game.
+    """
+
+    buffer = bytearray()
+    position = 0
+    end_of_stream = False
+
+    while True:
+        # Keeps reading until a whole game, up to its END byte, is in the buffer
+        end = -1
+        while True:
+            if len(buffer) - position >= 6:
+                end = _find_end(buffer, position)
+                if end >= 0:
+                    break
+
+            if end_of_stream:
+                break
+
+            chunk = stream.read(chunk_size)
+
+            if not chunk:
+                end_of_stream = True
+
+            # Drops the games that have already been read before adding more
+            del buffer[:position]
+            position = 0
+            buffer += chunk
+
+        if end < 0:
+            if position < len(buffer):
+                raise ValueError("The game record stream ends in the middle of a game.")
+            return
+
+        player_one, player_two, ko_rule, events_start = read_header(buffer, position)
+        yield GameRecord(player_one, player_two, bytes(buffer[events_start:end]), ko_rule)
+        position = end + 1
+
+
+def read_header(buffer, position):
+    """
+    Returns the two players and the Ko rule of the game record header at the position in the buffer and the
+    position of the first event. Reads records of version 1 and 2.
+    """
+
+    if buffer[position:position + 4] != MAGIC or buffer[position + 4] not in (1, VERSION):
+        raise ValueError("Not a game record, or a version that can not be read.")
+
+    if buffer[position + 4] == 1:
+        ko_rule = "ko"
+        position += 5
+    elif buffer[position + 5] < len(KO_RULES):
+        ko_rule = KO_RULES[buffer[position + 5]]
+        position += 6
+    else:
+        raise ValueError("The game record has an unknown Ko rule.")
+
+    players = []
+
+    for player in range(2):
+        color = chr(buffer[position])
+        length = int.from_bytes(buffer[position + 1:position + 3], "little")
+        name = buffer[position + 3:position + 3 + length].decode("utf-8")
+        players.append((name, color))
+        position += 3 + length
+
+    return players[0], players[1], ko_rule, position
+
+
+def _find_end(buffer, position):
+    """
+    Returns the position of the END byte of the game record that starts at the position in the buffer,
+    or -1 if the whole header and END byte are not in the buffer yet.
+    """
+
+    header_end = position + (5 if buffer[position + 4] == 1 else 6)
+
+    for player in range(2):
+        if header_end + 3 > len(buffer):
+            return -1
+
+        header_end += 3 + int.from_bytes(buffer[header_end + 1:header_end + 3], "little")
+
+    if header_end > len(buffer):
+        return -1
+
+    return buffer.find(END, header_end)
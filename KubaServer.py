@@ -0,0 +1,498 @@
+# Author: Matt Sanders
+# Date: 10/18/2026
+# Description: This program hosts many games of 'Kuba' from KubaGame.py in one asyncio event loop and lets
+#              clients play them over TCP with one JSON object per line.
+
+import argparse
+import asyncio
+import collections
+import json
+import logging
+import time
+
+from KubaGame import KubaGame
+from KubaMetrics import MoveMetrics, serve_metrics
+
+_LOGGER = logging.getLogger(__name__)
+
+# Each request is one line holding a JSON object with an "op" and the fields it needs, and an optional "id"
+# that is sent back in the response. Each response is one line: {"id": ..., "ok": true, "result": ...} or
+# {"id": ..., "ok": false, "error": "..."}.
+#   new         players: [[name, color], [name, color]], engine (optional)  -> session number
+#   move        session, player, coordinates: [row, column], direction       -> make_move's result, turn, winner
+#   turn        session                                                      -> get_current_turn
+#   winner      session                                                      -> get_winner
+#   captured    session, player                                              -> get_captured
+#   marbles     session                                                      -> get_marble_count
+#   legal       session, player                                              -> list of [[row, column], direction]
+#   close       session                                                      -> true
+#   stats                                                                    -> SessionManager.get_stats
+
+
+class Session:
+    """
+    One hosted game. It holds the KubaGame, a lock so only one request changes the game at a time and when
+    the game was last used. An idle game can be parked as its KubaGame.get_state_bytes and
+    get_history_bytes, which are rebuilt into a KubaGame the next time it is used. It takes the session
+    number and the game.
+    """
+
+    __slots__ = ("number", "game", "lock", "last_used", "parked")
+
+    def __init__(self, number, game):
+        """
+        Initializes the session number, the game, its lock and the time it was last used. Returns nothing.
+        """
+
+        self.number = number
+        self.game = game
+        self.lock = None                # Made by get_lock when a request first needs it
+        self.last_used = time.monotonic()
+        self.parked = None              # (players, engine, Ko rule, state, history, metrics) while it is parked
+
+    def get_game(self):
+        """
+        Returns the session's KubaGame, rebuilding it first if it is parked. Takes no parameters.
+        """
+
+        if self.parked is not None:
+            players, engine, ko_rule, state, history, metrics = self.parked
+            self.game = KubaGame(players[0], players[1], engine, ko_rule)
+            self.game.set_state_bytes(state)
+            self.game.set_history_bytes(history)
+            self.game.set_metrics(metrics)
+            self.parked = None
+
+        return self.game
+
+    def park(self):
+        """
+        Replaces the KubaGame with its players, board engine, Ko rule, state bytes and position history bytes
+        to save memory. Returns nothing.
+        """
+
+        if self.parked is None:
+            self.parked = (self.game.get_players(), self.game.get_engine(), self.game.get_ko_rule(),
+                           self.game.get_state_bytes(), self.game.get_history_bytes(), self.game.get_metrics())
+            self.game = None
+            self.lock = None            # Parking only happens when no request holds the lock
+
+    def get_lock(self):
+        """
+        Returns the session's asyncio.Lock, making it if the session does not have one. Takes no parameters.
+        """
+
+        if self.lock is None:
+            self.lock = asyncio.Lock()
+
+        return self.lock
+
+    def is_busy(self):
+        """
+        Returns True if a request is holding the session's lock, otherwise False. Takes no parameters.
+        """
+
+        return self.lock is not None and self.lock.locked()
+
+
+class SessionManager:
+    """
+    Keeps every hosted game and answers the requests of the line protocol. Sessions are kept in the order they
+    were last used, so the idle ones are found at the front without looking at the others. It takes the number
+    of seconds a session can be idle before it is evicted and optionally the most sessions to host at once and
+    the number of idle seconds after which a game is parked as a few bytes until it is used again, and a
+    MoveMetrics from KubaMetrics.py that every game's make_move reports to.
+    """
+
+    def __init__(self, idle_timeout=300.0, max_sessions=None, park_timeout=30.0, metrics=None):
+        """
+        Initializes the sessions, the next session number and the counters. Returns nothing.
+        """
+
+        self._idle_timeout = idle_timeout
+        self._park_timeout = park_timeout
+        self._max_sessions = max_sessions
+        self._metrics = metrics
+        self._sessions = collections.OrderedDict()      # Session number to Session, least recently used first
+        self._unparked = collections.OrderedDict()      # The same for sessions park_idle has not parked
+        self._next_number = 1
+        self._requests = 0
+        self._evicted = 0
+        self._operations = {"new": self._new, "move": self._move, "turn": self._turn, "winner": self._winner,
+                            "captured": self._captured, "marbles": self._marbles, "legal": self._legal,
+                            "close": self._close, "stats": self._stats}
+
+    def get_session_count(self):
+        """
+        Returns the number of hosted sessions as an integer. Takes no parameters.
+        """
+
+        return len(self._sessions)
+
+    def get_stats(self):
+        """
+        Returns a dictionary of the number of sessions, parked sessions, requests answered and sessions evicted.
+        Takes no parameters.
+        """
+
+        parked = sum(1 for session in self._sessions.values() if session.parked is not None)
+        return {"sessions": len(self._sessions), "parked": parked, "requests": self._requests,
+                "evicted": self._evicted}
+
+    def create_session(self, player_one, player_two, engine="grid"):
+        """
+        Starts a new game and returns its session number as an integer. Takes the two players as (name, color)
+        tuples, the way they are given to KubaGame, and optionally the board engine. Raises ValueError unless
+        the players have different names and one plays the white marbles, "W", and the other the black, "B".
+        """
+
+        if player_one[0] == player_two[0]:
+            raise ValueError("The players must have different names.")
+
+        if sorted((player_one[1], player_two[1])) != ["B", "W"]:
+            raise ValueError("One player must play the color \"W\" and the other \"B\".")
+
+        if self._max_sessions is not None and len(self._sessions) >= self._max_sessions:
+            raise ValueError("The server is hosting as many sessions as it can.")
+
+        number = self._next_number
+        self._next_number += 1
+        game = KubaGame(tuple(player_one), tuple(player_two), engine)
+        game.set_metrics(self._metrics)
+        self._sessions[number] = self._unparked[number] = Session(number, game)
+        return number
+
+    def get_session(self, number):
+        """
+        Returns the Session with the given number and marks it as used. Raises KeyError if there is no such
+        session.
+        """
+
+        try:
+            session = self._sessions[number]
+        except KeyError:
+            raise KeyError("There is no session " + str(number) + ".") from None
+
+        session.last_used = time.monotonic()
+        self._sessions.move_to_end(number)
+        self._unparked[number] = session                # Most requests unpark the game
+        self._unparked.move_to_end(number)
+        return session
+
+    def close_session(self, number):
+        """
+        Stops hosting a session. Returns True if it was hosted or False if not. Takes the session number.
+        """
+
+        self._unparked.pop(number, None)
+        return self._sessions.pop(number, None) is not None
+
+    def evict_idle(self, now=None):
+        """
+        Stops hosting every session that has not been used for idle_timeout seconds and is not busy with a
+        request. Returns the number of sessions evicted. Optionally takes the current time.monotonic().
+        """
+
+        if now is None:
+            now = time.monotonic()
+
+        cutoff = now - self._idle_timeout
+        evicted = 0
+
+        for _ in range(len(self._sessions)):
+            number, session = next(iter(self._sessions.items()))
+
+            if session.last_used > cutoff:
+                break
+
+            if session.is_busy():
+                session.last_used = now                 # Busy with a request, so it is not idle
+                self._sessions.move_to_end(number)
+            else:
+                del self._sessions[number]
+                self._unparked.pop(number, None)
+                evicted += 1
+
+        self._evicted += evicted
+        return evicted
+
+    def park_idle(self, now=None):
+        """
+        Parks the game of every session that has not been used for park_timeout seconds and is not busy with
+        a request. Only sessions used since they were last looked at are looked at again. Returns the number of
+        games parked. Optionally takes the current time.monotonic().
+        """
+
+        if now is None:
+            now = time.monotonic()
+
+        cutoff = now - self._park_timeout
+        parked = 0
+
+        for number, session in list(self._unparked.items()):
+            if session.last_used > cutoff:
+                break
+
+            if session.is_busy():
+                continue                                # Looked at again until the request is answered
+
+            del self._unparked[number]
+
+            if session.parked is None:
+                session.park()
+                parked += 1
+
+        return parked
+
+    async def run_eviction(self, interval=10.0):
+        """
+        Evicts idle sessions and parks the games of less idle ones every interval seconds until cancelled.
+        Returns nothing.
+        """
+
+        while True:
+            await asyncio.sleep(interval)
+            self.evict_idle()
+            self.park_idle()
+
+    async def handle_request(self, request):
+        """
+        Answers one request of the line protocol. Takes the request as a dictionary and returns the response
+        as a dictionary.
+        """
+
+        self._requests += 1
+        response = {"id": request.get("id")}
+
+        try:
+            operation = self._operations[request["op"]]
+        except (KeyError, TypeError):
+            response.update(ok=False, error="Unknown operation.")
+            return response
+
+        try:
+            result = await operation(request)
+        except (KeyError, ValueError, TypeError) as error:
+            response.update(ok=False, error=str(error.args[0]) if error.args else type(error).__name__)
+            return response
+
+        response.update(ok=True, result=result)
+        return response
+
+    async def _new(self, request):
+        """
+        Starts a session for the "new" operation. Raises ValueError unless the players are two [name, color]
+        pairs of strings with different names, one with the color "W" and one with "B".
+        """
+
+        players = request["players"]
+
+        if (not isinstance(players, list) or len(players) != 2
+                or not all(isinstance(player, list) and len(player) == 2
+                           and all(isinstance(value, str) for value in player) for player in players)):
+            raise ValueError("The players must be two [name, color] pairs of strings.")
+
+        return self.create_session(players[0], players[1], request.get("engine", "grid"))
+
+    async def _move(self, request):
+        """
+        Makes a move in a session for the "move" operation while holding the session's lock. Raises ValueError
+        unless the coordinates are a [row, column] pair of integers.
+        """
+
+        session = self.get_session(request["session"])
+        coordinates = request["coordinates"]
+
+        if (not isinstance(coordinates, list) or len(coordinates) != 2
+                or not all(type(value) is int for value in coordinates)):
+            raise ValueError("The coordinates must be a [row, column] pair of integers.")
+
+        async with session.get_lock():
+            game = session.get_game()
+            coordinates = tuple(coordinates)
+            result = game.make_move(request["player"], coordinates, request["direction"])
+            return {"result": result, "turn": game.get_current_turn(), "winner": game.get_winner()}
+
+    async def _turn(self, request):
+        """
+        Returns whose turn it is in a session for the "turn" operation.
+        """
+
+        return self.get_session(request["session"]).get_game().get_current_turn()
+
+    async def _winner(self, request):
+        """
+        Returns the winner of a session for the "winner" operation.
+        """
+
+        return self.get_session(request["session"]).get_game().get_winner()
+
+    async def _captured(self, request):
+        """
+        Returns the red marbles a player has captured for the "captured" operation.
+        """
+
+        return self.get_session(request["session"]).get_game().get_captured(request["player"])
+
+    async def _marbles(self, request):
+        """
+        Returns the marbles left on the board for the "marbles" operation.
+        """
+
+        return self.get_session(request["session"]).get_game().get_marble_count()
+
+    async def _legal(self, request):
+        """
+        Returns the legal moves of a player for the "legal" operation.
+        """
+
+        return list(self.get_session(request["session"]).get_game().legal_moves(request["player"]))
+
+    async def _close(self, request):
+        """
+        Stops hosting a session for the "close" operation.
+        """
+
+        return self.close_session(request["session"])
+
+    async def _stats(self, request):
+        """
+        Returns the counters of the manager for the "stats" operation.
+        """
+
+        return self.get_stats()
+
+
+class GameServer:
+    """
+    Serves a SessionManager over TCP. Every connection can play any number of sessions, and requests on one
+    connection are answered in order. It takes the SessionManager, the host and the port.
+    """
+
+    def __init__(self, manager, host="127.0.0.1", port=8765):
+        """
+        Initializes the manager, the address and the server. Returns nothing.
+        """
+
+        self._manager = manager
+        self._host = host
+        self._port = port
+        self._server = None
+        self._eviction = None
+
+    def get_port(self):
+        """
+        Returns the port the server is listening on as an integer, which is useful when it was started on
+        port 0. Takes no parameters.
+        """
+
+        if self._server is None:
+            return self._port
+
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self, eviction_interval=10.0):
+        """
+        Starts listening and evicting idle sessions. Returns nothing.
+        """
+
+        self._server = await asyncio.start_server(self._handle_connection, self._host, self._port)
+        self._eviction = asyncio.ensure_future(self._manager.run_eviction(eviction_interval))
+
+    async def stop(self):
+        """
+        Stops listening and evicting sessions. The sessions are kept. Returns nothing.
+        """
+
+        self._eviction.cancel()
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def serve_forever(self, eviction_interval=10.0):
+        """
+        Starts the server and serves until cancelled. Returns nothing.
+        """
+
+        await self.start(eviction_interval)
+
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def _answer(self, request):
+        """
+        Returns the manager's response to a request. Errors the manager did not expect are bugs in the server,
+        not in the request, so they are logged and answered with an internal error instead of ending the
+        connection.
+        """
+
+        try:
+            return await self._manager.handle_request(request)
+        except Exception:
+            _LOGGER.exception("Answering the request %r failed.", request)
+            return {"id": request.get("id"), "ok": False, "error": "Internal server error."}
+
+    async def _handle_connection(self, reader, writer):
+        """
+        Answers the requests of one connection until it is closed.
+        """
+
+        try:
+            while True:
+                line = await reader.readline()
+
+                if not line:
+                    break
+
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    response = {"id": None, "ok": False, "error": "The request is not valid JSON."}
+                else:
+                    if isinstance(request, dict):
+                        response = await self._answer(request)
+                    else:
+                        response = {"id": None, "ok": False, "error": "The request is not a JSON object."}
+
+                writer.write(json.dumps(response, separators=(",", ":")).encode() + b"\n")
+                await writer.drain()    # Only waits when the client is not reading its responses
+
+        except (ConnectionError, ValueError):
+            pass        # The connection was lost or a line was longer than the reader's limit
+        finally:
+            writer.close()
+
+
+def main():
+    """
+    Runs a game server from the command line.
+    """
+
+    parser = argparse.ArgumentParser(description="Hosts games of Kuba over TCP with line-delimited JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--idle-timeout", type=float, default=300.0, help="seconds before an idle game is evicted")
+    parser.add_argument("--max-sessions", type=int, default=None)
+    parser.add_argument("--park-timeout", type=float, default=30.0, help="seconds before an idle game is parked")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="port to serve make_move metrics on at /metrics in the Prometheus format")
+    arguments = parser.parse_args()
+
+    metrics = None
+
+    if arguments.metrics_port is not None:
+        metrics = MoveMetrics()
+        serve_metrics(metrics, arguments.host, arguments.metrics_port)
+
+    manager = SessionManager(arguments.idle_timeout, arguments.max_sessions, arguments.park_timeout, metrics)
+    server = GameServer(manager, arguments.host, arguments.port)
+
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
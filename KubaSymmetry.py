@@ -0,0 +1,221 @@
+# Author: Matt Sanders
+# Date: 10/18/2026
+# Description: This program maps positions of 'Kuba' from KubaGame.py onto one canonical form under the
+#              symmetries of the board, so caches and opening books only need to keep one of each.
+
+import hashlib
+
+from KubaGame import KubaGame
+
+# The rules of the game are the same after turning or mirroring the board, and after swapping the white and
+# black marbles along with whose turn it is. A transform is a number from 0 to 15: transform % 8 picks one
+# of the eight turns and mirrors of the square below, and transforms 8 and up also swap the colors. The
+# starting layout is unchanged by the half turn and the two diagonal mirrors, and by the quarter turns and
+# the straight mirrors when the colors are swapped too.
+TRANSFORM_NAMES = ("identity", "quarter turn", "half turn", "three quarter turn", "mirror left to right",
+                   "mirror top to bottom", "mirror on the main diagonal", "mirror on the other diagonal")
+TRANSFORMS = 16
+_SQUARE = (lambda row, column: (row, column),
+           lambda row, column: (column, 6 - row),
+           lambda row, column: (6 - row, 6 - column),
+           lambda row, column: (6 - column, row),
+           lambda row, column: (row, 6 - column),
+           lambda row, column: (6 - row, column),
+           lambda row, column: (column, row),
+           lambda row, column: (6 - column, 6 - row))
+_STEPS = {"R": (0, 1), "L": (0, -1), "B": (1, 0), "F": (-1, 0)}
+_MOVE_ORDER = ("R", "L", "B", "F")
+_SWAP = bytes.maketrans(b"WB", b"BW")
+
+
+def _build_tables():
+    """
+    Returns, for each of the eight turns and mirrors, the cell each cell moves to, the direction each
+    direction becomes and the code each move code becomes, and the inverse of each.
+    """
+
+    cells = []
+    directions = []
+
+    for square in _SQUARE:
+        cells.append([row * 7 + column for row, column in (square(*divmod(cell, 7)) for cell in range(49))])
+        turned = {}
+
+        for direction, (row_step, column_step) in _STEPS.items():
+            start = square(3, 3)
+            end = square(3 + row_step, 3 + column_step)
+            step = (end[0] - start[0], end[1] - start[1])
+            turned[direction] = next(name for name, name_step in _STEPS.items() if name_step == step)
+
+        directions.append(turned)
+
+    moves = [[cells[index][code // 4] * 4 + _MOVE_ORDER.index(directions[index][_MOVE_ORDER[code % 4]])
+              for code in range(49 * 4)] for index in range(8)]
+    inverses = [next(other for other in range(8) if all(cells[other][cells[index][cell]] == cell
+                                                          for cell in range(49))) for index in range(8)]
+    return cells, directions, moves, inverses
+
+
+_CELLS, _DIRECTIONS, _MOVES, _INVERSES = _build_tables()
+
+
+def inverse_transform(transform):
+    """
+    Returns the transform that undoes the given one as an integer.
+    """
+
+    return _INVERSES[transform % 8] + transform // 8 * 8
+
+
+def transform_coordinates(coordinates, transform):
+    """
+    Returns where the coordinates, (row, column), are on the board after the transform as a tuple.
+    """
+
+    cell = _CELLS[transform % 8][coordinates[0] * 7 + coordinates[1]]
+    return divmod(cell, 7)
+
+
+def transform_direction(direction, transform):
+    """
+    Returns the direction, 'R', 'L', 'B' or 'F', that a move in the given direction becomes after the
+    transform as a string.
+    """
+
+    return _DIRECTIONS[transform % 8][direction]
+
+
+def transform_move(move, transform):
+    """
+    Returns the move, ((row, column), direction), after the transform as a tuple. A move found for the
+    canonical form of a position is mapped back onto the real board with the transform's inverse.
+    """
+
+    return transform_coordinates(move[0], transform), transform_direction(move[1], transform)
+
+
+def _check_size(game):
+    """
+    Raises a ValueError if the game is not on a 7x7 board, the only size the transforms are made for.
+    """
+
+    if game.get_size() != 7:
+        raise ValueError("Symmetries are only worked out for games on a 7x7 board.")
+
+
+def canonical_position(game, player_name=None):
+    """
+    Returns the canonical form of the game's position and the transform that turns the game's position into
+    it, as a tuple. The canonical form is a bytes object of the 49 cells, whose turn it is and each color's
+    last move and captured red marbles, the smallest of the 16 transforms of the position, so every position
+    that is the same as another under a symmetry has the same canonical form. Before the first move nobody
+    has the turn, and an optional player's name is used as the player to move instead. Only games on the
+    standard 7x7 board have a canonical form; any other size raises a ValueError.
+    """
+
+    _check_size(game)
+    cells = game.get_state_bytes()[:49]
+    (player_one, color_one), (player_two, color_two) = game.get_players()
+    turn = game.get_current_turn()
+
+    if turn is None:
+        turn = player_name
+    last_moves = {color_one: game.get_last_move(player_one), color_two: game.get_last_move(player_two)}
+    captured = {color_one: game.get_captured(player_one), color_two: game.get_captured(player_two)}
+    turn_color = None if turn is None else game.get_player_color(turn)
+
+    best = None
+    best_transform = 0
+
+    for transform in range(TRANSFORMS):
+        square = transform % 8
+        turned = bytearray(49)
+
+        for cell, value in zip(_CELLS[square], cells):
+            turned[cell] = value
+
+        colors = ("W", "B")
+
+        if transform >= 8:
+            turned = turned.translate(_SWAP)
+            colors = ("B", "W")
+
+        # Each color's values come from the color it was before the swap
+        turned.append(0 if turn_color is None else 1 + colors.index(turn_color))
+
+        for color in colors:
+            move = last_moves[color]
+            turned.append(255 if move is None else
+                          _MOVES[square][(move[0][0] * 7 + move[0][1]) * 4 + _MOVE_ORDER.index(move[1])])
+
+        turned += bytes(captured[color] for color in colors)
+
+        if best is None or turned < best:
+            best = turned
+            best_transform = transform
+
+    return bytes(best), best_transform
+
+
+def canonical_key(game, player_name=None):
+    """
+    Returns a 64-bit key of the canonical form of the game's position as an integer, the same for every
+    position that is the same as another under a symmetry. Takes the same parameters as canonical_position.
+    """
+
+    return key_of(canonical_position(game, player_name)[0])
+
+
+def key_of(canonical):
+    """
+    Returns the 64-bit key of a canonical form from canonical_position as an integer.
+    """
+
+    return int.from_bytes(hashlib.blake2b(canonical, digest_size=8).digest(), "little")
+
+
+def transformed_game(game, transform, engine=None):
+    """
+    Returns a new KubaGame with the same players and Ko rule whose position is the game's position after the
+    transform. When the transform swaps the colors, each player plays the other color. The position history
+    is mapped through the transform too, so the new game allows the moves the game allows after the same
+    transform. Takes the game, the transform and optionally the board engine, the game's engine if None. The
+    game must be on a 7x7 board.
+    """
+
+    _check_size(game)
+    (player_one, color_one), (player_two, color_two) = game.get_players()
+    state = game.get_state_bytes()
+    square = transform % 8
+    cells = bytearray(49)
+
+    for cell, value in zip(_CELLS[square], state[:49]):
+        cells[cell] = value
+
+    if transform >= 8:
+        cells = cells.translate(_SWAP)
+        color_one, color_two = color_two, color_one
+
+    turned = bytearray(cells) + state[49:]
+
+    for offset in (54, 57):
+        if turned[offset] != 255:
+            turned[offset] = _MOVES[square][turned[offset]]
+
+    copy = KubaGame((player_one, color_one), (player_two, color_two), engine or game.get_engine(),
+                    game.get_ko_rule())
+
+    if transform >= 8:
+        # The white and black marble counts change places with the colors
+        turned[49], turned[50] = turned[50], turned[49]
+
+    copy.set_state_bytes(bytes(turned))
+
+    # The history keeps the positions as they were on the game's board, which each cell of the copy comes from
+    sources = bytearray(49)
+
+    for cell, turned_cell in enumerate(_CELLS[square]):
+        sources[turned_cell] = cell
+
+    copy.set_history_bytes(game.get_history_bytes(), sources, transform >= 8)
+    return copy
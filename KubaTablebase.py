@@ -0,0 +1,617 @@
+# Author: Matt Sanders
+# Date: 10/18/2026
+# Description: This program builds endgame tablebases for 'Kuba' from KubaGame.py by retrograde analysis: for
+#              every position with only a few marbles left it works out whether the player to move wins, loses
+#              or draws with best play and in how many plies. It needs NumPy, which the rest of the game does not.
+
+import argparse
+import concurrent.futures
+import functools
+import itertools
+import os
+import time
+
+import numpy as np
+
+# A table holds one material configuration: the white, black and red marbles on the board and the red marbles
+# white has captured, black having captured the other 13 - red - white. Its positions are numbered by the
+# cells of each color, each set of cells ranked in the combinatorial number system, times two for the color
+# to move, so a position is found without searching. Each position keeps its best score, the move code,
+# cell * 4 + direction index, of the best move, how many moves tie for the best and the score of the next
+# best choice. The opponent's last move can forbid at most one move, the one pushing back along the same
+# line, and a position is only worth less when that is its only best move, so the next best score is enough
+# to score every position exactly whatever move came before it.
+# The tables solve the game played with ko_rule="none". The line rule is the only repetition rule they know,
+# and a player who passes is taken to leave the other player free to make any move, although in a game the
+# line rule of the passing player's last move still holds. Repeated positions are common in endgames, so
+# Tablebase.probe only answers for games with no Ko rule.
+WIN = 1000                  # Score of a win for the player to move, less one for each ply until it happens
+NO_MOVE = 255               # Move code of a position whose player can not move and passes
+RECORD = np.dtype([("best", "<i2"), ("second", "<i2"), ("move", "u1"), ("ties", "u1")])
+EMPTY, WHITE, BLACK, RED = 0, 1, 2, 3
+_STEPS = ((0, 1), (0, -1), (1, 0), (-1, 0))     # Row and column step of each direction index, R, L, B, F
+_MOVE_ORDER = ("R", "L", "B", "F")
+_OPPOSITE = (1, 0, 3, 2)
+_INDEX = np.arange(7)
+_BINOMIAL = np.zeros((50, 50), dtype=np.int64)      # _BINOMIAL[n, k] is n choose k
+_BINOMIAL[:, 0] = 1
+
+for _row in range(1, 50):
+    _BINOMIAL[_row, 1:] = _BINOMIAL[_row - 1, :-1] + _BINOMIAL[_row - 1, 1:]
+
+
+def _build_lines():
+    """
+    Returns the cells of the 7 lines a push in each direction index moves along, ordered so the push goes
+    toward the end of the line, as a (4, 7, 7) array.
+    """
+
+    lines = np.zeros((4, 7, 7), dtype=np.intp)
+
+    for index in range(7):
+        for position in range(7):
+            lines[0, index, position] = index * 7 + position          # Right, along a row
+            lines[1, index, position] = index * 7 + 6 - position      # Left, along a row backward
+            lines[2, index, position] = position * 7 + index          # Backward, down a column
+            lines[3, index, position] = (6 - position) * 7 + index    # Forward, up a column
+
+    return lines
+
+
+_LINES = _build_lines()
+
+
+def configurations(max_marbles):
+    """
+    Returns every material configuration with at most max_marbles marbles on the board whose game is not over,
+    as a list of (white, black, red, white captured) tuples with the fewest marbles first.
+    """
+
+    found = []
+
+    for total in range(3, max_marbles + 1):
+        for white in range(1, 9):
+            for black in range(1, 9):
+                red = total - white - black
+
+                if 1 <= red <= 13:
+                    for white_captured in range(7):
+                        if 0 <= 13 - red - white_captured <= 6:
+                            found.append((white, black, red, white_captured))
+
+    return found
+
+
+def table_size(configuration):
+    """
+    Returns the number of positions in the table of a material configuration as an integer, counting the
+    numbers that belong to no position because two colors share a cell.
+    """
+
+    white, black, red = configuration[:3]
+    return int(_BINOMIAL[49, white] * _BINOMIAL[49, black] * _BINOMIAL[49, red]) * 2
+
+
+def table_name(configuration):
+    """
+    Returns the file name of the table of a material configuration as a string.
+    """
+
+    return "kuba_w%d_b%d_r%d_c%d.npy" % configuration
+
+
+@functools.lru_cache(maxsize=None)
+def _combinations(count):
+    """
+    Returns every set of count cells as a (sets, count) array of sorted cells, in the order of their ranks.
+    """
+
+    cells = np.array(list(itertools.combinations(range(49), count)), dtype=np.intp).reshape(-1, count)
+    table = np.empty_like(cells)
+    table[_BINOMIAL[cells, np.arange(1, count + 1)].sum(axis=1)] = cells
+    return table
+
+
+def _rank(boards, value):
+    """
+    Returns the rank of the cells holding the value on each of the (boards, 49) boards as an array.
+    """
+
+    mask = boards == value
+    ordinal = np.cumsum(mask, axis=1)
+    return np.where(mask, _BINOMIAL[np.arange(49), ordinal], 0).sum(axis=1)
+
+
+def _index(boards, configuration, side):
+    """
+    Returns the number of each of the (boards, 49) boards in the table of the configuration, with the given
+    side to move, 0 for white and 1 for black, as an array.
+    """
+
+    sizes = [int(_BINOMIAL[49, count]) for count in configuration[:3]]
+    placement = (_rank(boards, WHITE) * sizes[1] + _rank(boards, BLACK)) * sizes[2] + _rank(boards, RED)
+    return placement * 2 + side
+
+
+def _score(records, forbidden):
+    """
+    Returns the score of each record when the move code forbidden, NO_MOVE for none, can not be played.
+    """
+
+    only_best = (records["move"] == forbidden) & (records["ties"] == 1)
+    return np.where(only_best, records["second"], records["best"]).astype(np.int32)
+
+
+def _back(scores):
+    """
+    Returns the score of a move for the player making it from the scores of the positions it leads to, one
+    ply further from the end.
+    """
+
+    scores = -scores
+    return scores - np.sign(scores)
+
+
+def _generate_moves(directory, configuration, start, stop):
+    """
+    Works out every legal move of the positions numbered start * 2 to stop * 2 in the configuration's table.
+    Returns the arrays of the move's position, its code, the position it leads to in the same table with the
+    code the opponent can then not play, or -1 and the move's fixed score if it captures, and the valid
+    positions as a mask.
+    """
+
+    white, black, red, white_captured = configuration
+    counts = (white, black)
+    captured = (white_captured, 13 - red - white_captured)
+    sizes = [int(_BINOMIAL[49, count]) for count in configuration[:3]]
+    placement = np.arange(start, stop)
+    white_rank, rest = np.divmod(placement, sizes[1] * sizes[2])
+    black_rank, red_rank = np.divmod(rest, sizes[2])
+
+    boards = np.zeros((len(placement), 49), dtype=np.int8)
+    rows = np.arange(len(placement))[:, None]
+    boards[rows, _combinations(white)[white_rank]] = WHITE
+    boards[rows, _combinations(black)[black_rank]] = BLACK
+    boards[rows, _combinations(red)[red_rank]] = RED
+
+    # Numbers whose colors share a cell have fewer marbles on the board than the configuration
+    valid = np.count_nonzero(boards, axis=1) == white + black + red
+    found = {"state": [], "code": [], "target": [], "forbidden": [], "fixed": []}
+
+    for side in (0, 1):
+        mover = side + 1
+        opponent = 2 - side
+
+        for direction, line in itertools.product(range(4), range(7)):
+            cells = _LINES[direction, line]
+            values = boards[:, cells]
+
+            for position in range(7):
+                movable = valid & (values[:, position] == mover)
+
+                if position:
+                    movable &= values[:, position - 1] == EMPTY
+
+                chosen = np.nonzero(movable)[0]
+
+                if not len(chosen):
+                    continue
+
+                # The push stops at the first empty space in front of the marble, or runs off the end
+                line_values = values[chosen]
+                gaps = (line_values == EMPTY) & (_INDEX > position)
+                has_gap = gaps.any(axis=1)
+                end = np.where(has_gap, gaps.argmax(axis=1), 6)
+                knocked_off = np.where(has_gap, EMPTY, line_values[:, 6])
+                legal = np.nonzero(knocked_off != mover)[0]
+                chosen, line_values, end, knocked_off = (array[legal] for array in
+                                                         (chosen, line_values, end, knocked_off))
+
+                source = np.where((_INDEX > position) & (_INDEX <= end[:, None]), _INDEX - 1, _INDEX)
+                shifted = np.take_along_axis(line_values, source, axis=1)
+                shifted[:, position] = EMPTY
+                children = boards[chosen]
+                children[:, cells] = shifted
+
+                # The opponent can not push back the row of marbles that now runs from the space moved from
+                gaps = (shifted == EMPTY) & (_INDEX > position)
+                last = np.where(gaps.any(axis=1), gaps.argmax(axis=1) - 1, 6)
+                forbidden = (cells[last] * 4 + _OPPOSITE[direction]).astype(np.uint8)
+
+                code = cells[position] * 4 + direction
+                states = placement[chosen] * 2 + side
+
+                for removed in (EMPTY, opponent, RED):
+                    group = np.nonzero(knocked_off == removed)[0]
+
+                    if not len(group):
+                        continue
+
+                    found["state"].append(states[group])
+                    found["code"].append(np.full(len(group), code, dtype=np.uint8))
+                    found["forbidden"].append(forbidden[group])
+
+                    if removed == EMPTY:
+                        found["target"].append(_index(children[group], configuration, 1 - side))
+                        found["fixed"].append(np.zeros(len(group), dtype=np.int32))
+                        continue
+
+                    found["target"].append(np.full(len(group), -1, dtype=np.int64))
+
+                    if removed == RED and captured[side] == 6 or removed == opponent and counts[1 - side] == 1:
+                        found["fixed"].append(np.full(len(group), WIN - 1, dtype=np.int32))
+                        continue
+
+                    child = list(configuration)
+                    child[1 - side if removed == opponent else 2] -= 1
+                    child[3] += 1 if removed == RED and side == 0 else 0
+                    records = _load_table(directory, tuple(child))
+                    targets = _index(children[group], child, 1 - side)
+                    found["fixed"].append(_back(_score(records[targets], forbidden[group])))
+
+    return {name: np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+            for name, parts in found.items()}, valid
+
+
+@functools.lru_cache(maxsize=None)
+def _load_table(directory, configuration):
+    """
+    Returns the records of a configuration's table file through a read only memory map.
+    """
+
+    return np.load(os.path.join(directory, table_name(configuration)), mmap_mode="r")
+
+
+def solve_configuration(directory, configuration, chunk=1 << 15):
+    """
+    Builds the table of one material configuration and writes it to the directory, where the tables of every
+    configuration it can capture into must already be. Takes the directory, the configuration and the number
+    of placements to generate moves for at a time. Returns the number of positions in the table.
+
+    The moves of each chunk of placements are worked out once and kept in files in a work directory, which
+    every pass then reads back one chunk at a time through memory maps, so the memory used is the table's
+    records twice over and one chunk of moves however many moves the table has.
+    """
+
+    placements = table_size(configuration) // 2
+    path = os.path.join(directory, table_name(configuration))
+    work = path + ".work"
+    os.makedirs(work, exist_ok=True)
+
+    try:
+        chunks = []
+        positions = 0
+
+        for start in range(0, placements, chunk):
+            stop = min(start + chunk, placements)
+            moves, valid = _generate_moves(directory, configuration, start, stop)
+            positions += _save_chunk(work, len(chunks), start * 2, moves, valid)
+            chunks.append((start * 2, stop * 2))
+            del moves
+
+        records = np.zeros(placements * 2, dtype=RECORD)
+        records["move"] = NO_MOVE
+        updated = records.copy()
+
+        # Each pass looks one ply further ahead, starting with every position drawn, until nothing changes
+        while True:
+            changed = False
+
+            for number, (low, high) in enumerate(chunks):
+                _solve_chunk(_load_chunk(work, number), records, updated, low, high)
+                changed = changed or not np.array_equal(updated[low:high], records[low:high])
+
+            records, updated = updated, records
+
+            if not changed:
+                break
+
+        np.save(path + ".part.npy", records)
+        os.replace(path + ".part.npy", path)
+        return positions
+    finally:
+        for name in os.listdir(work):
+            os.remove(os.path.join(work, name))
+
+        os.rmdir(work)
+
+
+_CHUNK_ARRAYS = ("code", "fixed", "starts", "sizes", "moving", "alone", "stuck", "inside", "inside_target",
+                 "inside_forbidden")
+
+
+def _save_chunk(work, number, low, moves, valid):
+    """
+    Groups the moves of a chunk from _generate_moves by position and writes the arrays a pass needs to files
+    in the work directory. Takes the work directory, the chunk's number, the number of its first position,
+    the moves and the mask of its valid placements. Returns the number of valid positions in the chunk.
+    """
+
+    # Grouping the moves by position lets each pass work on every position of the chunk at once
+    order = np.argsort(moves["state"], kind="stable")
+    state, code, target, forbidden, fixed = (moves[name][order] for name in
+                                             ("state", "code", "target", "forbidden", "fixed"))
+    del moves, order
+    starts = np.flatnonzero(np.r_[True, state[1:] != state[:-1]]) if len(state) else np.zeros(0, dtype=np.intp)
+    moving = state[starts]
+    sizes = np.diff(np.r_[starts, len(state)])
+    inside = np.flatnonzero(target >= 0)
+    stuck = low + np.flatnonzero(np.repeat(valid, 2))
+    arrays = {"code": code, "fixed": fixed, "starts": starts, "sizes": sizes, "moving": moving,
+              "alone": moving[sizes == 1], "stuck": stuck[np.isin(stuck, moving, assume_unique=True, invert=True)],
+              "inside": inside, "inside_target": target[inside], "inside_forbidden": forbidden[inside]}
+
+    for name in _CHUNK_ARRAYS:
+        np.save(os.path.join(work, "%d_%s.npy" % (number, name)), arrays[name])
+
+    return int(np.count_nonzero(valid)) * 2
+
+
+def _load_chunk(work, number):
+    """
+    Returns the arrays of a chunk written by _save_chunk as a dictionary, read through memory maps.
+    """
+
+    return {name: np.load(os.path.join(work, "%d_%s.npy" % (number, name)), mmap_mode="r") for name in _CHUNK_ARRAYS}
+
+
+def _solve_chunk(arrays, records, updated, low, high):
+    """
+    Works out one pass for the positions low to high of a chunk: writes the records they get when every
+    move is scored from the records of the pass before into updated.
+    """
+
+    passing = _back(records["best"][low:high].astype(np.int32)[np.arange(high - low) ^ 1])
+    updated[low:high] = records[low:high]
+    starts = arrays["starts"]
+
+    if len(starts):
+        scores = np.array(arrays["fixed"])
+        scores[arrays["inside"]] = _back(_score(records[arrays["inside_target"]], arrays["inside_forbidden"]))
+        sizes = arrays["sizes"]
+        moving = arrays["moving"]
+        best = np.maximum.reduceat(scores, starts)
+        at_best = scores == np.repeat(best, sizes)
+        ties = np.add.reduceat(at_best, starts)
+        move = np.minimum.reduceat(np.where(at_best, arrays["code"], NO_MOVE), starts)
+        second = np.maximum.reduceat(np.where(at_best, -WIN - 1, scores), starts)
+        second = np.where(ties > 1, best, second)
+        updated["best"][moving] = best
+        updated["move"][moving] = move
+        updated["ties"][moving] = np.minimum(ties, 254)
+        updated["second"][moving] = second
+
+    # A player with no move passes, and so does one whose only move is forbidden
+    alone = arrays["alone"]
+    stuck = arrays["stuck"]
+    updated["second"][alone] = passing[alone - low]
+    updated["best"][stuck] = passing[stuck - low]
+    updated["second"][stuck] = passing[stuck - low]
+
+
+def _solve_in_worker(directory, configuration):
+    """
+    Builds one table in a worker process and returns the configuration with its number of positions.
+    """
+
+    return configuration, solve_configuration(directory, configuration)
+
+
+def worker_memory(configuration, chunk=1 << 15):
+    """
+    Returns about how many bytes building the table of a material configuration takes in one process: the
+    records of the pass before and of the new pass, the table being loaded to save it, and the moves of one
+    chunk of placements with the arrays made to group them.
+    """
+
+    return 3 * table_size(configuration) * RECORD.itemsize + chunk * 4096
+
+
+def _available_memory():
+    """
+    Returns the bytes of memory the system has available for new processes as an integer, or None if it
+    can not be found.
+    """
+
+    try:
+        with open("/proc/meminfo") as meminfo:
+            for line in meminfo:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def generate_tablebase(directory, max_marbles=3, workers=None, progress=None, memory=None):
+    """
+    Builds the tables of every material configuration with at most max_marbles marbles on the board and writes
+    them to the directory, skipping tables that are already there. The configurations with the same number of
+    marbles only capture into ones with fewer, so each group is built at once across worker processes after
+    the one before it. Takes the directory, the most marbles, the number of processes, os.cpu_count() if None,
+    optionally a function called with each configuration and its number of positions, and the bytes of
+    memory the workers may use together, the memory available when the build starts if None. Fewer workers
+    are started when worker_memory says the given number would not fit. Returns the number of positions in
+    the tables built.
+    """
+
+    os.makedirs(directory, exist_ok=True)
+    positions = 0
+    workers = workers or os.cpu_count() or 1
+    memory = memory or _available_memory()
+
+    for total in range(3, max_marbles + 1):
+        group = [configuration for configuration in configurations(total) if sum(configuration[:3]) == total
+                 and not os.path.exists(os.path.join(directory, table_name(configuration)))]
+
+        if not group:
+            continue
+
+        group_workers = min(workers, len(group))
+
+        if memory is not None:
+            group_workers = max(1, min(group_workers, memory // max(map(worker_memory, group))))
+
+        with concurrent.futures.ProcessPoolExecutor(group_workers) as executor:
+            for configuration, count in executor.map(_solve_in_worker, [directory] * len(group), group):
+                positions += count
+
+                if progress is not None:
+                    progress(configuration, count)
+
+    return positions
+
+
+class Tablebase:
+    """
+    Reads the tables written by generate_tablebase through read only memory maps, so they load at once and
+    are shared between processes. probe finds the result of a position with one lookup. Tables are opened
+    the first time a position needs them. It takes the directory of the tables.
+    """
+
+    def __init__(self, directory):
+        """
+        Initializes the directory and the open tables. Returns nothing.
+        """
+
+        self._directory = directory
+        self._tables = {}
+
+    def get_configurations(self):
+        """
+        Returns the material configurations in the directory as a sorted list of (white, black, red, white
+        captured) tuples. Takes no parameters.
+        """
+
+        return sorted(configuration for configuration in configurations(8 + 8 + 13)
+                      if os.path.exists(os.path.join(self._directory, table_name(configuration))))
+
+    def probe(self, game):
+        """
+        Returns the result of the game's position for the player whose turn it is with best play from both
+        sides, as a tuple of 'win', 'loss' or 'draw' and the number of plies until the game is won, or None
+        for a draw. Returns None if the game is over, nobody has the turn yet, the game is not on a 7x7 board
+        or is played with a Ko rule other than 'none', which the tables do not solve, or the tablebase has no
+        table for its marbles. After a pass the tables take every move to be allowed, as described at the top
+        of this file. Takes a KubaGame.
+        """
+
+        score = self.probe_score(game)
+
+        if score is None:
+            return None
+        elif score > 0:
+            return "win", WIN - score
+        elif score < 0:
+            return "loss", WIN + score
+
+        return "draw", None
+
+    def probe_score(self, game):
+        """
+        Returns the score of the game's position for the player whose turn it is as an integer, WIN less the
+        plies to a win, less than zero for a loss and 0 for a draw, or None when probe returns None. Takes a
+        KubaGame. The tables are only built for the 7x7 board and the game without a Ko rule, so games of any
+        other size or rule get None.
+        """
+
+        turn = game.get_current_turn()
+
+        if turn is None or game.get_winner() is not None or game.get_size() != 7 or game.get_ko_rule() != "none":
+            return None
+
+        (player_one, color_one), (player_two, color_two) = game.get_players()
+        captured = {color_one: game.get_captured(player_one), color_two: game.get_captured(player_two)}
+        white, black, red = game.get_marble_count()
+        configuration = (white, black, red, captured["W"])
+        table = self._get_table(configuration)
+
+        if table is None:
+            return None
+
+        cells = game.get_state_bytes()[:49]
+        ranks = {}
+
+        for value in b"WBR":
+            ranks[value] = 0
+            ordinal = 0
+
+            for cell in range(49):
+                if cells[cell] == value:
+                    ordinal += 1
+                    ranks[value] += int(_BINOMIAL[cell, ordinal])
+
+        sizes = [int(_BINOMIAL[49, count]) for count in configuration[:3]]
+        placement = (ranks[ord("W")] * sizes[1] + ranks[ord("B")]) * sizes[2] + ranks[ord("R")]
+        record = table[placement * 2 + (game.get_player_color(turn) == "B")]
+        opponent = player_two if turn == player_one else player_one
+        forbidden = _forbidden_move(cells, game.get_last_move(opponent))
+
+        if record["move"] == forbidden and record["ties"] == 1:
+            return int(record["second"])
+
+        return int(record["best"])
+
+    def _get_table(self, configuration):
+        """
+        Returns the records of a configuration's table, opening it if needed, or None if there is no table.
+        """
+
+        if configuration not in self._tables:
+            path = os.path.join(self._directory, table_name(configuration))
+            self._tables[configuration] = np.load(path, mmap_mode="r") if os.path.exists(path) else None
+
+        return self._tables[configuration]
+
+
+def _forbidden_move(cells, opponent_move):
+    """
+    Returns the code of the move the opponent's last move forbids on the board of 49 cells, the push back
+    along the same line by the marble at the far end of the row that starts next to the space the opponent
+    moved from, or NO_MOVE if it forbids nothing.
+    """
+
+    if opponent_move is None:
+        return NO_MOVE
+
+    (row, column), direction = opponent_move
+    row_step, column_step = _STEPS[_MOVE_ORDER.index(direction)]
+    row, column = row + row_step, column + column_step
+
+    if not (0 <= row < 7 and 0 <= column < 7) or cells[row * 7 + column] == ord("X"):
+        return NO_MOVE
+
+    while 0 <= row + row_step < 7 and 0 <= column + column_step < 7 and \
+            cells[(row + row_step) * 7 + column + column_step] != ord("X"):
+        row, column = row + row_step, column + column_step
+
+    return (row * 7 + column) * 4 + _OPPOSITE[_MOVE_ORDER.index(direction)]
+
+
+def main():
+    """
+    Builds a tablebase from the command line.
+    """
+
+    parser = argparse.ArgumentParser(description="Builds endgame tablebases for Kuba.")
+    parser.add_argument("directory")
+    parser.add_argument("--max-marbles", type=int, default=3, help="most marbles on the board")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes")
+    parser.add_argument("--memory-mb", type=int, default=None,
+                        help="memory the workers may use together, the available memory by default")
+    arguments = parser.parse_args()
+
+    start = time.perf_counter()
+    memory = None if arguments.memory_mb is None else arguments.memory_mb << 20
+    positions = generate_tablebase(arguments.directory, arguments.max_marbles, arguments.workers,
+                                   lambda configuration, count: print(table_name(configuration), count, "positions"),
+                                   memory)
+    print(positions, "positions in", round(time.perf_counter() - start, 1), "seconds")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# Author: Matt Sanders
+# Date: 10/18/2026
+# Description: This program tests the game archives of KubaArchive.py by archiving seeded random games and
+#              comparing every ply rebuilt from the archive with a replay of the whole game. Run it with
+#              python -m pytest or python -m unittest.
+
+import io
+import os
+import pickle
+import tempfile
+import unittest
+
+from KubaArchive import ArchiveWriter, GameArchive
+from KubaGame import KubaGame, STATE_SIZE
+from KubaRecord import read_games
+from test_KubaRecord import PLAYERS, record_games
+
+
+class ArchiveTest(unittest.TestCase):
+    """
+    Archives random games under every Ko rule with a snapshot every 8 plies.
+    """
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self._path = os.path.join(self._directory.name, "games.arch")
+        self._games = [(KubaGame(PLAYERS[0], PLAYERS[1], ko_rule=ko_rule), seed)
+                       for seed in range(15) for ko_rule in ("superko", "ko", "none")]
+        self._records = list(read_games(io.BytesIO(record_games(self._games))))
+
+        with ArchiveWriter(self._path, snapshot_interval=8) as writer:
+            for record in self._records:
+                writer.add_game(record)
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_every_ply_matches_a_full_replay(self):
+        with GameArchive(self._path) as archive:
+            self.assertEqual(len(archive), len(self._records))
+
+            for index, record in enumerate(self._records):
+                self.assertEqual(archive.get_record(index).get_events(), record.get_events())
+                self.assertEqual(archive.get_record(index).get_ko_rule(), record.get_ko_rule())
+
+                for ply, replayed in enumerate(record.replay(), 1):
+                    game = archive.get_game(index, ply, "bitboard")
+                    player_name = replayed.get_current_turn()
+
+                    self.assertEqual(game.get_state_bytes(), replayed.get_state_bytes(), (index, ply))
+                    self.assertEqual(game.get_history_bytes(), replayed.get_history_bytes(), (index, ply))
+                    self.assertEqual(list(game.legal_moves(player_name)), list(replayed.legal_moves(player_name)),
+                                     (index, ply))
+
+                self.assertEqual(archive.get_ply_count(index), ply)
+                self.assertEqual(archive.get_game(index).get_state_bytes(), self._games[index][0].get_state_bytes())
+
+    def test_snapshots_are_the_states_of_the_game(self):
+        with GameArchive(self._path) as archive:
+            for index, record in enumerate(self._records):
+                states = [game.get_state_bytes() for game in record.replay()][7::8]
+                snapshots = archive.get_snapshots(index)
+
+                self.assertEqual(bytes(snapshots), b"".join(states))
+                self.assertEqual(len(snapshots), len(states) * STATE_SIZE)
+                snapshots.release()
+
+    def test_archives_can_be_pickled(self):
+        with GameArchive(self._path) as archive:
+            copy = pickle.loads(pickle.dumps(archive))
+            self.assertEqual(copy.get_game(5, 20).get_state_bytes(), archive.get_game(5, 20).get_state_bytes())
+            copy.close()
+
+    def test_missing_games_and_plies_raise(self):
+        with GameArchive(self._path) as archive:
+            with self.assertRaises(IndexError):
+                archive.get_game(len(archive))
+
+            with self.assertRaises(IndexError):
+                archive.get_game(0, archive.get_ply_count(0) + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+# Author: Matt Sanders
+# Date: 10/18/2026
+# Description: This program tests the opening books of KubaBook.py by building a small book and looking up
+#              the positions it covers, turned and mirrored too. Run it with python -m pytest or
+#              python -m unittest.
+
+import os
+import tempfile
+import unittest
+
+from KubaBook import build_opening_book, OpeningBook
+from KubaGame import KubaGame
+from KubaSymmetry import TRANSFORMS, canonical_position, transformed_game
+
+
+class OpeningBookTest(unittest.TestCase):
+    """
+    Builds a book of the first two plies searched to depth 2 once for every test.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls._directory = tempfile.TemporaryDirectory()
+        cls._path = os.path.join(cls._directory.name, "book.bin")
+        cls._count = build_opening_book(cls._path, plies=2, search_depth=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._directory.cleanup()
+
+    def setUp(self):
+        self._book = OpeningBook(self._path)
+
+    def tearDown(self):
+        self._book.close()
+
+    def test_the_header_describes_the_book(self):
+        self.assertEqual(len(self._book), self._count)
+        self.assertEqual(self._book.get_plies(), 2)
+        self.assertEqual(self._book.get_search_depth(), 2)
+
+    def test_covered_positions_have_legal_moves(self):
+        game = KubaGame(("A", "W"), ("B", "B"))
+        games = []
+
+        for first in list(game.legal_moves("A")):
+            child = game.fork()
+            child.make_move("A", *first)
+
+            for second in list(child.legal_moves("B")):
+                grandchild = child.fork()
+                grandchild.make_move("B", *second)
+                games.append(grandchild)
+
+        for position in [game] + games:
+            player_name = position.get_current_turn() or "A"
+            move = self._book.get_move(position, player_name)
+
+            self.assertIsNotNone(move)
+            self.assertIn(move, list(position.legal_moves(player_name)))
+
+        # A third ply is past the book
+        player_name = games[0].get_current_turn()
+        games[0].make_move(player_name, *next(games[0].legal_moves(player_name)))
+        self.assertIsNone(self._book.get_entry(games[0], games[0].get_current_turn()))
+
+    def test_turned_positions_get_the_turned_move(self):
+        game = KubaGame(("A", "W"), ("B", "B"))
+        game.make_move("A", (6, 6), "F")
+        move, score = self._book.get_entry(game, "B")
+
+        for transform in range(TRANSFORMS):
+            turned = transformed_game(game, transform)
+            turned_move, turned_score = self._book.get_entry(turned, "B")
+
+            self.assertEqual(turned_score, score, transform)
+            self.assertIn(turned_move, list(turned.legal_moves("B")), transform)
+
+            # The move may differ when the position is symmetric, but it always leads to the same position
+            after, turned_after = game.fork(), turned.fork()
+            after.make_move("B", *move)
+            turned_after.make_move("B", *turned_move)
+            self.assertEqual(canonical_position(turned_after)[0], canonical_position(after)[0], transform)
+
+    def test_best_move_plays_from_the_book(self):
+        game = KubaGame(("A", "W"), ("B", "B"))
+        game.set_opening_book(self._book)
+
+        self.assertEqual(game.best_move("A", max_depth=1), self._book.get_move(game, "A"))
+        self.assertIsNone(self._book.get_entry(KubaGame(("A", "W"), ("B", "B"), size=9), "A"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+# Author: Matt Sanders
+# Date: 10/18/2026
+# Description: This program tests the position caches of KubaCache.py: their keys, what they keep and which
+#              entries they forget when they are full. Run it with python -m pytest or python -m unittest.
+
+import pickle
+import unittest
+
+from KubaCache import PositionCache, SharedPositionCache, moves_key, position_key
+from KubaGame import KubaGame
+
+MOVES = (((0, 0), "R"), ((6, 5), "F"), ((3, 3), "L"))
+
+
+class KeyTest(unittest.TestCase):
+    """
+    Checks that the keys tell apart positions that are evaluated differently.
+    """
+
+    def test_keys_cover_captures_and_the_mover(self):
+        game = KubaGame(("A", "W"), ("B", "B"))
+        key = position_key(game)
+
+        self.assertEqual(key, position_key(game.fork()))
+        self.assertNotEqual(moves_key(game, "A"), moves_key(game, "B"))
+
+        # The same marbles with a red marble captured are a different position
+        captured = KubaGame(("A", "W"), ("B", "B"))
+        state = bytearray(captured.get_state_bytes())
+        state[49 + 3] = 1           # Player one's captured red marbles
+        captured.set_state_bytes(state)
+        self.assertEqual(captured.get_captured("A"), 1)
+        self.assertEqual(captured.get_hash(), game.get_hash())
+        self.assertNotEqual(position_key(captured), key)
+
+
+class PositionCacheTest(unittest.TestCase):
+    """
+    Fills a PositionCache past its size.
+    """
+
+    def test_least_recently_used_entries_are_forgotten(self):
+        cache = PositionCache(max_entries=3)
+
+        for key in range(3):
+            cache.set_evaluation(key, key * 10)
+
+        self.assertEqual(cache.get_evaluation(0), 0)     # Now the most recently used
+        cache.set_moves(3, iter(MOVES))
+
+        self.assertIsNone(cache.get_evaluation(1))
+        self.assertEqual(cache.get_evaluation(0), 0)
+        self.assertEqual(cache.get_evaluation(2), 20)
+        self.assertEqual(cache.get_moves(3), MOVES)
+        self.assertEqual(cache.get_stats(), {"entries": 3, "hits": 4, "misses": 1, "evictions": 1, "hit_rate": 0.8})
+
+        cache.clear()
+        self.assertIsNone(cache.get_evaluation(0))
+        self.assertEqual(cache.get_stats()["entries"], 0)
+
+
+class SharedPositionCacheTest(unittest.TestCase):
+    """
+    Fills one bucket of a SharedPositionCache past its ways.
+    """
+
+    def setUp(self):
+        self._cache = SharedPositionCache(slots=SharedPositionCache.WAYS)     # A single bucket
+
+    def tearDown(self):
+        self._cache.close()
+
+    def test_least_recently_used_slots_are_reused(self):
+        cache = self._cache
+
+        for key in range(1, cache.WAYS + 1):
+            cache.set_evaluation(key, -key)
+
+        self.assertEqual(cache.get_evaluation(1), -1)    # Now the most recently used
+        cache.set_moves(100, MOVES)
+
+        self.assertIsNone(cache.get_evaluation(2))
+        self.assertEqual(cache.get_moves(100), MOVES)
+        self.assertIsNone(cache.get_evaluation(100))     # A move list is not an evaluation
+
+        for key in (1, 3, 4):
+            self.assertEqual(cache.get_evaluation(key), -key)
+
+        # Saving a key again uses its own slot instead of the oldest one
+        cache.set_evaluation(3, 33)
+        self.assertEqual([cache.get_evaluation(key) for key in (1, 3, 4)], [-1, 33, -4])
+        self.assertEqual(cache.get_stats()["hits"], 8)
+
+    def test_unsavable_move_lists_are_skipped(self):
+        self._cache.set_moves(5, [((row, 0), "R") for row in range(7)] * 5)
+        self._cache.set_moves(6, [((8, 0), "R")])
+
+        self.assertIsNone(self._cache.get_moves(5))
+        self.assertIsNone(self._cache.get_moves(6))
+
+    def test_pickled_caches_share_the_memory(self):
+        copy = pickle.loads(pickle.dumps(self._cache))
+
+        try:
+            copy.set_evaluation(42, 7)
+            self.assertEqual(copy.get_name(), self._cache.get_name())
+            self.assertEqual(self._cache.get_evaluation(42), 7)
+        finally:
+            copy.close()
+
+        self._cache.clear()
+        self.assertIsNone(self._cache.get_evaluation(42))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,213 @@
+# Author: Matt Sanders
+# Date: 10/18/2026
+# Description: This program tests KubaGame.py by playing seeded random games. It checks that both board
+#              engines play the same game, that undo_move takes back apply_move, that the hash updated as
+#              marbles move matches one computed from the whole board, that a fork is not changed by the game
+#              it was forked from and that rejected moves give their reason. Run it with python -m pytest or
+#              python -m unittest.
+
+import random
+import unittest
+
+from KubaGame import KubaGame
+from KubaMetrics import MoveMetrics
+
+PLAYERS = (("A", "W"), ("B", "B"))
+ENGINES = ("grid", "bitboard")
+DIRECTIONS = ("R", "L", "B", "F")
+
+
+def random_attempt(game, rng):
+    """
+    Returns a random (player's name, coordinates, direction) to try in the game. Most are legal moves of the
+    player whose turn it is, and the rest are moves of any marble by either player, which may be rejected.
+    """
+
+    player_name = game.get_current_turn() or rng.choice("AB")
+
+    if rng.random() < 0.8:
+        moves = list(game.legal_moves(player_name))
+
+        if moves:
+            coordinates, direction = rng.choice(moves)
+            return player_name, coordinates, direction
+
+    if rng.random() < 0.2:
+        player_name = rng.choice("AB")
+
+    return player_name, (rng.randrange(7), rng.randrange(7)), rng.choice(DIRECTIONS)
+
+
+def fresh_copy(game):
+    """
+    Returns a new KubaGame set to the state of the game with set_state_bytes, so its hash is computed from
+    the whole board instead of updated move by move.
+    """
+
+    copy = KubaGame(PLAYERS[0], PLAYERS[1], game.get_engine(), game.get_ko_rule())
+    copy.set_state_bytes(game.get_state_bytes())
+    return copy
+
+
+class EngineParityTest(unittest.TestCase):
+    """
+    Plays the same random attempts on the grid and bitboard engines and compares the games after each one.
+    """
+
+    def test_engines_play_the_same_games(self):
+        for seed in range(20):
+            rng = random.Random(seed)
+            grid = KubaGame(PLAYERS[0], PLAYERS[1], "grid")
+            bitboard = KubaGame(PLAYERS[0], PLAYERS[1], "bitboard")
+
+            for ply in range(300):
+                player_name, coordinates, direction = random_attempt(grid, rng)
+                result = grid.make_move(player_name, coordinates, direction)
+
+                self.assertEqual(result, bitboard.make_move(player_name, coordinates, direction), (seed, ply))
+                self.assertEqual(grid.get_state_bytes(), bitboard.get_state_bytes(), (seed, ply))
+                self.assertEqual(grid.get_hash(), bitboard.get_hash(), (seed, ply))
+                self.assertEqual(grid.get_history_bytes(), bitboard.get_history_bytes(), (seed, ply))
+
+                if grid.get_winner() is not None:
+                    break
+
+
+class UndoTest(unittest.TestCase):
+    """
+    Makes random lines of legal moves with apply_move and takes them back with undo_move.
+    """
+
+    def test_undo_restores_state_and_hash(self):
+        for engine in ENGINES:
+            for seed in range(10):
+                rng = random.Random(seed)
+                game = KubaGame(PLAYERS[0], PLAYERS[1], engine)
+                positions = []
+
+                for ply in range(60):
+                    player_name = game.get_current_turn() or "A"
+                    moves = list(game.legal_moves(player_name))
+
+                    if game.get_winner() is not None or not moves:
+                        break
+
+                    positions.append((game.get_state_bytes(), game.get_hash()))
+                    coordinates, direction = rng.choice(moves)
+                    game.apply_move(player_name, coordinates, direction)
+
+                while positions:
+                    self.assertTrue(game.undo_move())
+                    self.assertEqual((game.get_state_bytes(), game.get_hash()), positions.pop(), (engine, seed))
+
+                self.assertFalse(game.undo_move())
+
+
+class HashTest(unittest.TestCase):
+    """
+    Compares the hash updated as random games are played with one computed from the whole board.
+    """
+
+    def test_incremental_hash_matches_fresh_hash(self):
+        for engine in ENGINES:
+            for seed in range(10):
+                rng = random.Random(seed)
+                game = KubaGame(PLAYERS[0], PLAYERS[1], engine)
+
+                for ply in range(200):
+                    player_name, coordinates, direction = random_attempt(game, rng)
+                    game.make_move(player_name, coordinates, direction)
+                    copy = fresh_copy(game)
+
+                    self.assertEqual(game.get_hash(), copy.get_hash(), (engine, seed, ply))
+                    self.assertEqual(game.get_cell_hash(), copy.get_cell_hash(), (engine, seed, ply))
+
+                    if game.get_winner() is not None:
+                        break
+
+
+class HistoryTest(unittest.TestCase):
+    """
+    Rebuilds random superko games from get_state_bytes and get_history_bytes and compares the moves they allow.
+    """
+
+    def test_history_bytes_restore_the_ko_rule(self):
+        for seed in range(20):
+            rng = random.Random(seed)
+            game = KubaGame(PLAYERS[0], PLAYERS[1], ko_rule="superko")
+
+            for ply in range(150):
+                # Random attempts include rejected pushes of the player's own marble, which move the marbles
+                game.make_move(*random_attempt(game, rng))
+
+                if game.get_winner() is not None:
+                    break
+
+                copy = fresh_copy(game)
+                copy.set_history_bytes(game.get_history_bytes())
+                player_name = game.get_current_turn()
+
+                self.assertEqual(copy.get_history_bytes(), game.get_history_bytes(), (seed, ply))
+                self.assertEqual(list(copy.legal_moves(player_name)), list(game.legal_moves(player_name)), (seed, ply))
+
+    def test_bad_history_bytes_are_rejected(self):
+        game = KubaGame(PLAYERS[0], PLAYERS[1])
+
+        for history in (b"", bytes(8), bytes(8) + b"\x03"):
+            with self.assertRaises(ValueError):
+                game.set_history_bytes(history)
+
+
+class RejectionTest(unittest.TestCase):
+    """
+    Checks the reasons given for rejected moves.
+    """
+
+    def test_bad_directions_are_counted(self):
+        game = KubaGame(PLAYERS[0], PLAYERS[1])
+        metrics = MoveMetrics()
+        game.set_metrics(metrics)
+
+        self.assertEqual(game.evaluate_moves("A", [((6, 6), "X"), ((6, 6), "R")]),
+                         [(False, "bad_direction", None), (False, "no_access", None)])
+        self.assertFalse(game.make_move("A", (6, 6), "X"))
+        self.assertFalse(game.make_move("B", (6, 1), "R"))
+        rejections = metrics.get_counts()["rejections"]
+        self.assertEqual({reason: count for reason, count in rejections.items() if count},
+                         {"bad_direction": 1, "no_access": 1})
+
+
+class ForkTest(unittest.TestCase):
+    """
+    Forks random games and plays on in the original game, then in the fork.
+    """
+
+    def test_fork_is_not_changed_by_the_original(self):
+        for engine in ENGINES:
+            for seed in range(10):
+                rng = random.Random(seed)
+                game = KubaGame(PLAYERS[0], PLAYERS[1], engine)
+
+                for ply in range(rng.randrange(40)):
+                    game.make_move(*random_attempt(game, rng))
+
+                fork = game.fork()
+                state = (fork.get_state_bytes(), fork.get_hash(), fork.get_history_bytes())
+
+                for ply in range(40):
+                    game.make_move(*random_attempt(game, rng))
+
+                self.assertEqual((fork.get_state_bytes(), fork.get_hash(), fork.get_history_bytes()), state)
+                self.assertEqual(fork.get_hash(), fresh_copy(fork).get_hash())
+
+                # Moves in the fork do not change the game either
+                state = (game.get_state_bytes(), game.get_hash(), game.get_history_bytes())
+
+                for ply in range(40):
+                    fork.make_move(*random_attempt(fork, rng))
+
+                self.assertEqual((game.get_state_bytes(), game.get_hash(), game.get_history_bytes()), state)
+
+
+if __name__ == "__main__":
+    unittest.main()
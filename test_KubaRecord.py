@@ -0,0 +1,138 @@
+# Author: Matt Sanders
+# Date: 10/18/2026
+# Description: This program tests the game records of KubaRecord.py by recording seeded random games, reading
+#              them back and replaying them. Run it with python -m pytest or python -m unittest.
+
+import io
+import random
+import unittest
+
+from KubaGame import KubaGame
+from KubaRecord import (FIRST_PLAYER_ONE, MAGIC, GameRecordWriter, decode_move, encode_move, read_games,
+                        replay_events)
+
+PLAYERS = (("A", "W"), ("B", "B"))
+
+
+def play_random_game(game, seed, plies=200):
+    """
+    Plays up to the given number of random attempts in the game, mostly legal moves of the player whose turn
+    it is and some moves of any cell, which may be rejected. Returns nothing.
+    """
+
+    rng = random.Random(seed)
+
+    for ply in range(plies):
+        if game.get_winner() is not None:
+            return
+
+        player_name = game.get_current_turn() or rng.choice("AB")
+        moves = list(game.legal_moves(player_name))
+
+        if moves and rng.random() < 0.8:
+            game.make_move(player_name, *rng.choice(moves))
+        else:
+            game.make_move(player_name, (rng.randrange(7), rng.randrange(7)), rng.choice("RLBF"))
+
+
+def record_games(games_and_seeds):
+    """
+    Returns the bytes of a record file of each game played with play_random_game and its seed.
+    """
+
+    stream = io.BytesIO()
+    writer = GameRecordWriter(stream)
+
+    for game, seed in games_and_seeds:
+        writer.start_game(game)
+        play_random_game(game, seed)
+        writer.end_game()
+
+    return stream.getvalue()
+
+
+class RecordTest(unittest.TestCase):
+    """
+    Records games, reads them back and replays them.
+    """
+
+    def test_moves_encode_and_decode(self):
+        for row in range(7):
+            for column in range(7):
+                for direction in "RLBF":
+                    code = encode_move((row, column), direction)
+                    self.assertLess(code, FIRST_PLAYER_ONE)
+                    self.assertEqual(decode_move(code), ((row, column), direction))
+
+    def test_records_replay_the_games(self):
+        games = [(KubaGame(PLAYERS[0], PLAYERS[1], ko_rule=ko_rule), seed)
+                 for seed in range(6) for ko_rule in ("none", "ko", "superko")]
+        data = record_games(games)
+
+        # A small chunk size makes games cross the chunks the reader reads
+        records = list(read_games(io.BytesIO(data), chunk_size=7))
+        self.assertEqual(len(records), len(games))
+
+        for record, (game, seed) in zip(records, games):
+            self.assertEqual(record.get_players(), game.get_players())
+            self.assertEqual(record.get_ko_rule(), game.get_ko_rule())
+
+            for engine in ("grid", "bitboard"):
+                replayed = KubaGame(PLAYERS[0], PLAYERS[1])
+
+                for replayed in record.replay(engine):
+                    pass
+
+                self.assertEqual(replayed.get_state_bytes(), game.get_state_bytes(), (seed, engine))
+                self.assertEqual(replayed.get_history_bytes(), game.get_history_bytes(), (seed, engine))
+
+            # Every event but the marker of the first player is a move or a pass
+            self.assertEqual(len(list(record.get_moves())), max(len(record.get_events()) - 1, 0))
+
+    def test_version_1_records_replay_under_ko(self):
+        game = KubaGame(PLAYERS[0], PLAYERS[1])
+        data = record_games([(game, 3)])
+
+        # A version 1 header is the version 2 header without the Ko rule byte
+        self.assertEqual(data[:6], MAGIC + bytes((2, 1)))
+        record = next(read_games(io.BytesIO(data[:4] + bytes((1,)) + data[6:])))
+        self.assertEqual(record.get_ko_rule(), "ko")
+
+        for replayed in record.replay():
+            pass
+
+        self.assertEqual(replayed.get_state_bytes(), game.get_state_bytes())
+
+    def test_bad_streams_are_rejected(self):
+        data = record_games([(KubaGame(PLAYERS[0], PLAYERS[1]), 0)])
+
+        with self.assertRaises(ValueError):
+            list(read_games(io.BytesIO(data[:-1])))
+
+        with self.assertRaises(ValueError):
+            list(read_games(io.BytesIO(b"NOPE" + data[4:])))
+
+        with self.assertRaises(ValueError):
+            list(read_games(io.BytesIO(data[:5] + bytes((3,)) + data[6:])))
+
+    def test_rejected_moves_raise_when_replayed(self):
+        # The cell (3, 0) is empty when the game starts, so the game rejects a push of it
+        events = bytes((FIRST_PLAYER_ONE, encode_move((3, 0), "R")))
+
+        with self.assertRaises(ValueError):
+            list(replay_events(KubaGame(PLAYERS[0], PLAYERS[1]), events))
+
+    def test_only_new_games_are_recorded(self):
+        writer = GameRecordWriter(io.BytesIO())
+        game = KubaGame(PLAYERS[0], PLAYERS[1])
+        game.make_move("A", (6, 6), "F")
+
+        with self.assertRaises(ValueError):
+            writer.start_game(game)
+
+        with self.assertRaises(ValueError):
+            writer.start_game(KubaGame(PLAYERS[0], PLAYERS[1], size=9))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+# Author: Matt Sanders
+# Date: 10/18/2026
+# Description: This program tests the game server of KubaServer.py: the requests of the line protocol, the
+#              parking of idle games and a connection over TCP. Run it with python -m pytest or
+#              python -m unittest.
+
+import asyncio
+import json
+import random
+import time
+import unittest
+
+from KubaServer import GameServer, SessionManager
+
+
+def ask(manager, **request):
+    """
+    Returns the manager's response to a request made of the keyword arguments.
+    """
+
+    return asyncio.run(manager.handle_request(request))
+
+
+class ProtocolTest(unittest.TestCase):
+    """
+    Sends the requests of the line protocol to a SessionManager.
+    """
+
+    def test_a_game_can_be_played(self):
+        manager = SessionManager()
+        session = ask(manager, op="new", players=[["A", "W"], ["B", "B"]], engine="bitboard")["result"]
+
+        response = ask(manager, id=7, op="move", session=session, player="A", coordinates=[6, 6], direction="F")
+        self.assertEqual(response, {"id": 7, "ok": True, "result": {"result": True, "turn": "B", "winner": None}})
+        self.assertEqual(ask(manager, op="turn", session=session)["result"], "B")
+        self.assertEqual(ask(manager, op="winner", session=session)["result"], None)
+        self.assertEqual(ask(manager, op="captured", session=session, player="A")["result"], 0)
+        self.assertEqual(ask(manager, op="marbles", session=session)["result"], (8, 8, 13))
+        self.assertIn(((0, 5), "B"), ask(manager, op="legal", session=session, player="B")["result"])
+        self.assertEqual(ask(manager, op="stats")["result"]["sessions"], 1)
+        self.assertEqual(ask(manager, op="close", session=session)["result"], True)
+        self.assertFalse(ask(manager, op="turn", session=session)["ok"])
+
+    def test_bad_requests_are_answered_with_errors(self):
+        manager = SessionManager(max_sessions=1)
+
+        for players in ([["A", "W"]], [["A", "W"], ["B", 2]], [["A", "W"], ["B", "W"]], [["A", "W"], ["B", "R"]],
+                        [["A", "W"], ["A", "B"]], "AB"):
+            self.assertFalse(ask(manager, op="new", players=players)["ok"], players)
+
+        self.assertFalse(ask(manager, op="new", players=[["A", "W"], ["B", "B"]], engine="abacus")["ok"])
+        self.assertEqual(manager.get_session_count(), 0)
+        session = ask(manager, op="new", players=[["A", "W"], ["B", "B"]])["result"]
+        self.assertFalse(ask(manager, op="new", players=[["A", "W"], ["B", "B"]])["ok"])
+
+        for coordinates in ([6], [6, 6, 6], ["6", 6], None):
+            response = ask(manager, op="move", session=session, player="A", coordinates=coordinates, direction="F")
+            self.assertFalse(response["ok"], coordinates)
+
+        self.assertFalse(ask(manager, op="captured", session=session, player="Z")["ok"])
+        self.assertFalse(ask(manager, op="dance")["ok"])
+        self.assertFalse(ask(manager, op="turn", session=session + 1)["ok"])
+        self.assertEqual(manager.get_session(session).get_game().get_current_turn(), None)
+
+
+class ParkingTest(unittest.TestCase):
+    """
+    Parks idle games and checks they are rebuilt as they were.
+    """
+
+    def test_parked_games_are_rebuilt(self):
+        manager = SessionManager(park_timeout=30.0)
+        rng = random.Random(0)
+        numbers = [manager.create_session(("A", "W"), ("B", "B"), engine) for engine in ("grid", "bitboard") * 5]
+
+        for number in numbers:
+            game = manager.get_session(number).get_game()
+            game.set_ko_rule("superko")
+
+            for ply in range(rng.randrange(100)):
+                player_name = game.get_current_turn() or "A"
+                game.make_move(player_name, (rng.randrange(7), rng.randrange(7)), rng.choice("RLBF"))
+
+        games = {number: manager.get_session(number).get_game().fork() for number in numbers}
+        self.assertEqual(manager.park_idle(time.monotonic() + 60.0), len(numbers))
+        self.assertEqual(manager.get_stats()["parked"], len(numbers))
+        self.assertEqual(manager.park_idle(time.monotonic() + 60.0), 0)
+
+        for number in numbers:
+            game, rebuilt = games[number], manager.get_session(number).get_game()
+            player_name = game.get_current_turn() or "A"
+
+            self.assertEqual(rebuilt.get_engine(), game.get_engine())
+            self.assertEqual(rebuilt.get_ko_rule(), "superko")
+            self.assertEqual(rebuilt.get_state_bytes(), game.get_state_bytes())
+            self.assertEqual(rebuilt.get_history_bytes(), game.get_history_bytes())
+            self.assertEqual(list(rebuilt.legal_moves(player_name)), list(game.legal_moves(player_name)))
+
+        # A game that was used since it was parked is parked again
+        self.assertEqual(manager.get_stats()["parked"], 0)
+        self.assertEqual(manager.park_idle(time.monotonic() + 60.0), len(numbers))
+
+    def test_idle_sessions_are_evicted(self):
+        manager = SessionManager(idle_timeout=300.0)
+        number = manager.create_session(("A", "W"), ("B", "B"))
+
+        self.assertEqual(manager.evict_idle(time.monotonic() + 10.0), 0)
+        self.assertEqual(manager.evict_idle(time.monotonic() + 600.0), 1)
+        self.assertEqual(manager.get_session_count(), 0)
+        self.assertEqual(manager.park_idle(time.monotonic() + 600.0), 0)
+        self.assertFalse(manager.close_session(number))
+
+
+class ConnectionTest(unittest.TestCase):
+    """
+    Talks to a GameServer over TCP.
+    """
+
+    def test_requests_over_tcp(self):
+        asyncio.run(self._talk())
+
+    async def _talk(self):
+        manager = SessionManager()
+        server = GameServer(manager, port=0)
+        await server.start()
+
+        def fail(request):
+            raise RuntimeError("A bug in the server.")
+
+        manager._operations["stats"] = fail
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.get_port())
+
+        async def send(line):
+            writer.write(line + b"\n")
+            return json.loads(await reader.readline())
+
+        try:
+            created = await send(b'{"id": 1, "op": "new", "players": [["A", "W"], ["B", "B"]]}')
+            self.assertEqual(created, {"id": 1, "ok": True, "result": 1})
+            self.assertEqual((await send(b"not json"))["ok"], False)
+            self.assertEqual((await send(b"[1, 2]"))["ok"], False)
+
+            with self.assertLogs("KubaServer", "ERROR"):
+                self.assertEqual(await send(b'{"id": 2, "op": "stats"}'),
+                                 {"id": 2, "ok": False, "error": "Internal server error."})
+
+            # The connection is still answered after the errors
+            self.assertEqual((await send(b'{"op": "turn", "session": 1}'))["ok"], True)
+        finally:
+            writer.close()
+            await server.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
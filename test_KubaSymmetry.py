@@ -0,0 +1,124 @@
+# Author: Matt Sanders
+# Date: 10/18/2026
+# Description: This program tests the symmetries of KubaSymmetry.py on positions of seeded random games: the
+#              canonical form under all 16 transforms and the moves a transformed game allows. Run it with
+#              python -m pytest or python -m unittest.
+
+import random
+import unittest
+
+from KubaGame import KubaGame
+from KubaSymmetry import (TRANSFORMS, canonical_key, canonical_position, inverse_transform, transform_move,
+                          transformed_game)
+
+MOVES = [((row, column), direction) for row in range(7) for column in range(7) for direction in "RLBF"]
+
+
+def random_games(count, ko_rule="superko"):
+    """
+    Yields count games each played for a random number of random attempts with the given Ko rule.
+    """
+
+    for seed in range(count):
+        rng = random.Random(seed)
+        game = KubaGame(("A", "W"), ("B", "B"), rng.choice(("grid", "bitboard")), ko_rule)
+
+        for ply in range(rng.randrange(120)):
+            if game.get_winner() is not None:
+                break
+
+            player_name = game.get_current_turn() or "A"
+            moves = list(game.legal_moves(player_name))
+
+            if moves and rng.random() < 0.7:
+                game.make_move(player_name, *rng.choice(moves))
+            else:
+                game.make_move(player_name, *rng.choice(MOVES))
+
+        yield game
+
+
+class TransformTest(unittest.TestCase):
+    """
+    Checks the transforms of moves.
+    """
+
+    def test_inverse_transforms_undo_moves(self):
+        for transform in range(TRANSFORMS):
+            inverse = inverse_transform(transform)
+            turned = [transform_move(move, transform) for move in MOVES]
+
+            self.assertEqual(sorted(turned), sorted(MOVES), transform)
+            self.assertEqual([transform_move(move, inverse) for move in turned], MOVES, transform)
+
+
+class CanonicalTest(unittest.TestCase):
+    """
+    Transforms random positions all 16 ways and compares their canonical forms.
+    """
+
+    def test_canonical_form_is_the_same_under_every_transform(self):
+        for game in random_games(25):
+            canonical, transform = canonical_position(game, "A")
+            key = canonical_key(game, "A")
+
+            self.assertEqual(canonical_position(transformed_game(game, transform), "A")[1], 0)
+
+            for other in range(TRANSFORMS):
+                turned = transformed_game(game, other)
+                self.assertEqual(canonical_position(turned, "A")[0], canonical, other)
+                self.assertEqual(canonical_key(turned, "A"), key, other)
+
+    def test_canonical_form_tells_positions_apart(self):
+        forms = set()
+
+        for game in random_games(25):
+            forms.add(canonical_position(game, "A")[0])
+
+        self.assertGreater(len(forms), 20)
+
+
+class TransformedGameTest(unittest.TestCase):
+    """
+    Compares the moves a transformed game allows with the moves of the game it came from.
+    """
+
+    def _assert_same_moves(self, game, turned, transform):
+        player_name = game.get_current_turn() or "A"
+        expected = sorted(transform_move(move, transform) for move in game.legal_moves(player_name))
+
+        self.assertEqual(sorted(turned.legal_moves(player_name)), expected, transform)
+
+        # The marble a push knocks off changes color with the colors
+        colors = {"W": "B", "B": "W"} if transform >= 8 else {}
+        expected = [(accepted, reason, colors.get(removed, removed))
+                    for accepted, reason, removed in game.evaluate_moves(player_name, MOVES)]
+        self.assertEqual(turned.evaluate_moves(player_name, [transform_move(move, transform) for move in MOVES]),
+                         expected, transform)
+
+    def test_transformed_games_allow_the_same_moves(self):
+        for ko_rule in ("superko", "ko"):
+            for game in random_games(15, ko_rule):
+                for transform in range(TRANSFORMS):
+                    turned = transformed_game(game, transform)
+                    self.assertEqual(turned.get_ko_rule(), ko_rule)
+                    self._assert_same_moves(game, turned, transform)
+
+                    # Both games go on the same way, with new positions added to the mapped history
+                    original = game.fork()
+
+                    for ply in range(6):
+                        player_name = original.get_current_turn() or "A"
+                        moves = list(original.legal_moves(player_name))
+
+                        if not moves or original.get_winner() is not None:
+                            break
+
+                        move = moves[ply * 7 % len(moves)]
+                        self.assertTrue(original.make_move(player_name, *move))
+                        self.assertTrue(turned.make_move(player_name, *transform_move(move, transform)))
+                        self._assert_same_moves(original, turned, transform)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+# Author: Matt Sanders
+# Date: 10/18/2026
+# Description: This program tests the endgame tablebase of KubaTablebase.py by building the three marble table
+#              and checking that the score of random positions follows from the scores after each of their
+#              moves. Run it with python -m pytest or python -m unittest.
+
+import random
+import tempfile
+import unittest
+
+from KubaGame import KubaGame
+from KubaTablebase import WIN, Tablebase, configurations, generate_tablebase
+
+
+def endgame(rng, ko_rule="none"):
+    """
+    Returns a game with one white, one black and one red marble on random cells, each player one red marble
+    from winning, and a random player to move.
+    """
+
+    game = KubaGame(("A", "W"), ("B", "B"), ko_rule=ko_rule)
+    cells = bytearray(b"X" * 49)
+
+    for cell, value in zip(rng.sample(range(49), 3), b"WBR"):
+        cells[cell] = value
+
+    # The marble counts, then each player's captured red marbles, marbles and last move, the turn and the winner
+    game.set_state_bytes(bytes(cells) + bytes((1, 1, 1, 6, 1, 255, 6, 1, 255, rng.choice((1, 2)), 0)))
+    return game
+
+
+class TablebaseTest(unittest.TestCase):
+    """
+    Builds the tables of up to three marbles once for every test.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls._directory = tempfile.TemporaryDirectory()
+        cls._positions = generate_tablebase(cls._directory.name, max_marbles=3, workers=1)
+        cls._tablebase = Tablebase(cls._directory.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._directory.cleanup()
+
+    def test_every_configuration_is_built(self):
+        self.assertEqual(self._tablebase.get_configurations(), configurations(3))
+        self.assertGreater(self._positions, 0)
+
+    def test_scores_follow_from_the_moves(self):
+        rng = random.Random(0)
+        results = set()
+
+        for position in range(300):
+            game = endgame(rng)
+            player_name = game.get_current_turn()
+            moves = list(game.legal_moves(player_name))
+
+            if not moves:
+                continue
+
+            best = -WIN - 1
+
+            for move in moves:
+                child = game.fork()
+                child.make_move(player_name, *move)
+
+                if child.get_winner() == player_name:
+                    score = WIN - 1
+                else:
+                    # The opponent's score one ply further from the end, for the player moving
+                    score = -self._tablebase.probe_score(child)
+                    score -= (score > 0) - (score < 0)
+
+                best = max(best, score)
+
+            self.assertEqual(self._tablebase.probe_score(game), best, game.get_state_bytes())
+            result = self._tablebase.probe(game)
+            results.add(result[0])
+
+            if result[0] == "draw":
+                self.assertEqual((best, result[1]), (0, None))
+            else:
+                self.assertEqual(WIN - abs(best), result[1])
+
+        self.assertEqual(results, {"win", "loss", "draw"})
+
+    def test_positions_the_tables_do_not_solve_get_none(self):
+        game = endgame(random.Random(1), ko_rule="ko")
+        self.assertIsNone(self._tablebase.probe(game))
+
+        game.set_ko_rule("none")
+        self.assertIsNotNone(self._tablebase.probe(game))
+        self.assertIsNone(self._tablebase.probe(KubaGame(("A", "W"), ("B", "B"), ko_rule="none")))
+
+
+if __name__ == "__main__":
+    unittest.main()